@@ -52,6 +52,7 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'jobfinder.middleware.RequestMetricsMiddleware',  # czas obsługi żądań (/metrics)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -143,71 +144,115 @@ LOGIN_URL = 'users:login' # The name of the login URL pattern
 LOGOUT_REDIRECT_URL = 'jobfinder:home' # Go to homepage after logout
 
 
+# MATCHER
+# Katalog z wersjonowanymi indeksami TF-IDF (przebudowywane po scrapowaniu/archiwizacji)
+MATCHER_INDEX_DIR = env('MATCHER_INDEX_DIR', default=os.path.join(BASE_DIR, "data", "match_index"))
+# Podobieństwo tekstowe w dopasowaniu: "tfidf" (dokładne, rzadkie bigramy) albo "lsa" (gęste
+# wektory TruncatedSVD + przybliżone sąsiedztwo IVF, jobfinder/semantic.py) dla dużych korpusów
+MATCH_SIMILARITY = env('MATCH_SIMILARITY', default='tfidf')
+MATCH_LSA_COMPONENTS = env.int('MATCH_LSA_COMPONENTS', default=128)
+MATCH_ANN_PROBES = env.int('MATCH_ANN_PROBES', default=8)  # przeszukiwane listy IVF na zapytanie
+# Wektoryzacja TF-IDF: "vocabulary" (słownik n-gramów) albo "hashing" (stała liczba kubełków,
+# float32 i przyrostowa przebudowa, jobfinder/hashing.py) dla bardzo dużych korpusów
+MATCH_VECTORIZER = env('MATCH_VECTORIZER', default='vocabulary')
+MATCH_HASHING_FEATURES = env.int('MATCH_HASHING_FEATURES', default=2 ** 20)
+# Cache wyników dopasowania (jobfinder/match_cache.py): LRU w procesie (liczba CV) i cache Django
+MATCH_CACHE_ENABLED = env.bool('MATCH_CACHE_ENABLED', default=True)
+MATCH_CACHE_LOCAL_SIZE = env.int('MATCH_CACHE_LOCAL_SIZE', default=256)
+MATCH_CACHE_ALIAS = 'default'
+MATCH_CACHE_TTL = env.int('MATCH_CACHE_TTL', default=60 * 60)  # sekundy
+# Dwuetapowe dopasowanie (jobfinder/retrieval.py): od MIN_CORPUS ofert pełna formuła tylko dla
+# ofert z co najmniej MIN_OVERLAP wspólnymi tokenami z CV i NEIGHBOURS najbardziej podobnych (TF-IDF).
+# Przybliżone — włączaj po sprawdzeniu recall na własnym korpusie (python manage.py benchmark retrieval)
+MATCH_RETRIEVAL_ENABLED = env.bool('MATCH_RETRIEVAL_ENABLED', default=False)
+MATCH_RETRIEVAL_MIN_CORPUS = env.int('MATCH_RETRIEVAL_MIN_CORPUS', default=5000)
+MATCH_RETRIEVAL_MIN_OVERLAP = env.int('MATCH_RETRIEVAL_MIN_OVERLAP', default=2)
+MATCH_RETRIEVAL_NEIGHBOURS = env.int('MATCH_RETRIEVAL_NEIGHBOURS', default=200)
+# Liczba wyników dopasowania (?top=) domyślnie i maksymalnie
+MATCH_DEFAULT_TOP = 5
+MATCH_MAX_TOP = env.int('MATCH_MAX_TOP', default=100)
+# Pula wykonująca dopasowania dla asynchronicznych widoków (jobfinder/match_pool.py):
+# wątki, miejsca w kolejce i Retry-After (sekundy) odpowiedzi 503 przy pełnej kolejce
+MATCH_POOL_WORKERS = env.int('MATCH_POOL_WORKERS', default=2)
+MATCH_POOL_QUEUE_SIZE = env.int('MATCH_POOL_QUEUE_SIZE', default=8)
+MATCH_POOL_RETRY_AFTER = env.int('MATCH_POOL_RETRY_AFTER', default=2)
+# Metryki procesu w formacie Prometheusa pod /metrics (jobfinder/metrics.py); dostęp tylko z nagłówkiem
+# "Authorization: Bearer <METRICS_TOKEN>" albo dla zalogowanego użytkownika z is_staff
+METRICS_ENABLED = env.bool('METRICS_ENABLED', default=True)
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+
+
+# ODŚWIEŻANIE OFERT W TLE
+# Scrapowanie/archiwizacja/usuwanie działają z crona (python manage.py crontab add), nie w żądaniu
+JOBS_REFRESH_SCHEDULE = env('JOBS_REFRESH_SCHEDULE', default='*/15 * * * *')
+JOBS_REFRESH_MIN_INTERVAL = env.int('JOBS_REFRESH_MIN_INTERVAL', default=10 * 60)  # sekundy
+JOBS_REFRESH_STATE_DIR = env('JOBS_REFRESH_STATE_DIR', default=os.path.join(BASE_DIR, "data"))
+
+# Dyskowy cache odpowiedzi API (ETag/Last-Modified) dla scrapera
+SCRAPER_CACHE_DIR = env('SCRAPER_CACHE_DIR', default=os.path.join(BASE_DIR, "data", "http_cache"))
+
+# Włączone źródła ofert (jobfinder/sources.py): nazwa -> nadpisania (url, timeout, deadline, rate_limit, user_agent)
+JOB_SOURCES = {
+    "remoteok": {},
+    # "remotive": {"rate_limit": 2.0},
+}
+# Liczba źródeł pobieranych równolegle
+SCRAPER_MAX_WORKERS = env.int('SCRAPER_MAX_WORKERS', default=4)
+# Czyszczenie HTML opisów: procesy (0 = wszystkie rdzenie, 1 = bez puli), opisy na porcję
+# i minimalna partia, od której opłaca się pula procesów
+SCRAPER_CLEAN_WORKERS = env.int('SCRAPER_CLEAN_WORKERS', default=0)
+SCRAPER_CLEAN_CHUNK_SIZE = env.int('SCRAPER_CLEAN_CHUNK_SIZE', default=50)
+SCRAPER_CLEAN_MIN_PARALLEL = env.int('SCRAPER_CLEAN_MIN_PARALLEL', default=200)
+
+# Lista ofert: rozmiar strony (kursor po date_last_seen, id) i czas życia zapamiętanej liczby ofert
+JOB_LIST_PAGE_SIZE = env.int('JOB_LIST_PAGE_SIZE', default=30)
+JOB_LIST_MAX_PAGE_SIZE = 100
+JOB_LIST_COUNT_TTL = env.int('JOB_LIST_COUNT_TTL', default=5 * 60)  # sekundy
+# Konfiguracja tekstowa PostgreSQL dla wyszukiwania pełnotekstowego ofert (jobfinder/search.py)
+JOB_SEARCH_CONFIG = env('JOB_SEARCH_CONFIG', default='english')
+
+CRONJOBS = [
+    (JOBS_REFRESH_SCHEDULE, 'django.core.management.call_command', ['refresh_jobs']),
+]
+
+
 # LOGGING CONFIGURATION
+# Loggery aplikacji piszą przez kolejkę do wątku listenera (jobfinder/logging_config.py);
+# pliki logów (logs/<nazwa>.log) i konsolę przypisuje im setup_logger()
 LOG_DIR = os.path.join(BASE_DIR, "logs")
 os.makedirs(LOG_DIR, exist_ok=True)
 
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
-    "formatters": {
-        "standard": {
-            "format": "[%(asctime)s] %(levelname)s %(name)s: %(message)s"
-        },
-    },
     "handlers": {
-        "scraper_file": {
-            "level": "INFO",
-            "class": "logging.handlers.RotatingFileHandler",
-            "filename": os.path.join(LOG_DIR, "scraper.log"),
-            "maxBytes": 5*1024*1024,
-            "backupCount": 3,
-            "formatter": "standard",
+        "queue": {
+            "()": "jobfinder.logging_config.queue_handler",
         },
-        "archive_file": {
-            "level": "INFO",
-            "class": "logging.handlers.RotatingFileHandler",
-            "filename": os.path.join(LOG_DIR, "archive.log"),
-            "maxBytes": 5*1024*1024,
-            "backupCount": 3,
-            "formatter": "standard",
-        },
-        "matcher_file": {
-            "level": "DEBUG",
-            "class": "logging.handlers.RotatingFileHandler",
-            "filename": os.path.join(LOG_DIR, "matcher.log"),
-            "maxBytes": 5*1024*1024,
-            "backupCount": 3,
-            "formatter": "standard",
-        },
-        "delete_file": {
-            "level": "INFO",
-            "class": "logging.handlers.RotatingFileHandler",
-            "filename": os.path.join(LOG_DIR, "delete.log"),
-            "maxBytes": 5*1024*1024,
-            "backupCount": 3,
-            "formatter": "standard",
-        },
-        "console": {
-            "class": "logging.StreamHandler",
-            "formatter": "standard",
-        }
     },
     "loggers": {
         "scraper": {
-            "handlers": ["scraper_file", "console"],
+            "handlers": ["queue"],
             "level": "INFO",
             "propagate": False,
         },
         "archiver": {
-            "handlers": ["archive_file", "console"],
+            "handlers": ["queue"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "deleter": {
+            "handlers": ["queue"],
             "level": "INFO",
             "propagate": False,
         },
         "matcher": {
-            "handlers": ["matcher_file", "console"],
-            "level": "DEBUG",
+            "handlers": ["queue"],
+            "level": env('MATCHER_LOG_LEVEL', default='DEBUG'),
             "propagate": False,
         },
     },
 }
+# Odsetek obliczonych dopasowań, dla których matcher loguje (DEBUG) każdą ofertę z rankingu;
+# pozostałe mają jeden zbiorczy wpis na dopasowanie
+MATCH_TRACE_SAMPLE_RATE = env.float('MATCH_TRACE_SAMPLE_RATE', default=0.0)
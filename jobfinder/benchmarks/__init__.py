@@ -0,0 +1,15 @@
+# Benchmarki wydajności uruchamiane komendą: python manage.py benchmark <suite>
+# Każdy zestaw działa na tymczasowej bazie testowej i lokalnych danych syntetycznych (bez sieci).
+from jobfinder.benchmarks import asgi, cleaning, ingest, keywords, retrieval, search, semantic, vectorizer, workload
+
+SUITES = {
+    "ingest": ingest.run,
+    "cleaning": cleaning.run,
+    "search": search.run,
+    "asgi": asgi.run,
+    "retrieval": retrieval.run,
+    "semantic": semantic.run,
+    "keywords": keywords.run,
+    "vectorizer": vectorizer.run,
+    "workload": workload.run,
+}
@@ -0,0 +1,108 @@
+# Benchmark współbieżności endpointu dopasowań pod ASGI (job_matcher.asgi / ASGIHandler Django).
+# Żądania są wysyłane równolegle przez AsyncClient, który wywołuje aplikację ASGI w procesie
+# (bez zewnętrznego serwera i sieci). Porównuje dotychczasowy widok synchroniczny — pod ASGI
+# wszystkie widoki synchroniczne dzielą jeden wątek, więc dopasowanie blokuje np. listę ofert —
+# z widokiem asynchronicznym korzystającym z puli jobfinder/match_pool.py.
+# Każda runda: `concurrency` dopasowań (każde dla innego CV, bez cache) i tyle samo lekkich
+# żądań /api/jobs/ naraz; raportowane są opóźnienia obu rodzajów i liczba odpowiedzi 503.
+# Na SQLite (baza w pamięci) równoległe zapisy rankingów mogą kończyć się "table is locked" —
+# match_jobs_to_cv loguje błąd zapisu i mimo to zwraca wynik; miarodajne liczby daje PostgreSQL.
+import asyncio
+import time
+
+from django.http import JsonResponse
+from django.test import AsyncClient, override_settings
+from django.urls import path
+from django.views.decorators.http import require_GET
+
+from jobfinder import match_cache, views
+from jobfinder.benchmarks.synthetic import generate_cvs, generate_offers
+from jobfinder.match_pool import reset_match_pool
+from jobfinder.models import Job
+from jobfinder.tfidf_index import ensure_index
+from users.models import CV
+
+DEFAULT_SIZES = (2000,)
+CONCURRENCY = (1, 4, 16)
+TOP_N = 10
+
+
+@require_GET
+def sync_match(request, cv_id):
+    # dotychczasowe zachowanie: dopasowanie w wątku obsługującym żądanie
+    try:
+        top_n = views._top_n(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return views._match_json(cv_id, top_n)
+
+
+# urlconf benchmarku (ROOT_URLCONF=jobfinder.benchmarks.asgi)
+urlpatterns = [
+    path("sync/match/<int:cv_id>/", sync_match),
+    path("async/match/<int:cv_id>/", views.match_jobs),
+    path("api/jobs/", views.job_list_json),
+]
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+async def _timed_get(client, url):
+    started = time.perf_counter()
+    response = await client.get(url)
+    return response.status_code, time.perf_counter() - started
+
+
+async def _round(mode, cv_ids):
+    client = AsyncClient()
+    requests = [f"/{mode}/match/{cv_id}/?top={TOP_N}" for cv_id in cv_ids]
+    requests += ["/api/jobs/?page_size=10"] * len(cv_ids)
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(_timed_get(client, url) for url in requests))
+    return responses[:len(cv_ids)], responses[len(cv_ids):], time.perf_counter() - started
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+def run(sizes=None, stdout=None):
+    from jobfinder.management.commands.scrape_remotejobs import Command
+
+    results = []
+    with override_settings(ROOT_URLCONF=__name__, MATCH_CACHE_ENABLED=False):
+        for size in sizes or DEFAULT_SIZES:
+            Job.objects.all().delete()
+            Command()._save_jobs(generate_offers(size, seed=size))
+            ensure_index()
+            match_cache.clear()
+
+            for concurrency in CONCURRENCY:
+                for mode in ("sync", "async"):
+                    # każde żądanie dla nowego CV, żeby nie trafiać w zapisane rankingi
+                    cvs = CV.objects.bulk_create(
+                        CV(**fields) for fields in generate_cvs(concurrency, seed=concurrency)
+                    )
+                    reset_match_pool()
+                    matches, lists, wall = asyncio.run(_round(mode, [cv.id for cv in cvs]))
+                    match_ok = [seconds for status, seconds in matches if status == 200]
+                    list_times = [seconds for _, seconds in lists]
+                    results.append({
+                        "benchmark": f"asgi.match_{mode}",
+                        "size": size,
+                        "concurrency": concurrency,
+                        "wall_ms": _ms(wall),
+                        "match_p50_ms": _ms(_percentile(match_ok, 0.5)),
+                        "match_p95_ms": _ms(_percentile(match_ok, 0.95)),
+                        "list_p50_ms": _ms(_percentile(list_times, 0.5)),
+                        "list_p95_ms": _ms(_percentile(list_times, 0.95)),
+                        "rejected_503": sum(1 for status, _ in matches if status == 503),
+                        "errors": sum(1 for status, _ in matches + lists if status not in (200, 503)),
+                    })
+            reset_match_pool()
+    return results
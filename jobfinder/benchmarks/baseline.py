@@ -0,0 +1,95 @@
+# Bazy odniesienia benchmarków: zapis wyników do JSON i porównanie kolejnego przebiegu.
+# Wyniki są parowane po polach opisowych (benchmark, size, tekstowe parametry jak q czy backend);
+# pola liczbowe to metryki. Regresją jest pogorszenie ponad `threshold` (względnie) metryki
+# o znanym kierunku: czasy, zapytania i pamięć mają maleć, przepustowość i recall — rosnąć.
+# Pozostałe liczby (np. liczba trafień) są tylko informacyjne.
+import json
+import platform
+
+from django.db import connection
+from django.utils import timezone
+
+# metryka -> kierunek po nazwie: dokładna nazwa, przyrostek albo fragment
+HIGHER_IS_BETTER = ("per_second", "recall", "speedup", "identical")
+LOWER_IS_BETTER = ("seconds", "queries", "_s", "_ms", "_mb", "ms_per_page", "_diff", "errors", "mismatches",
+                   "rejected_503")
+IDENTITY_NUMBERS = ("size", "concurrency", "components", "workers", "min_overlap", "top_n")
+# różnice czasu poniżej tej wartości (w jednostce metryki) to szum pomiaru
+MIN_TIME_DELTA = {"seconds": 0.002, "_s": 0.002, "_ms": 2.0, "ms_per_page": 2.0}
+
+
+def _is_metric(key, value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and key not in IDENTITY_NUMBERS
+
+
+def direction(key):
+    """
+    1 gdy większa wartość metryki jest lepsza, -1 gdy mniejsza, 0 dla metryk informacyjnych.
+    """
+    if any(marker in key for marker in HIGHER_IS_BETTER):
+        return 1
+    if any(key == marker or key.endswith(marker) for marker in LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def result_key(result):
+    # None to brakująca metryka (np. przepustowość przy zerowym czasie), nie pole opisowe
+    return tuple(sorted((k, str(v)) for k, v in result.items() if v is not None and not _is_metric(k, v)))
+
+
+def save(path, suites):
+    """
+    Zapisz wyniki {zestaw: [wynik, ...]} razem z opisem środowiska.
+    """
+    document = {
+        "created_at": timezone.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "database": connection.vendor,
+        "suites": suites,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)["suites"]
+
+
+def compare(baseline, current, threshold=0.25):
+    """
+    Porównaj wyniki {zestaw: [wynik, ...]}. Zwraca listę słowników opisujących zmiany metryk
+    (suite, benchmark, key, baseline, current, change, regression) dla wyników obecnych w obu.
+    """
+    changes = []
+    for suite, results in current.items():
+        previous = {result_key(r): r for r in baseline.get(suite, [])}
+        for result in results:
+            before = previous.get(result_key(result))
+            if before is None:
+                continue
+            for key, value in result.items():
+                old = before.get(key)
+                if not _is_metric(key, value) or not _is_metric(key, old):
+                    continue
+                sign = direction(key)
+                change = (value - old) / old if old else (0.0 if value == old else float("inf"))
+                floor = next((delta for marker, delta in MIN_TIME_DELTA.items() if key.endswith(marker)), 0)
+                regression = (
+                    sign != 0
+                    and -sign * change > threshold
+                    and abs(value - old) > floor
+                )
+                changes.append({
+                    "suite": suite,
+                    "benchmark": result.get("benchmark", suite),
+                    "size": result.get("size"),
+                    "key": key,
+                    "baseline": old,
+                    "current": value,
+                    "change": change,
+                    "regression": regression,
+                })
+    return changes
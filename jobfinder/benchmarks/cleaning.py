@@ -0,0 +1,32 @@
+# Benchmark czyszczenia opisów HTML: w procesie vs pula procesów (dobór SCRAPER_CLEAN_WORKERS)
+import os
+
+from jobfinder.benchmarks.synthetic import generate_offers
+from jobfinder.cleaning import DescriptionCleaner
+
+DEFAULT_SIZES = (200, 1000, 5000)
+
+
+def run(sizes=None, stdout=None):
+    results = []
+    worker_counts = sorted({1, 2, os.cpu_count() or 1})
+    for size in sizes or DEFAULT_SIZES:
+        raws = [offer["description"] for offer in generate_offers(size, seed=size)]
+        baseline = None
+        for workers in worker_counts:
+            cleaner = DescriptionCleaner(workers=workers, min_parallel=0)
+            cleaner.clean(raws[:workers * cleaner.chunk_size])  # rozgrzej pulę (start procesów)
+            cleaner.count, cleaner.seconds = 0, 0.0
+            cleaned = cleaner.clean(raws)
+            cleaner.close()
+            if baseline is None:
+                baseline = cleaned
+            results.append({
+                "benchmark": "cleaning",
+                "size": size,
+                "workers": workers,
+                "seconds": round(cleaner.seconds, 4),
+                "descriptions_per_second": round(cleaner.descriptions_per_second, 1),
+                "identical": cleaned == baseline,
+            })
+    return results
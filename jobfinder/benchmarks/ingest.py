@@ -0,0 +1,33 @@
+# Benchmark zapisu ofert (scrape_remotejobs._save_jobs): czas i liczba zapytań dla rosnących kanałów
+from jobfinder.benchmarks.synthetic import generate_offers
+from jobfinder.benchmarks.utils import measure
+from jobfinder.models import Job
+
+DEFAULT_SIZES = (100, 500, 1000)
+
+
+def run(sizes=None, stdout=None):
+    from jobfinder.management.commands.scrape_remotejobs import Command
+
+    results = []
+    for size in sizes or DEFAULT_SIZES:
+        Job.objects.all().delete()
+        offers = generate_offers(size, seed=size)
+        command = Command()
+
+        # insert: wszystkie oferty nowe; unchanged: ten sam kanał ponownie;
+        # update: zmieniona co druga oferta
+        changed = [dict(offer, position=f"{offer['position']} II") if i % 2 else offer for i, offer in enumerate(offers)]
+        for phase, feed in (("insert", offers), ("unchanged", offers), ("update", changed)):
+            (new, updated, unchanged), seconds, queries = measure(command._save_jobs, feed)
+            results.append({
+                "benchmark": f"ingest.{phase}",
+                "size": size,
+                "seconds": round(seconds, 4),
+                "queries": queries,
+                "offers_per_second": round(size / seconds, 1) if seconds else None,
+                "new": new,
+                "changed": updated,
+                "unchanged": unchanged,
+            })
+    return results
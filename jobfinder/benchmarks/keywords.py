@@ -0,0 +1,52 @@
+# Mikrobenchmark wykrywania poziomu i wymaganych lat: dotychczasowe wyszukiwanie
+# (osobny regex \bfraza\b dla każdego słowa kluczowego + EXPERIENCE_RE) kontra jeden przebieg
+# JOB_KEYWORDS (jobfinder/keywords.py). Sprawdza też, czy oba dają identyczne wyniki.
+import re
+import time
+
+from jobfinder.benchmarks.synthetic import generate_offers
+from jobfinder.features import (
+    EXPERIENCE_RE, SENIORITY_KEYWORDS, extract_job_keywords, flatten_tags, normalize_text,
+)
+
+DEFAULT_SIZES = (1000, 10000)
+
+
+def _legacy(head, text):
+    found = set()
+    for level, keys in SENIORITY_KEYWORDS.items():
+        for k in keys:
+            if re.search(rf"\b{re.escape(k)}\b", head):
+                found.add(level)
+    m = EXPERIENCE_RE.search(text)
+    return found, int(m.group(1)) if m else None
+
+
+def _automaton(head, text):
+    return extract_job_keywords(text, seniority_end=len(head))
+
+
+def run(sizes=None, stdout=None):
+    results = []
+    for size in sizes or DEFAULT_SIZES:
+        texts = []
+        for offer in generate_offers(size, seed=size):
+            head = f"{normalize_text(offer['position'])} {flatten_tags(offer['tags'])}"
+            texts.append((head, f"{head} {normalize_text(offer['description'])}"))
+
+        timings = {}
+        outputs = {}
+        for name, fn in (("legacy", _legacy), ("automaton", _automaton)):
+            started = time.perf_counter()
+            outputs[name] = [fn(head, text) for head, text in texts]
+            timings[name] = time.perf_counter() - started
+
+        results.append({
+            "benchmark": "keywords",
+            "size": size,
+            "legacy_ms": round(timings["legacy"] * 1000, 1),
+            "automaton_ms": round(timings["automaton"] * 1000, 1),
+            "speedup": round(timings["legacy"] / timings["automaton"], 2),
+            "mismatches": sum(a != b for a, b in zip(outputs["legacy"], outputs["automaton"])),
+        })
+    return results
@@ -0,0 +1,79 @@
+# Benchmark dwuetapowego dopasowania (jobfinder/retrieval.py) względem pełnego punktowania:
+# czas etapu punktowania na CV, odsetek ofert punktowanych w pełni i recall@n rankingu.
+# Mierzy samo punktowanie na zbudowanym indeksie (bez zapytań o oferty i zapisu rankingów).
+import time
+
+import numpy as np
+
+from jobfinder.benchmarks.synthetic import generate_cvs, generate_offers
+from jobfinder.match_jobs import cv_profile
+from jobfinder.models import Job
+from jobfinder.retrieval import candidate_rows, recall
+from jobfinder.scoring import score_jobs, top_k
+from jobfinder.tfidf_index import ensure_index
+from users.models import CV
+
+DEFAULT_SIZES = (5000, 20000)
+N_CVS = 20
+TOP_N = (10, 50)
+MIN_OVERLAP = (1, 2, 3)
+
+
+def _exhaustive(index, profile, similarities, top_n):
+    scores = score_jobs(index, profile, similarities)[0]
+    return top_k(np.round(scores * 100, 2), top_n)
+
+
+def _two_stage(index, profile, similarities, top_n, min_overlap):
+    rows = candidate_rows(index, profile, similarities, top_n, min_overlap=min_overlap, min_corpus=0)
+    scores = score_jobs(index, profile, similarities, rows)[0]
+    return rows[top_k(np.round(scores * 100, 2), top_n)], len(rows)
+
+
+def _time(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def run(sizes=None, stdout=None):
+    from jobfinder.management.commands.scrape_remotejobs import Command
+
+    results = []
+    for size in sizes or DEFAULT_SIZES:
+        Job.objects.all().delete()
+        Command()._save_jobs(generate_offers(size, seed=size))
+        index = ensure_index()
+        profiles = []
+        for fields in generate_cvs(N_CVS, seed=size):
+            cv_text, profile = cv_profile(CV(**fields))
+            profiles.append((profile, index.similarities(cv_text)))
+
+        for top_n in TOP_N:
+            exhaustive = []
+            for profile, similarities in profiles:
+                exhaustive.append(_time(_exhaustive, index, profile, similarities, top_n))
+            exhaustive_ms = sum(seconds for _, seconds in exhaustive) / len(profiles) * 1000
+
+            for min_overlap in MIN_OVERLAP:
+                seconds, recalls, fractions = 0.0, [], []
+                for (profile, similarities), (exact, _) in zip(profiles, exhaustive):
+                    (approximate, n_candidates), elapsed = _time(
+                        _two_stage, index, profile, similarities, top_n, min_overlap,
+                    )
+                    seconds += elapsed
+                    recalls.append(recall(exact.tolist(), approximate.tolist()))
+                    fractions.append(n_candidates / len(index))
+
+                results.append({
+                    "benchmark": "retrieval",
+                    "size": size,
+                    "top_n": top_n,
+                    "min_overlap": min_overlap,
+                    "exhaustive_ms": round(exhaustive_ms, 2),
+                    "two_stage_ms": round(seconds / len(profiles) * 1000, 2),
+                    "candidates_pct": round(float(np.mean(fractions)) * 100, 1),
+                    "recall_mean": round(float(np.mean(recalls)), 3),
+                    "recall_min": round(float(np.min(recalls)), 3),
+                })
+    return results
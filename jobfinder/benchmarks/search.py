@@ -0,0 +1,60 @@
+# Benchmark wyszukiwania listy ofert: dotychczasowe title__icontains kontra jobfinder/search.py
+# (PostgreSQL: search_vector + GIN; inne bazy: przenośny odpowiednik na icontains)
+import time
+
+from django.db import connection
+
+from jobfinder.benchmarks.synthetic import generate_offers
+from jobfinder.models import Job
+from jobfinder.pagination import DATE_ORDERING, keyset_page
+from jobfinder.search import SEARCH_ORDERING, search_jobs
+
+# Przy kilku tysiącach ofert planista PostgreSQL i tak wybiera skan sekwencyjny, a icontains mieści się
+# w pamięci podręcznej — różnica GIN / ILIKE widoczna jest dopiero przy korpusie rzędu produkcyjnego.
+DEFAULT_SIZES = (10_000, 100_000)
+QUERIES = ("python", "senior engineer", "react", "kubernetes aws", "data scien")
+REPEAT = 5
+PAGE_SIZE = 30
+
+
+def _legacy(q):
+    queryset = Job.objects.filter(status=Job.STATUS_ACTIVE, title__icontains=q)
+    return keyset_page(queryset, page_size=PAGE_SIZE, ordering=DATE_ORDERING), queryset.count()
+
+
+def _search(q):
+    queryset = search_jobs(Job.objects.filter(status=Job.STATUS_ACTIVE).defer("search_vector"), q)
+    return keyset_page(queryset, page_size=PAGE_SIZE, ordering=SEARCH_ORDERING), queryset.count()
+
+
+def _time(fn, q):
+    fn(q)  # rozgrzewka (cache planu/stron)
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        page, count = fn(q)
+    return (time.perf_counter() - started) / REPEAT, count
+
+
+def run(sizes=None, stdout=None):
+    from jobfinder.management.commands.scrape_remotejobs import Command
+
+    results = []
+    for size in sizes or DEFAULT_SIZES:
+        Job.objects.all().delete()
+        Command()._save_jobs(generate_offers(size, seed=size))
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE jobfinder_job")
+
+        for q in QUERIES:
+            for name, fn in (("icontains", _legacy), ("search", _search)):
+                seconds, count = _time(fn, q)
+                results.append({
+                    "benchmark": f"search.{name}",
+                    "backend": connection.vendor,
+                    "size": size,
+                    "q": q,
+                    "ms_per_page": round(seconds * 1000, 2),
+                    "hits": count,
+                })
+    return results
@@ -0,0 +1,82 @@
+# Benchmark silnika LSA (jobfinder/semantic.py) względem dokładnego podobieństwa TF-IDF:
+# czas liczenia podobieństwa na CV (TF-IDF, LSA dokładnie, LSA przez IVF), rozmiar danych,
+# recall sąsiadów IVF względem dokładnego LSA oraz recall@n końcowego rankingu względem
+# obecnej ścieżki (TF-IDF, pełne punktowanie).
+import time
+
+import numpy as np
+from django.test.utils import override_settings
+
+from jobfinder.benchmarks.synthetic import generate_cvs, generate_offers
+from jobfinder.match_jobs import cv_profile
+from jobfinder.models import Job
+from jobfinder.retrieval import candidate_rows, recall
+from jobfinder.scoring import score_jobs, top_k
+from jobfinder.tfidf_index import ensure_index
+from users.models import CV
+
+DEFAULT_SIZES = (5000, 20000)
+N_CVS = 20
+NEIGHBOURS = 200
+TOP_N = 10
+
+
+def _ranking(index, profile, similarities, rows=None):
+    scores = score_jobs(index, profile, similarities, rows)[0]
+    winners = top_k(np.round(scores * 100, 2), TOP_N)
+    return (winners if rows is None else rows[winners]).tolist()
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def run(sizes=None, stdout=None):
+    from jobfinder.management.commands.scrape_remotejobs import Command
+
+    results = []
+    for size in sizes or DEFAULT_SIZES:
+        Job.objects.all().delete()
+        Command()._save_jobs(generate_offers(size, seed=size))
+        tfidf = ensure_index(force=True)
+        with override_settings(MATCH_SIMILARITY="lsa"):
+            (lsa, build_seconds) = _timed(ensure_index, True)
+
+        totals = {"tfidf_ms": 0.0, "lsa_exact_ms": 0.0, "lsa_ann_ms": 0.0}
+        ann_recall, lsa_recall, two_stage_recall = [], [], []
+        for fields in generate_cvs(N_CVS, seed=size):
+            cv_text, profile = cv_profile(CV(**fields))
+
+            exact, seconds = _timed(tfidf.similarities, cv_text)
+            totals["tfidf_ms"] += seconds
+            # każdy czas obejmuje też wektoryzację CV
+            dense, seconds = _timed(lsa.similarities, cv_text)
+            totals["lsa_exact_ms"] += seconds
+            approximate, seconds = _timed(lambda: lsa.nearest(lsa.query(cv_text), NEIGHBOURS))
+            totals["lsa_ann_ms"] += seconds
+            query = lsa.query(cv_text)
+            ann_recall.append(recall(top_k(dense, NEIGHBOURS).tolist(), approximate.tolist()))
+
+            baseline = _ranking(tfidf, profile, exact)
+            lsa_recall.append(recall(baseline, _ranking(lsa, profile, dense)))
+            rows = candidate_rows(lsa, profile, None, TOP_N, neighbours=NEIGHBOURS, min_corpus=0, query=query)
+            two_stage_recall.append(
+                recall(baseline, _ranking(lsa, profile, lsa.query_similarities(query, rows), rows))
+            )
+
+        matrix = tfidf.matrix
+        results.append({
+            "benchmark": "semantic",
+            "size": size,
+            "components": lsa.manifest["lsa_components"],
+            "lsa_build_s": round(build_seconds, 2),
+            **{key: round(value / N_CVS * 1000, 2) for key, value in totals.items()},
+            "tfidf_mb": round((matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes) / 2**20, 1),
+            "lsa_mb": round(lsa.semantic.vectors.nbytes / 2**20, 1),
+            f"ann_recall@{NEIGHBOURS}": round(float(np.mean(ann_recall)), 3),
+            f"lsa_recall@{TOP_N}": round(float(np.mean(lsa_recall)), 3),
+            f"lsa_two_stage_recall@{TOP_N}": round(float(np.mean(two_stage_recall)), 3),
+        })
+    return results
@@ -0,0 +1,92 @@
+# Generator syntetycznych ofert w kształcie odpowiedzi API RemoteOK (deterministyczny dla danego seeda)
+import random
+from datetime import datetime, timedelta, timezone
+
+ROLES = [
+    "developer", "engineer", "data scientist", "devops engineer", "designer",
+    "product manager", "qa engineer", "data engineer", "support specialist", "architect",
+]
+LEVELS = ["", "", "junior", "senior", "lead", "mid", "intern", "principal", "staff"]
+TECH = [
+    "python", "django", "flask", "javascript", "typescript", "react", "vue", "node.js", "java",
+    "kotlin", "golang", "rust", "c++", "c#", ".net", "ruby", "rails", "php", "aws", "gcp",
+    "azure", "docker", "kubernetes", "terraform", "sql", "postgres", "mongodb", "redis",
+    "kafka", "spark", "pandas", "ml", "linux", "graphql", "ios", "android",
+]
+TAGS = ["remote", "full-time", "contract", "startup", "saas", "fintech", "crypto", "health", "ai"]
+LOCATIONS = [
+    "Remote", "Worldwide", "Remote - Europe", "Remote - US", "Berlin, Germany", "Warsaw, Poland",
+    "London, UK", "New York, NY", "San Francisco, CA", "Lisbon, Portugal", "", "Toronto, Canada",
+]
+FILLER = (
+    "We are a fast growing team building products used by millions of people. "
+    "You will collaborate with product, design and engineering to ship features end to end. "
+    "We value ownership, clear communication and pragmatic engineering. "
+    "Flexible hours, learning budget, home office allowance and a friendly async culture. "
+).split()
+
+
+def _description(rng, techs, role):
+    years = rng.choice([None, 1, 2, 3, 4, 5, 6, 8, 10])
+    parts = [
+        f"<h2>About the role</h2><p>We are hiring a <b>{role}</b> to join our team.</p>",
+        "<ul>" + "".join(f"<li>Experience with {t}</li>" for t in techs) + "</ul>",
+    ]
+    if years is not None:
+        parts.append(f"<p>{rng.choice(['Minimum ', '', 'At least '])}{years}+ years of experience.</p>")
+    parts.append("<p>" + " ".join(rng.choice(FILLER) for _ in range(rng.randint(40, 160))) + "</p>")
+    return "".join(parts)
+
+
+def generate_offers(n, seed=0, start=0):
+    """
+    Zwróć listę n ofert w formacie RemoteOK (bez pierwszego elementu z informacją prawną).
+    Oferty o tym samym numerze (start + i) mają ten sam URL, więc ponowne wygenerowanie
+    z tym samym seedem symuluje kolejny przebieg scrapera.
+    """
+    rng = random.Random(seed)
+    base_date = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    offers = []
+    for i in range(start, start + n):
+        role = rng.choice(ROLES)
+        level = rng.choice(LEVELS)
+        techs = rng.sample(TECH, rng.randint(2, 6))
+        position = f"{level} {role}".strip().title()
+        sal_min = rng.choice([0, 0, 40000, 60000, 80000, 100000])
+        offers.append({
+            "slug": f"{position.lower().replace(' ', '-')}-{i}",
+            "id": str(100000 + i),
+            "epoch": int((base_date + timedelta(hours=i)).timestamp()),
+            "date": (base_date + timedelta(hours=i)).isoformat(),
+            "company": f"Company {rng.randint(1, max(10, n // 5))}",
+            "company_logo": "",
+            "position": position,
+            "tags": techs + rng.sample(TAGS, rng.randint(0, 3)),
+            "description": _description(rng, techs, role),
+            "location": rng.choice(LOCATIONS),
+            "salary_min": sal_min,
+            "salary_max": sal_min + rng.choice([0, 20000, 40000]) if sal_min else 0,
+            "apply_url": f"https://remoteok.com/remote-jobs/{i}/apply",
+            "url": f"https://remoteok.com/remote-jobs/{i}",
+        })
+    return offers
+
+
+def generate_cvs(n, seed=0):
+    """
+    Zwróć listę n słowników z polami CV (users.models.CV) ze słownika ofert syntetycznych.
+    """
+    rng = random.Random(seed)
+    cvs = []
+    for i in range(n):
+        cvs.append({
+            "full_name": f"Candidate {i}",
+            "email": f"candidate{i}@example.com",
+            "skills": ", ".join(rng.sample(TECH, rng.randint(2, 5))),
+            "technologies": ", ".join(rng.sample(TECH, rng.randint(0, 4))),
+            "preferred_roles": ", ".join(rng.sample(ROLES, rng.randint(1, 2))),
+            "preferred_locations": rng.choice(["", "Berlin", "Warsaw, London", "Remote"]),
+            "experience_years": rng.choice([None, 0, 1, 2, 3, 5, 8, 12]),
+            "job_type_preference": rng.choice(["remote", "hybrid", "office"]),
+        })
+    return cvs
@@ -0,0 +1,51 @@
+# Wspólne narzędzia benchmarków: pomiar czasu i liczby zapytań, tymczasowa baza, katalogi danych i cache
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from jobfinder import match_cache
+
+
+def measure(fn, *args, **kwargs):
+    """
+    Wywołaj fn i zwróć (wynik, czas w sekundach, liczba zapytań SQL).
+    """
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+    return result, elapsed, len(queries)
+
+
+@contextmanager
+def benchmark_environment(keepdb=False):
+    """
+    Utwórz tymczasową bazę testową (jak manage.py test), osobne katalogi indeksu TF-IDF, stanu
+    odświeżania i cache HTTP scrapera oraz cache Django w pamięci procesu (LocMemCache dla każdego
+    aliasu z settings.CACHES), żeby benchmark nie czytał ani nie nadpisywał danych produkcyjnych.
+    """
+    data_dir = tempfile.mkdtemp(prefix="jobfinder-bench-")
+    caches = {
+        alias: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": f"jobfinder-bench-{alias}"}
+        for alias in settings.CACHES
+    }
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        with override_settings(
+            CACHES=caches,
+            MATCHER_INDEX_DIR=os.path.join(data_dir, "match_index"),
+            JOBS_REFRESH_STATE_DIR=os.path.join(data_dir, "refresh"),
+            SCRAPER_CACHE_DIR=os.path.join(data_dir, "http_cache"),
+        ):
+            match_cache.clear()
+            yield
+    finally:
+        match_cache.clear()
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        shutil.rmtree(data_dir, ignore_errors=True)
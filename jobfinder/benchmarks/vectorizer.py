@@ -0,0 +1,109 @@
+# Benchmark trybów wektoryzacji indeksu (MATCH_VECTORIZER): słownik n-gramów (TfidfVectorizer)
+# względem haszowania (jobfinder/hashing.py). Mierzy czas pełnej budowy, szczytową pamięć budowy
+# (tracemalloc, osobny przebieg), rozmiar stanu wektoryzatora i macierzy, czas przebudowy po
+# dodaniu ~5% nowych ofert oraz zmianę wyników: różnicę podobieństw i recall@n rankingu.
+import os
+import time
+import tracemalloc
+
+import numpy as np
+from django.test.utils import override_settings
+
+from jobfinder.benchmarks.synthetic import generate_cvs, generate_offers
+from jobfinder.match_jobs import cv_profile
+from jobfinder.models import Job
+from jobfinder.retrieval import recall
+from jobfinder.scoring import score_jobs, top_k
+from jobfinder.tfidf_index import ensure_index
+from users.models import CV
+
+DEFAULT_SIZES = (10000, 50000)
+N_CVS = 20
+TOP_N = 10
+GROWTH = 0.05
+
+
+def _build(mode):
+    with override_settings(MATCH_VECTORIZER=mode):
+        started = time.perf_counter()
+        index = ensure_index(force=True)
+        return index, time.perf_counter() - started
+
+
+def _peak_mb(mode):
+    tracemalloc.start()
+    try:
+        _build(mode)
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def _state_mb(index):
+    """
+    Stan wektoryzatora na dysku: słownik (vocabulary.json) albo tylko wektor IDF.
+    """
+    names = ["idf.npy", "vocabulary.json"]
+    return sum(
+        os.path.getsize(os.path.join(index.path, name))
+        for name in names if os.path.exists(os.path.join(index.path, name))
+    ) / 2**20
+
+
+def _matrix_mb(index):
+    matrix = index.matrix
+    return (matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes) / 2**20
+
+
+def _ranking(index, profile, similarities):
+    scores = score_jobs(index, profile, similarities)[0]
+    return top_k(np.round(scores * 100, 2), TOP_N).tolist()
+
+
+def run(sizes=None, stdout=None):
+    from jobfinder.management.commands.scrape_remotejobs import Command
+
+    results = []
+    for size in sizes or DEFAULT_SIZES:
+        Job.objects.all().delete()
+        Command()._save_jobs(generate_offers(size, seed=size))
+        vocabulary, vocabulary_s = _build("vocabulary")
+        hashed, hashed_s = _build("hashing")
+
+        sizes_mb = {
+            f"{name}_{mode}_mb": round(measure(index), 2)
+            for name, measure in (("state", _state_mb), ("matrix", _matrix_mb))
+            for mode, index in (("vocabulary", vocabulary), ("hashing", hashed))
+        }
+
+        drift, rank_recall = [], []
+        for fields in generate_cvs(N_CVS, seed=size):
+            cv_text, profile = cv_profile(CV(**fields))
+            exact = vocabulary.similarities(cv_text)
+            approximate = hashed.similarities(cv_text)
+            drift.append(float(np.abs(exact - approximate).max()))
+            rank_recall.append(recall(_ranking(vocabulary, profile, exact), _ranking(hashed, profile, approximate)))
+
+        peaks = {mode: _peak_mb(mode) for mode in ("vocabulary", "hashing")}
+
+        # przyrost korpusu: przebudowa haszowania po buildzie haszowania używa liczników ponownie
+        _build("hashing")
+        Command()._save_jobs(generate_offers(int(size * GROWTH), seed=size + 1, start=size))
+        rebuilt, rebuild_hashing_s = _build("hashing")
+        _, rebuild_vocabulary_s = _build("vocabulary")
+
+        results.append({
+            "benchmark": "vectorizer",
+            "size": size,
+            "build_vocabulary_s": round(vocabulary_s, 2),
+            "build_hashing_s": round(hashed_s, 2),
+            "rebuild_vocabulary_s": round(rebuild_vocabulary_s, 2),
+            "rebuild_hashing_s": round(rebuild_hashing_s, 2),
+            "reused_rows": rebuilt.manifest["reused_rows"],
+            "peak_vocabulary_mb": round(peaks["vocabulary"], 1),
+            "peak_hashing_mb": round(peaks["hashing"], 1),
+            **sizes_mb,
+            "max_similarity_diff": round(max(drift), 5),
+            f"recall@{TOP_N}": round(float(np.mean(rank_recall)), 3),
+        })
+    return results
@@ -0,0 +1,93 @@
+# Benchmark całego cyklu na syntetycznym korpusie (domyślnie 1k/10k/100k ofert): zapis kanału
+# (scrape_remotejobs._save_jobs), budowa indeksu, dopasowanie CV (match_jobs_to_cv: obliczenie,
+# zapisany ranking, cache), widok listy ofert (strona, wyszukiwanie, filtr tagu) oraz komendy
+# archive_old_jobs i delete_stale_jobs. Każdy pomiar to czas i liczba zapytań SQL; wyniki można
+# zapisać jako bazę odniesienia i porównać z kolejnym przebiegiem (benchmark --save / --compare).
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from jobfinder import match_cache
+from jobfinder.benchmarks.synthetic import generate_cvs, generate_offers
+from jobfinder.benchmarks.utils import measure
+from jobfinder.match_jobs import match_jobs_to_cv
+from jobfinder.models import Job, JobMatch
+from jobfinder.tfidf_index import ensure_index
+from users.models import CV
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+N_CVS = 5
+TOP_N = 10
+LIST_URLS = {
+    "page": "",
+    "search": "?q=senior+python",
+    "tag": "?tag=python",
+}
+
+
+def _result(name, size, seconds, queries, **extra):
+    return {"benchmark": f"workload.{name}", "size": size, "seconds": round(seconds, 4), "queries": queries, **extra}
+
+
+def _mean(name, size, calls):
+    """
+    Średni czas i liczba zapytań z listy wyników measure().
+    """
+    return _result(
+        name, size,
+        sum(seconds for _, seconds, _ in calls) / len(calls),
+        round(sum(queries for _, _, queries in calls) / len(calls), 1),
+    )
+
+
+def _age(queryset, days):
+    old = timezone.now() - timedelta(days=days)
+    return queryset.update(date_last_seen=old, date_posted=old)
+
+
+def run(sizes=None, stdout=None):
+    from jobfinder.management.commands.scrape_remotejobs import Command
+
+    results = []
+    for size in sizes or DEFAULT_SIZES:
+        Job.objects.all().delete()
+        CV.objects.all().delete()
+        cache.clear()
+        match_cache.clear()
+
+        _, seconds, queries = measure(Command()._save_jobs, generate_offers(size, seed=size))
+        results.append(_result("save_jobs", size, seconds, queries))
+        _, seconds, queries = measure(ensure_index, True)
+        results.append(_result("index_build", size, seconds, queries))
+
+        cvs = [CV.objects.create(**fields) for fields in generate_cvs(N_CVS, seed=size)]
+        results.append(_mean("match", size, [measure(match_jobs_to_cv, cv.id, TOP_N) for cv in cvs]))
+        match_cache.clear()
+        cache.clear()
+        results.append(_mean("match_stored", size, [measure(match_jobs_to_cv, cv.id, TOP_N) for cv in cvs]))
+        results.append(_mean("match_cached", size, [measure(match_jobs_to_cv, cv.id, TOP_N) for cv in cvs]))
+        JobMatch.objects.all().delete()
+
+        client = Client()
+        list_url = reverse("jobfinder:job_list")
+        for name, query in LIST_URLS.items():
+            cache.clear()
+            response, seconds, queries = measure(client.get, list_url + query)
+            assert response.status_code == 200, response.status_code
+            results.append(_result(f"job_list.{name}", size, seconds, queries))
+
+        # daty ofert syntetycznych są stałe: wszystkie świeże, połowa nieaktualna od 40 dni —
+        # archiwizowana, a potem (starsza niż 35 dni) usuwana
+        _age(Job.objects.all(), days=0)
+        ids = Job.objects.order_by("id").values_list("id", flat=True)
+        stale = _age(Job.objects.filter(id__lte=ids[size // 2 - 1]), days=40)
+        _, seconds, queries = measure(call_command, "archive_old_jobs", stdout=StringIO())
+        results.append(_result("archive_old_jobs", size, seconds, queries, rows=stale))
+        _, seconds, queries = measure(call_command, "delete_stale_jobs", stdout=StringIO())
+        results.append(_result("delete_stale_jobs", size, seconds, queries, rows=stale))
+    return results
@@ -0,0 +1,71 @@
+# Czyszczenie opisów ofert z HTML (ftfy + BeautifulSoup) — etap CPU-bound zapisu ofert.
+# Duże partie są rozdzielane porcjami na pulę procesów; małe czyścimy w bieżącym procesie,
+# bo start i komunikacja z pulą kosztują więcej niż samo czyszczenie. Wynik jest identyczny
+# w obu trybach (ta sama funkcja, pool.map zachowuje kolejność).
+# Moduł nie importuje Django, więc procesy potomne (spawn) startują szybko.
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import ftfy
+from bs4 import BeautifulSoup
+
+
+def clean_description(raw):
+    """
+    Tekst opisu bez HTML (napraw kodowanie, usuń znaczniki, zachowaj podziały linii).
+    """
+    clean = ftfy.fix_text(raw or "")
+    return BeautifulSoup(clean, "html.parser").get_text(separator="\n").strip()
+
+
+class DescriptionCleaner:
+    """
+    Czyści opisy partiami, opcjonalnie w puli `workers` procesów (0 = liczba rdzeni).
+    Partie mniejsze niż `min_parallel` są czyszczone w bieżącym procesie.
+    Zlicza opisy i czas czyszczenia (descriptions_per_second) do doboru wielkości puli.
+    """
+
+    def __init__(self, workers=1, chunk_size=50, min_parallel=200):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.min_parallel = min_parallel
+        self.count = 0
+        self.seconds = 0.0
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            # spawn zamiast fork: scraper może mieć działające wątki (równoległe pobieranie źródeł)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def clean(self, raws):
+        raws = list(raws)
+        started = time.perf_counter()
+        if self.workers > 1 and len(raws) >= max(self.min_parallel, 2):
+            cleaned = list(self._get_pool().map(clean_description, raws, chunksize=self.chunk_size))
+        else:
+            cleaned = [clean_description(raw) for raw in raws]
+        self.seconds += time.perf_counter() - started
+        self.count += len(raws)
+        return cleaned
+
+    @property
+    def descriptions_per_second(self):
+        return self.count / self.seconds if self.seconds else 0.0
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,155 @@
+# Ekstrakcja cech ofert pracy wykorzystywanych przez matcher.
+# Cechy liczymy raz przy zapisie oferty (scraper) i przechowujemy w JobFeatures,
+# dzięki czemu match_jobs_to_cv nie musi ponownie przetwarzać surowego tekstu.
+import re
+
+from jobfinder.keywords import KeywordMatcher
+from jobfinder.models import Job, JobFeatures
+
+# Zwiększ przy każdej zmianie reguł ekstrakcji — starsze rekordy zostaną przeliczone
+FEATURES_VERSION = 1
+
+SENIORITY_LEVELS = ("intern", "junior", "mid", "senior")
+
+SENIORITY_KEYWORDS = {
+    "intern": {"intern", "internship", "trainee"},
+    "junior": {"junior", "jr", "associate", "entry", "graduate"},
+    "mid": {"mid", "intermediate", "regular"},
+    "senior": {"senior", "sr", "lead", "principal", "staff"},
+}
+
+# common patterns: "5 years", "5+ years", "6+ years of experience", "minimum 4 years"
+EXPERIENCE_PATTERN = r"(?:(?:minimum|min|min\.)\s*)?(?P<years>\d{1,2})\s*\+?\s*(?:\+|\s)?\s*(?:years|yrs)\b"
+EXPERIENCE_RE = re.compile(EXPERIENCE_PATTERN)
+
+# Poziomy i wymagane lata wykrywane jednym przebiegiem tekstu (jobfinder/keywords.py)
+JOB_KEYWORDS = KeywordMatcher(SENIORITY_KEYWORDS, {"experience": EXPERIENCE_PATTERN})
+
+# Słowa znormalizowanego tekstu (normalize_text): ciągi [a-z0-9] odpowiadają granicom \b, więc
+# słowo z indeksu słów tytułów (tfidf_index) pasuje dokładnie tam, gdzie regex \bsłowo\b
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+# funkcja normalizacji tekstu
+def normalize_text(text: str) -> str:
+    if not text:
+        return ""
+    text = text.lower()
+    # keep letters, numbers, +, #, -, . and spaces (preserve common tech names)
+    text = re.sub(r"[^a-z0-9+#\-\.\s]+", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
+
+
+def split_set(text):
+    if not text:
+        return set()
+    tokens = re.findall(r"[a-z0-9+#\-\.]+", normalize_text(text))
+    return set(t for t in tokens if t)
+
+
+def extract_job_keywords(text, seniority_end=None):
+    """
+    Poziomy zaawansowania i wymagane lata (albo None) z jednego przebiegu tekstu.
+    Poziomy są brane tylko z pierwszych `seniority_end` znaków (np. tytuł i tagi) — ten fragment
+    przechodzi JOB_KEYWORDS; w dalszej części potrzebne jest już tylko pierwsze wystąpienie lat,
+    więc wyszukiwanie kończy się na pierwszym trafieniu.
+    """
+    if not text:
+        return set(), None
+    end = len(text) if seniority_end is None else seniority_end
+    levels = set()
+    years = None
+    last = 0
+    for label, match in JOB_KEYWORDS.scan(text, endpos=end):
+        last = match.end()
+        if label != "experience":
+            levels.add(label)
+        elif years is None:
+            years = int(match.group("years"))
+    if years is None and end < len(text):
+        # od końca ostatniego trafienia: łapie też wzorzec zaczynający się przed `end`
+        match = EXPERIENCE_RE.search(text, last)
+        years = int(match.group("years")) if match else None
+    return levels, years
+
+
+def detect_job_seniority(text):
+    return extract_job_keywords(text)[0]
+
+
+# wykryj wymagane lata w tekście oferty, zwróć minimalną liczbę całkowitą jeśli znaleziono
+def detect_required_experience(text):
+    return extract_job_keywords(text)[1]
+
+
+# Spłaszcz tagi z Job.attributes (lista stringów lub słowników) do jednego znormalizowanego tekstu
+def flatten_tags(attributes) -> str:
+    if not isinstance(attributes, list):
+        return ""
+    tag_parts = []
+    for t in attributes:
+        if isinstance(t, dict):
+            tag_parts.append(t.get("slug") or t.get("name") or "")
+        else:
+            tag_parts.append(str(t))
+    return " ".join(normalize_text(p) for p in tag_parts if p)
+
+
+def build_job_features(job: Job) -> JobFeatures:
+    """
+    Zbuduj (niezapisany) rekord JobFeatures dla oferty.
+    """
+    title = normalize_text(job.title or "")
+    desc = normalize_text(job.description or "")
+    tags = flatten_tags(job.attributes)
+    head = f"{title} {tags}"
+    seniority, required_experience = extract_job_keywords(f"{head} {desc}", seniority_end=len(head))
+
+    return JobFeatures(
+        job=job,
+        version=FEATURES_VERSION,
+        title=title,
+        tags=tags,
+        description=desc,
+        tokens=sorted(split_set(title) | split_set(tags)),
+        seniority=sorted(seniority),
+        required_experience=required_experience,
+        location=normalize_text(job.location or ""),
+    )
+
+
+FEATURE_FIELDS = [
+    "version", "title", "tags", "description", "tokens",
+    "seniority", "required_experience", "location", "updated_at",
+]
+
+
+def refresh_job_features(jobs, batch_size=500):
+    """
+    Przelicz i zapisz cechy dla podanych ofert jednym zapytaniem upsert na partię.
+    Zwraca listę zapisanych rekordów JobFeatures.
+    """
+    features = [build_job_features(job) for job in jobs]
+    if features:
+        JobFeatures.objects.bulk_create(
+            features,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["job"],
+            update_fields=FEATURE_FIELDS,
+        )
+    return features
+
+
+def get_job_features(job: Job):
+    """
+    Zwróć aktualne cechy oferty lub None, jeśli brakuje ich albo są w starej wersji.
+    """
+    try:
+        features = job.features
+    except JobFeatures.DoesNotExist:
+        return None
+    if features.version != FEATURES_VERSION:
+        return None
+    return features
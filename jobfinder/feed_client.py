@@ -0,0 +1,270 @@
+# Warstwa HTTP dla scrapera: warunkowe pobieranie (ETag / If-Modified-Since), kompresja transferu,
+# dyskowy cache odpowiedzi oraz tryb odtwarzania nagranych migawek kanału (testy i benchmarki offline).
+# Moduł nie zależy od Django, więc korzysta z niego też jobfinder/inspect_api.py.
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import requests
+
+
+READ_SIZE = 64 * 1024
+SPOOL_MAX_SIZE = 8 * 1024 * 1024  # większe odpowiedzi strumieniowe trafiają do pliku tymczasowego
+
+
+class FeedDeadlineExceeded(requests.Timeout):
+    """
+    Pobieranie trwało dłużej niż `deadline` klienta (np. serwer przesyła treść bardzo powoli).
+    """
+
+
+class FeedResponse:
+    """
+    Treść kanału. not_modified=True oznacza 304 — treść się nie zmieniła i nie trzeba jej parsować.
+    W trybie strumieniowym treść nie jest trzymana w `content`, tylko w pliku (`body`);
+    open() zwraca strumień bajtów w obu przypadkach.
+    """
+
+    def __init__(self, content=None, not_modified=False, etag=None, last_modified=None, source=None, body=None):
+        self.content = content
+        self.body = body
+        self.not_modified = not_modified
+        self.etag = etag
+        self.last_modified = last_modified
+        self.source = source  # "network", "replay"
+
+    def open(self):
+        if self.body is None:
+            return io.BytesIO(self.content)
+        self.body.seek(0)
+        return self.body
+
+    def json(self):
+        if self.body is None:
+            return json.loads(self.content)
+        return json.load(self.open())
+
+    def close(self):
+        if self.body is not None:
+            self.body.close()
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _open_body(path):
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+
+def _read_body(path):
+    with _open_body(path) as f:
+        return f.read()
+
+
+def content_etag(content: bytes) -> str:
+    return '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+
+
+def stream_etag(stream) -> str:
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(READ_SIZE), b""):
+        digest.update(chunk)
+    return '"%s"' % digest.hexdigest()[:32]
+
+
+class FeedClient:
+    """
+    Pobiera kanał JSON spod `url`.
+
+    cache_dir   — katalog na ETag/Last-Modified i ostatnią treść; włącza żądania warunkowe.
+    replay_path — plik lub katalog z nagranymi migawkami (*.json / *.json.gz); kolejne wywołania
+                  fetch() zwracają kolejne migawki zamiast łączyć się z siecią.
+    record_dir  — zapisuj każdą pobraną (200) treść jako migawkę do późniejszego odtworzenia.
+    timeout     — limit requests na połączenie i na każdy odczyt z gniazda.
+    deadline    — limit (s) całego pobrania; treść jest czytana porcjami, więc serwer przesyłający
+                  ją po kawałku nie zablokuje pobierania dłużej niż deadline (FeedDeadlineExceeded).
+    """
+
+    def __init__(self, url, user_agent, cache_dir=None, timeout=20,
+                 replay_path=None, record_dir=None, session=None, deadline=None):
+        self.url = url
+        self.timeout = timeout
+        self.deadline = deadline
+        self.record_dir = record_dir
+        self.cache_dir = (
+            os.path.join(cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest()[:16])
+            if cache_dir else None
+        )
+        self.replay = self._snapshots(replay_path) if replay_path else None
+        self.session = session or requests.Session()
+        self.session.headers.update({
+            "User-Agent": user_agent,
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        })
+        # czas poprzedniego udanego pobrania/walidacji (przed bieżącym fetch)
+        self.previous_validated_at = None
+        self._pending = None
+
+    # --- cache ---
+
+    def _meta_path(self):
+        return os.path.join(self.cache_dir, "meta.json")
+
+    def _body_path(self):
+        return os.path.join(self.cache_dir, "body.json.gz")
+
+    def _load_meta(self):
+        if not self.cache_dir:
+            return {}
+        try:
+            with open(self._meta_path()) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_meta(self, meta):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{self._meta_path()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, self._meta_path())
+
+    def _save_body(self, response):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{self._body_path()}.tmp"
+        with gzip.open(tmp, "wb", compresslevel=5) as f:
+            shutil.copyfileobj(response.open(), f, READ_SIZE)
+        os.replace(tmp, self._body_path())
+
+    def cached_content(self):
+        """
+        Ostatnia pobrana treść z dyskowego cache (np. do ponownego przetworzenia po 304) lub None.
+        """
+        if not self.cache_dir or not os.path.exists(self._body_path()):
+            return None
+        return _read_body(self._body_path())
+
+    # --- nagrywanie / odtwarzanie ---
+
+    @staticmethod
+    def _snapshots(path):
+        if os.path.isdir(path):
+            names = sorted(n for n in os.listdir(path) if n.endswith((".json", ".json.gz")))
+            return [os.path.join(path, n) for n in names]
+        return [path]
+
+    def _record(self, response):
+        os.makedirs(self.record_dir, exist_ok=True)
+        name = f"snapshot-{_now().strftime('%Y%m%dT%H%M%S%f')}.json.gz"
+        with gzip.open(os.path.join(self.record_dir, name), "wb") as f:
+            shutil.copyfileobj(response.open(), f, READ_SIZE)
+
+    def _fetch_replay(self, meta, stream=False):
+        # kolejna migawka; po ostatniej zostajemy na niej (kanał przestaje się zmieniać)
+        path = self.replay.pop(0) if len(self.replay) > 1 else self.replay[0]
+        if stream:
+            with _open_body(path) as f:
+                etag = stream_etag(f)
+        else:
+            content = _read_body(path)
+            etag = content_etag(content)
+        if etag == meta.get("etag"):
+            return FeedResponse(not_modified=True, etag=etag, source="replay")
+        if stream:
+            return FeedResponse(body=_open_body(path), etag=etag, source="replay")
+        return FeedResponse(content, etag=etag, source="replay")
+
+    def _chunks(self, r, started):
+        for chunk in r.iter_content(READ_SIZE):
+            if self.deadline is not None and time.monotonic() - started > self.deadline:
+                raise FeedDeadlineExceeded(f"{self.url} was not downloaded within {self.deadline}s")
+            yield chunk
+
+    def _spool(self, r, started):
+        # odpowiedź czytana porcjami do pliku tymczasowego (w pamięci tylko do SPOOL_MAX_SIZE)
+        body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        try:
+            for chunk in self._chunks(r, started):
+                body.write(chunk)
+        except BaseException:
+            body.close()
+            raise
+        return body
+
+    # --- pobieranie ---
+
+    def fetch(self, stream=False) -> FeedResponse:
+        """
+        Pobierz kanał. stream=True nie trzyma treści w pamięci — czytaj ją przez response.open().
+        """
+        meta = self._load_meta()
+        validated_at = meta.get("validated_at")
+        self.previous_validated_at = datetime.fromisoformat(validated_at) if validated_at else None
+        started_at = _now()
+
+        if self.replay is not None:
+            response = self._fetch_replay(meta, stream=stream)
+        else:
+            headers = {}
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+            started = time.monotonic()
+            # treść zawsze czytana porcjami, żeby sprawdzać deadline między odczytami
+            r = self.session.get(self.url, headers=headers, timeout=self.timeout, stream=True)
+            try:
+                if r.status_code == 304:
+                    response = FeedResponse(
+                        not_modified=True,
+                        etag=meta.get("etag"),
+                        last_modified=meta.get("last_modified"),
+                        source="network",
+                    )
+                else:
+                    r.raise_for_status()
+                    response = FeedResponse(
+                        None if stream else b"".join(self._chunks(r, started)),
+                        etag=r.headers.get("ETag"),
+                        last_modified=r.headers.get("Last-Modified"),
+                        source="network",
+                        body=self._spool(r, started) if stream else None,
+                    )
+            finally:
+                r.close()
+
+        if not response.not_modified and self.record_dir:
+            self._record(response)
+
+        self._pending = (response, started_at)
+        return response
+
+    def commit(self):
+        """
+        Zapisz walidatory i treść ostatniego fetch() w cache. Wywołaj dopiero po udanym przetworzeniu
+        kanału — inaczej kolejne żądanie dostałoby 304 dla treści, której nie zapisaliśmy.
+        """
+        if not self.cache_dir or self._pending is None:
+            return
+        response, started_at = self._pending
+        meta = self._load_meta()
+        if not response.not_modified:
+            self._save_body(response)
+            meta = {
+                "url": self.url,
+                "etag": response.etag,
+                "last_modified": response.last_modified,
+                "fetched_at": started_at.isoformat(),
+            }
+        meta["validated_at"] = started_at.isoformat()
+        self._save_meta(meta)
+        self._pending = None
@@ -0,0 +1,102 @@
+# Lokalny serwer zastępczy dla API RemoteOK: serwuje nagrane migawki kanału z dysku
+# (obsługuje ETag/If-None-Match, If-Modified-Since i gzip), aby scraper można było testować
+# i benchmarkować bez sieci: scrape_remotejobs --url http://127.0.0.1:8765/api
+import gzip
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from jobfinder.feed_client import FeedClient, _read_body, content_etag
+
+
+class SnapshotFeed:
+    """
+    Kolejne migawki z pliku/katalogu; każde pełne żądanie przechodzi do następnej (ostatnia zostaje).
+    """
+
+    def __init__(self, path):
+        self.paths = FeedClient._snapshots(path)
+        self.position = 0
+        self.lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        self.content = _read_body(self.paths[self.position])
+        self.etag = content_etag(self.content)
+        self.last_modified = formatdate(usegmt=True)
+
+    def advance(self):
+        with self.lock:
+            if self.position < len(self.paths) - 1:
+                self.position += 1
+                self._load()
+
+
+def make_handler(feed, delay=0.0):
+
+    class SnapshotHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if delay:
+                threading.Event().wait(delay)  # symulacja opóźnienia sieci
+
+            with feed.lock:
+                content, etag, last_modified = feed.content, feed.etag, feed.last_modified
+
+            if self._not_modified(etag, last_modified):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            body = content
+            encoding = None
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(content)
+                encoding = "gzip"
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            self.end_headers()
+            self.wfile.write(body)
+            feed.advance()
+
+        def _not_modified(self, etag, last_modified):
+            if_none_match = self.headers.get("If-None-Match")
+            if if_none_match is not None:
+                return if_none_match == etag
+            if_modified_since = self.headers.get("If-Modified-Since")
+            if if_modified_since:
+                try:
+                    return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+                except (TypeError, ValueError):
+                    return False
+            return False
+
+        def log_message(self, format, *args):
+            pass
+
+    return SnapshotHandler
+
+
+def make_server(path, host="127.0.0.1", port=0, delay=0.0):
+    """
+    Utwórz (nieuruchomiony) serwer migawek; port=0 wybiera wolny port (server.server_address).
+    """
+    return ThreadingHTTPServer((host, port), make_handler(SnapshotFeed(path), delay=delay))
+
+
+def start_background_server(path, host="127.0.0.1", port=0, delay=0.0):
+    """
+    Uruchom serwer w wątku w tle (testy, benchmarki). Zwraca (server, url); zatrzymaj server.shutdown().
+    """
+    server = make_server(path, host, port, delay)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/api"
@@ -0,0 +1,126 @@
+# Tryb wektoryzacji z haszowaniem (MATCH_VECTORIZER = "hashing") dla bardzo dużych korpusów.
+# Zamiast słownika wszystkich unigramów i bigramów (TfidfVectorizer) cechy to stała przestrzeń
+# MATCH_HASHING_FEATURES kubełków (HashingVectorizer), a IDF to zapisany wektor float32 tej
+# długości — pamięć wektoryzatora nie rośnie z korpusem. Macierze są float32.
+# Haszowanie jest bezstanowe, więc przy przebudowie indeksu liczniki wyrazów ofert niezmienionych
+# od poprzedniego buildu (ten sam JobFeatures.updated_at) są kopiowane, a tokenizowane są tylko
+# nowe i zmienione oferty; IDF i normalizacja to potem operacje wektorowe na licznikach.
+# Kolizje kubełków zmieniają wyniki względem trybu słownikowego (benchmark: vectorizer).
+import json
+import os
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+
+class HashedTfidf:
+    """
+    Wektoryzator zapytań zgodny z TF-IDF indeksu: haszowane liczniki * idf, normalizacja L2.
+    """
+
+    def __init__(self, n_features, idf, ngram_range=(1, 2), stop_words="english"):
+        self.n_features = n_features
+        self.idf_ = idf
+        self.hasher = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=tuple(ngram_range),
+            stop_words=stop_words,
+            alternate_sign=False,
+            norm=None,
+            dtype=np.float32,
+        )
+
+    def counts(self, texts):
+        return self.hasher.transform(texts).tocsr()
+
+    def weight(self, counts):
+        # mnożenie danych w miejscu zamiast iloczynu z macierzą diagonalną — bez kopii pośrednich
+        matrix = counts.astype(np.float32, copy=True)
+        matrix.data *= self.idf_[matrix.indices]
+        matrix.eliminate_zeros()  # kubełki z idf = 0 (spoza korpusu, max_df)
+        return normalize(matrix, copy=False)
+
+    def transform(self, texts):
+        return self.weight(self.counts(texts))
+
+
+def compute_idf(counts, max_df=1.0):
+    """
+    IDF jak w TfidfVectorizer (smooth_idf): ln((1 + n) / (1 + df)) + 1. Kubełki nieobecne
+    w korpusie albo częstsze niż max_df dostają 0 — jak słowa spoza słownika.
+    """
+    n_docs = counts.shape[0]
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log((1 + n_docs) / (1 + df)) + 1
+    idf[(df == 0) | (df > max_df * n_docs)] = 0
+    return idf.astype(np.float32)
+
+
+def load_counts(path, n_features):
+    """
+    Liczniki wyrazów ofert z poprzedniego buildu w trybie haszowania: (job_ids, stamps, counts)
+    albo None, jeśli build jest w innym trybie lub ma inną liczbę kubełków.
+    """
+    try:
+        with open(os.path.join(path, "manifest.json")) as f:
+            manifest = json.load(f)
+        if manifest.get("vectorizer") != "hashing" or manifest.get("n_features") != n_features:
+            return None
+
+        def load(name):
+            return np.load(os.path.join(path, name), mmap_mode="r")
+
+        counts = sparse.csr_matrix(
+            (load("tf_data.npy"), load("tf_indices.npy"), load("tf_indptr.npy")),
+            shape=(manifest["n_jobs"], n_features),
+        )
+        return load("job_ids.npy"), load("stamps.npy"), counts
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def fit(texts, job_ids, stamps, n_features, params, previous=None):
+    """
+    Zwróć (wektoryzator, znormalizowana macierz TF-IDF float32, liczniki, liczba ponownie użytych
+    wierszy). `previous` to wynik load_counts() poprzedniego buildu.
+    """
+    vectorizer = HashedTfidf(n_features, None, params["ngram_range"], params["stop_words"])
+    job_ids = np.asarray(job_ids, dtype=np.int64)
+    stamps = np.asarray(stamps, dtype=np.float64)
+
+    reuse = np.zeros(len(job_ids), dtype=bool)
+    previous_rows = np.empty(0, dtype=np.int64)
+    if previous is not None:
+        prev_ids, prev_stamps, prev_counts = previous
+        # job_ids obu buildów są posortowane rosnąco
+        position = np.searchsorted(prev_ids, job_ids).clip(max=max(len(prev_ids) - 1, 0))
+        if len(prev_ids):
+            reuse = (prev_ids[position] == job_ids) & (prev_stamps[position] == stamps)
+        previous_rows = position[reuse]
+
+    fresh = np.flatnonzero(~reuse)
+    if not len(previous_rows):
+        counts = vectorizer.counts(texts)
+    else:
+        parts = [prev_counts[previous_rows]]
+        if len(fresh):
+            parts.append(vectorizer.counts([texts[i] for i in fresh]))
+        counts = sparse.vstack(parts, format="csr", dtype=np.float32)
+        # wiersze w kolejności job_ids: najpierw ponownie użyte, potem nowe
+        order = np.concatenate([np.flatnonzero(reuse), fresh])
+        counts = counts[np.argsort(order, kind="stable")]
+    counts.sort_indices()
+
+    vectorizer.idf_ = compute_idf(counts, params.get("max_df", 1.0))
+    matrix = vectorizer.weight(counts)
+    matrix.sort_indices()
+    return vectorizer, matrix, counts, int(reuse.sum())
+
+
+def save_counts(path, counts, stamps):
+    np.save(os.path.join(path, "tf_data.npy"), counts.data.astype(np.float32))
+    np.save(os.path.join(path, "tf_indices.npy"), counts.indices)
+    np.save(os.path.join(path, "tf_indptr.npy"), counts.indptr)
+    np.save(os.path.join(path, "stamps.npy"), np.asarray(stamps, dtype=np.float64))
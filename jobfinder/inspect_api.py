@@ -1,34 +1,37 @@
 '''
 Szybki skrypt do sprawdzenia struktury odpowiedzi API RemoteOK.
 Pobiera dane API i drukuje czytelny, sformatowany JSON, abyś mógł sprawdzić klucze i zawartość.
+Uruchom z katalogu projektu: python -m jobfinder.inspect_api [plik_lub_katalog_migawek]
 '''
 
+import os
 import requests
 import json
 import sys
 
+from jobfinder.feed_client import FeedClient
+
 
 # Punkt końcowy API RemoteOK
 API_URL = "https://remoteok.com/api"
 
 
-HEADERS = {
-    "User-Agent": "API-Inspector-Script/1.0"
-}
+USER_AGENT = "API-Inspector-Script/1.0"
+
+# Ten sam dyskowy cache co scraper: przy 304 pokazujemy ostatnią zapisaną odpowiedź
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "http_cache", "inspect")
 
-def inspect_remoteok_api():
+def inspect_remoteok_api(replay_path=None):
     """
-    Wywołaj API RemoteOK, zweryfikuj odpowiedź i wydrukuj przyjazną dla człowieka analizę
-    plus pełny ładnie sformatowany JSON.
+    Wywołaj API RemoteOK (lub odtwórz nagraną migawkę), zweryfikuj odpowiedź i wydrukuj
+    przyjazną dla człowieka analizę plus pełny ładnie sformatowany JSON.
     """
-    print(f"Łączenie z punktem końcowym API: {API_URL}")
+    print(f"Łączenie z punktem końcowym API: {replay_path or API_URL}")
+    client = FeedClient(API_URL, USER_AGENT, cache_dir=CACHE_DIR, timeout=20, replay_path=replay_path)
 
     try:
-        # Wykonaj żądanie GET z timeoutem, aby nie wisiało w nieskończoność.
-        response = requests.get(API_URL, headers=HEADERS, timeout=20)
-
-        # Jeśli serwer odpowiedział błędnym statusem, wywołaj wyjątek.
-        response.raise_for_status()
+        # Żądanie warunkowe z timeoutem; błędny status serwera wywołuje wyjątek.
+        response = client.fetch()
 
     except requests.exceptions.HTTPError as e:
         print(f"\nBłąd HTTP: Serwer zwrócił kod statusu {e.response.status_code}")
@@ -41,16 +44,22 @@ def inspect_remoteok_api():
         print(f"   Szczegóły błędu: {e}")
         sys.exit(1)
 
-    print(f"Sukces! Otrzymano odpowiedź (Kod statusu: {response.status_code}).")
+    content = response.content
+    if response.not_modified:
+        print("Odpowiedź się nie zmieniła (304) — używam zapisanej kopii z cache.")
+        content = client.cached_content()
+    else:
+        print(f"Sukces! Otrzymano odpowiedź ({response.source}).")
+    client.commit()
     print("Parsowanie danych JSON...")
 
     try:
         # Parsuj ciało odpowiedzi jako JSON.
-        data = response.json()
-    except json.JSONDecodeError:
+        data = json.loads(content)
+    except (json.JSONDecodeError, TypeError):
         print("\nJSON Error: The response from the API was not valid JSON.")
         print("Raw Response Text (first 500 characters)")
-        print(response.text[:500])
+        print((content or b"")[:500].decode("utf-8", errors="replace"))
         sys.exit(1)
 
     # Odpowiedź sparsowana pomyślnie — podaj szybką analizę.
@@ -78,4 +87,4 @@ def inspect_remoteok_api():
 
 
 if __name__ == "__main__":
-    inspect_remoteok_api()
\ No newline at end of file
+    inspect_remoteok_api(sys.argv[1] if len(sys.argv) > 1 else None)
\ No newline at end of file
@@ -0,0 +1,149 @@
+# Strumieniowe czytanie dużych kanałów i zrzutów JSON element po elemencie, bez wczytywania
+# całości do pamięci (pamięć zależy od rozmiaru pojedynczej oferty, nie całego pliku).
+# Obsługiwane formaty: tablica JSON, obiekt JSON z tablicą pod wskazanym kluczem oraz NDJSON
+# (jeden obiekt w linii). Tylko biblioteka standardowa — json.JSONDecoder.raw_decode na buforze.
+import gzip
+import io
+import json
+
+READ_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+class _Reader:
+    """
+    Bufor tekstu doczytywany porcjami; pozycja `pos` wskazuje pierwszy nieprzetworzony znak.
+    """
+
+    def __init__(self, stream, read_size):
+        self.stream = stream
+        self.read_size = read_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        # odrzuć przetworzony początek, żeby bufor nie rósł z rozmiarem pliku
+        if self.pos:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        chunk = self.stream.read(self.read_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer += chunk
+        return True
+
+    def peek(self):
+        """
+        Pierwszy znak niebędący białym znakiem (bez jego konsumowania) lub "" na końcu pliku.
+        """
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars):
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r} in JSON stream, got {char or 'EOF'!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """
+        Zdekoduj kolejną wartość JSON, doczytując dane, dopóki nie jest kompletna.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # liczba na końcu bufora mogła zostać ucięta — upewnij się, że nic po niej nie dochodzi
+            if end == len(self.buffer) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _open_text(source):
+    """
+    Strumień tekstowy dla ścieżki, bajtów lub obiektu plikowego; zwraca (stream, owned).
+    """
+    if hasattr(source, "read"):
+        stream, owned = source, False
+    elif isinstance(source, bytes):
+        stream, owned = io.BytesIO(source), True
+    else:
+        stream, owned = (gzip.open(source, "rb") if source.endswith(".gz") else open(source, "rb")), True
+    if isinstance(stream.read(0), bytes):
+        stream = io.TextIOWrapper(stream, encoding="utf-8")
+    return stream, owned
+
+
+def _iter_array(reader):
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(",]") == "]":
+            return
+
+
+def is_ndjson_path(path):
+    return isinstance(path, str) and path.removesuffix(".gz").endswith((".ndjson", ".jsonl"))
+
+
+def iter_json_items(source, key=None, ndjson=None, read_size=READ_SIZE):
+    """
+    Zwracaj kolejne elementy kanału z pliku (ścieżka, także .gz), obiektu plikowego lub bajtów.
+
+    - tablica JSON: kolejne elementy tablicy,
+    - obiekt JSON: elementy tablicy pod kluczem `key` (pozostałe pola są pomijane),
+    - NDJSON: kolejne obiekty (po jednym w linii); wymuszane przez ndjson=True
+      albo rozszerzenie .ndjson / .jsonl, bo linia NDJSON też zaczyna się od "{".
+    """
+    if ndjson is None:
+        ndjson = is_ndjson_path(source)
+    stream, owned = _open_text(source)
+    reader = _Reader(stream, read_size)
+    try:
+        first = reader.peek()
+        if first == "[" and not ndjson:
+            yield from _iter_array(reader)
+        elif first == "{" and key is not None and not ndjson:
+            yield from _iter_object_key(reader, key)
+        else:
+            # NDJSON (lub pojedynczy obiekt): kolejne wartości aż do końca pliku
+            while reader.peek():
+                yield reader.value()
+    finally:
+        if owned:
+            stream.close()
+        elif stream is not source:
+            stream.detach()  # nie zamykaj strumienia należącego do wywołującego
+
+
+def _iter_object_key(reader, key):
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        name = reader.value()
+        reader.expect(":")
+        if name == key and reader.peek() == "[":
+            yield from _iter_array(reader)
+            return
+        reader.value()  # pomiń wartość innego pola
+        if reader.expect(",}") == "}":
+            return
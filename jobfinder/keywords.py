@@ -0,0 +1,79 @@
+# Wielowzorcowe wyszukiwanie słów kluczowych w jednym przebiegu tekstu.
+# Słownik {etykieta: frazy} jest zamieniany na jedno wyrażenie: frazy każdej etykiety tworzą
+# drzewo prefiksowe (trie) zapisane jako regex ze wspólnymi prefiksami (intern(?:ship)?),
+# a etykiety są alternatywami z nazwanymi grupami. Wyrażenie jest kompilowane raz na proces;
+# scan() przechodzi tekst raz (w C) i zwraca trafienia wszystkich etykiet z pozycjami,
+# zamiast osobnego re.search dla każdej frazy. Granice \b są takie same jak w pojedynczych
+# wzorcach \bfraza\b, więc wyniki odpowiadają dotychczasowym funkcjom.
+import re
+from functools import lru_cache
+
+
+def trie_pattern(phrases) -> str:
+    """
+    Regex (bez grup przechwytujących) pasujący dokładnie do jednej z fraz; wspólne prefiksy
+    są wyłączone przed nawias, więc dopasowanie nie cofa się do każdej frazy osobno.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node):
+        terminal = "" in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return body + "?" if len(branches) > 1 else f"(?:{body})?"
+        return body
+
+    return render(trie)
+
+
+class KeywordMatcher:
+    """
+    Skompilowany zestaw etykiet: `keywords` — etykieta -> frazy dopasowywane jako całe słowa,
+    `patterns` — etykieta -> własny regex (może mieć nazwane grupy, np. liczbę lat).
+    Nazwy etykiet muszą być poprawnymi nazwami grup regex.
+    """
+
+    def __init__(self, keywords=None, patterns=None):
+        alternatives = []
+        # wszystkie etykiety słów w jednej grupie \b...\b — granice sprawdzane raz na pozycję
+        words = [
+            f"(?P<{label}>{trie_pattern(sorted({p for p in phrases if p}))})"
+            for label, phrases in (keywords or {}).items()
+            if any(phrases)
+        ]
+        if words:
+            alternatives.append(f"\\b(?:{'|'.join(words)})\\b")
+        for label, pattern in (patterns or {}).items():
+            alternatives.append(f"(?P<{label}>{pattern})")
+        self.labels = [*(keywords or {}), *(patterns or {})]
+        self.regex = re.compile("|".join(alternatives)) if alternatives else None
+
+    def scan(self, text, pos=0, endpos=None):
+        """
+        Trafienia w text[pos:endpos] w kolejności występowania jako (etykieta, re.Match).
+        Trafienia nie nachodzą na siebie (przy wspólnej pozycji wygrywa pierwsza etykieta).
+        """
+        if not text or self.regex is None:
+            return []
+        endpos = len(text) if endpos is None else endpos
+        return [(match.lastgroup, match) for match in self.regex.finditer(text, pos, endpos)]
+
+    def labels_in(self, text):
+        return {label for label, _ in self.scan(text)}
+
+
+@lru_cache(maxsize=256)
+def phrase_regex(phrases):
+    """
+    Skompilowany \\b(?:fraza1|fraza2...)\\b dla krotki fraz — np. ról z CV; jedna kompilacja
+    na zestaw fraz w procesie i jeden przebieg tekstu zamiast regexa na każdą frazę.
+    """
+    return re.compile(rf"\b{trie_pattern(phrases)}\b")
@@ -0,0 +1,88 @@
+# Cykl życia ofert: archiwizacja ofert niewidzianych/starych i usuwanie starych zarchiwizowanych.
+# Zmiany są wykonywane partiami (każda partia to osobna, krótka instrukcja), więc blokady nie są
+# trzymane na całej tabeli. Partie wyznacza keyset po id: kolejne batch_size identyfikatorów
+# spełniających warunek powyżej ostatniego id — bez wstępnego COUNT/MIN/MAX i bez pustych partii
+# przy rzadkich id. Tryb dry_run przechodzi te same partie, niczego nie zmieniając.
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from jobfinder.models import Job
+
+ARCHIVE_AFTER_DAYS = 30  # aktywne oferty niewidziane/opublikowane dawniej są archiwizowane
+DELETE_AFTER_DAYS = 35  # zarchiwizowane oferty starsze niż to są usuwane
+BATCH_SIZE = 1000
+
+
+class LifecycleResult:
+    """
+    Wynik jednej operacji: liczba ofert (zmienionych albo — przy dry_run — do zmiany) i partii.
+    """
+
+    def __init__(self, action, threshold, dry_run):
+        self.action = action
+        self.threshold = threshold
+        self.dry_run = dry_run
+        self.count = 0
+        self.batches = 0
+
+    def __repr__(self):
+        return f"<LifecycleResult {self.action} count={self.count} batches={self.batches} dry_run={self.dry_run}>"
+
+
+def _expired(status, threshold):
+    # każda gałąź OR ma własny indeks złożony: (status, date_last_seen) i (status, date_posted)
+    return Job.objects.filter(status=status).filter(
+        Q(date_last_seen__lt=threshold) | Q(date_posted__lt=threshold)
+    )
+
+
+def _run(action, queryset, apply, batch_size, dry_run, threshold):
+    result = LifecycleResult(action, threshold, dry_run)
+    last = 0
+    while True:
+        ids = list(queryset.filter(id__gt=last).order_by("id").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return result
+        last = ids[-1]
+        # warunek jest sprawdzany ponownie — oferta mogła się zmienić od odczytu id
+        affected = len(ids) if dry_run else apply(queryset.filter(id__in=ids))
+        result.batches += 1
+        result.count += affected
+
+
+def archive_jobs(now=None, batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Zarchiwizuj aktywne oferty niewidziane lub opublikowane ponad ARCHIVE_AFTER_DAYS dni temu.
+    """
+    threshold = (now or timezone.now()) - timedelta(days=ARCHIVE_AFTER_DAYS)
+    return _run(
+        "archive",
+        _expired(Job.STATUS_ACTIVE, threshold),
+        lambda batch: batch.update(status=Job.STATUS_ARCHIVED),
+        batch_size,
+        dry_run,
+        threshold,
+    )
+
+
+def delete_jobs(now=None, batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Usuń zarchiwizowane oferty niewidziane lub opublikowane ponad DELETE_AFTER_DAYS dni temu
+    (razem z ich cechami, dopasowaniami i tagami — kaskadowo).
+    """
+    threshold = (now or timezone.now()) - timedelta(days=DELETE_AFTER_DAYS)
+
+    def delete(batch):
+        _, per_model = batch.delete()
+        return per_model.get(Job._meta.label, 0)
+
+    return _run(
+        "delete",
+        _expired(Job.STATUS_ARCHIVED, threshold),
+        delete,
+        batch_size,
+        dry_run,
+        threshold,
+    )
@@ -1,39 +1,166 @@
 # Konfiguruj logowanie dla aplikacji JobFinder
-import logging # standardowy moduł logowania
-from logging.handlers import RotatingFileHandler # do rotacji plików logów
+# Rekordy nie są zapisywane w wątku, który loguje: loggery mają jeden wspólny QueueHandler, a pliki
+# (RotatingFileHandler) i konsolę obsługuje wątek QueueListener. Formatowanie wiadomości też
+# odbywa się w tym wątku — argumenty będące prostymi wartościami (str, liczby, None) są
+# przekazywane bez formatowania, inne obiekty są zamieniane na tekst od razu, bo mogą się zmienić.
+# setup_logger() jest idempotentne: plik logu ma jeden handler, a logger jeden QueueHandler,
+# niezależnie od liczby wywołań (moduły i komendy wołają je przy imporcie).
+# Proces potomny (fork) przy pierwszym logu uruchamia własny wątek listenera.
+import atexit
+import copy
+import logging  # standardowy moduł logowania
 import os
+import queue
+import random
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler  # kolejka i rotacja plików logów
 
 # Pobierz katalog bazowy i utwórz folder logs
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 LOG_DIR = os.path.join(BASE_DIR, "logs")
 os.makedirs(LOG_DIR, exist_ok=True)
 
-def setup_logger(name, log_file, level=logging.INFO, max_bytes=5_000_000, backup_count=3):
+FILE_FORMAT = "[%(asctime)s] %(levelname)s %(name)s: %(message)s"
+CONSOLE_FORMAT = "%(levelname)s %(name)s: %(message)s"
+CONSOLE_LEVEL = logging.INFO  # śledzenie DEBUG trafia tylko do plików
+
+LAZY_ARG_TYPES = (str, int, float, bool, type(None))
+
+_lock = threading.RLock()
+_routes = {}  # nazwa loggera -> handlery docelowe (plik + konsola)
+_file_handlers = {}  # plik logu -> RotatingFileHandler
+_console = None
+_handler = None
+_listener = None
+_listener_pid = None
+
+
+class RoutingHandler(logging.Handler):
+    """
+    Handler w wątku listenera: przekazuje rekord do handlerów zarejestrowanych dla jego loggera.
+    """
+
+    def emit(self, record):
+        for handler in _routes.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler bez formatowania w wątku wywołującym (standardowy prepare() formatuje od razu).
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.args and not all(isinstance(arg, LAZY_ARG_TYPES) for arg in _args(record.args)):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            # ślad stosu jako tekst — bez przytrzymywania ramek do czasu zapisu
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if _listener_pid != os.getpid():
+            _start_listener()
+        super().enqueue(record)
+
+
+def _args(args):
+    return args.values() if isinstance(args, dict) else args
+
+
+def _start_listener():
+    global _listener, _listener_pid
+    with _lock:
+        if _listener_pid == os.getpid():
+            return
+        # po fork() wątek listenera rodzica nie istnieje w dziecku — nowa kolejka i nowy wątek
+        _handler.queue = queue.Queue()
+        _listener = QueueListener(_handler.queue, RoutingHandler())
+        _listener.start()
+        _listener_pid = os.getpid()
+
+
+def queue_handler():
+    """
+    Wspólny QueueHandler procesu (także dla LOGGING w settings.py: "()": ta funkcja).
     """
-    Utwórz i skonfiguruj logger z wyjściem do pliku i konsoli.
+    global _handler
+    with _lock:
+        if _handler is None:
+            _handler = LazyQueueHandler(queue.Queue())
+        return _handler
+
+
+def _file_handler(log_file, max_bytes, backup_count):
+    handler = _file_handlers.get(log_file)
+    if handler is None:
+        handler = _file_handlers[log_file] = RotatingFileHandler(
+            os.path.join(LOG_DIR, log_file),
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+        )
+        handler.setFormatter(logging.Formatter(FILE_FORMAT, datefmt="%Y-%m-%d %H:%M:%S"))
+    return handler
+
+
+def _console_handler():
+    global _console
+    if _console is None:
+        _console = logging.StreamHandler()
+        _console.setLevel(CONSOLE_LEVEL)
+        _console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+    return _console
+
+
+def setup_logger(name, log_file, level=None, max_bytes=5_000_000, backup_count=3):
+    """
+    Skonfiguruj logger z wyjściem do pliku i konsoli przez kolejkę i wątek listenera.
     Pliki są rotowane po osiągnięciu max_bytes, zachowując do backup_count plików.
+    Bez `level` zostaje poziom z LOGGING (settings.py), a gdy go brak — INFO.
     """
     logger = logging.getLogger(name)
-    logger.setLevel(level)
+    with _lock:
+        _routes[name] = (_file_handler(log_file, max_bytes, backup_count), _console_handler())
+        handler = queue_handler()
+        if handler not in logger.handlers:
+            logger.addHandler(handler)
+    if level is not None:
+        logger.setLevel(level)
+    elif logger.level == logging.NOTSET:
+        logger.setLevel(logging.INFO)
     logger.propagate = False
+    return logger
 
-    # Set up file handler with rotation
-    file_handler = RotatingFileHandler(
-        os.path.join(LOG_DIR, log_file),
-        maxBytes=max_bytes,
-        backupCount=backup_count
-    )
-    file_formatter = logging.Formatter(
-        "[%(asctime)s] %(levelname)s %(name)s: %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
-    file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
-
-    # Skonfiguruj handler konsoli dla wyjścia terminala
-    console_handler = logging.StreamHandler()
-    console_formatter = logging.Formatter("%(levelname)s %(name)s: %(message)s")
-    console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
 
-    return logger
+def flush_logs():
+    """
+    Poczekaj, aż listener zapisze wszystkie rekordy z kolejki (np. przed końcem komendy lub w testach).
+    """
+    if _handler is not None and _listener_pid == os.getpid():
+        _handler.queue.join()
+        for handler in list(_file_handlers.values()) + [_console]:
+            if handler is not None:
+                handler.flush()
+
+
+def stop_listener():
+    global _listener, _listener_pid
+    with _lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            _listener.stop()  # zapisuje rekordy pozostałe w kolejce
+        _listener = None
+        _listener_pid = None
+
+
+atexit.register(stop_listener)
+
+
+def sampled(rate) -> bool:
+    """
+    Czy włączyć śledzenie dla tego zdarzenia: rate = 0 — nigdy, 1 — zawsze, pomiędzy — losowo.
+    """
+    return rate >= 1 or (rate > 0 and random.random() < rate)
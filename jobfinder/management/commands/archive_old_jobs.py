@@ -1,9 +1,9 @@
-from datetime import timedelta 
-from django.utils import timezone
 from django.core.management.base import BaseCommand #Wkonanie tego pliku osobno jako komenda zarzadzania
-from django.db.models import Q
-from jobfinder.models import Job
+from jobfinder.lifecycle import BATCH_SIZE, archive_jobs
 from jobfinder.logging_config import setup_logger
+from jobfinder.metrics import ROWS_WRITTEN, StageTimer
+from jobfinder.tfidf_index import ensure_index
+from jobfinder.tags import refresh_tag_counts
 
 # Ustawienia loggera
 logger = setup_logger("archiver", "archive.log")
@@ -11,29 +11,33 @@ logger = setup_logger("archiver", "archive.log")
 
 class Command(BaseCommand):
 
-    def handle(self, *args, **options):
-        # archiwizuj oferty pracy niewidziane/opublikowane od 30 dni
-        threshold = timezone.now() - timedelta(days=30)
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only count jobs that would be archived.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Jobs changed per batch.")
 
-        self.stdout.write(f"Archiving jobs older than {threshold.isoformat()} ...")
+    def handle(self, *args, **options):
+        # archiwizuj oferty pracy niewidziane/opublikowane od 30 dni, partiami po batch_size id
+        timer = StageTimer("archive")
+        with timer.stage("archive"):
+            result = archive_jobs(batch_size=options["batch_size"], dry_run=options["dry_run"])
 
-        # Wybierz oferty aktywne, które są starsze niż próg
-        qs = Job.objects.filter(
-            status=Job.STATUS_ACTIVE
-        ).filter(
-            Q(date_last_seen__lt=threshold) | Q(date_posted__lt=threshold)
-        )
+        self.stdout.write(f"Archiving jobs older than {result.threshold.isoformat()} ...")
 
-        count = qs.count()
+        if options["dry_run"]:
+            self.stdout.write(f"Dry run: {result.count} jobs would be archived.")
+            return
 
-        # Jeśli są jakieś oferty do zarchiwizowania, zaktualizuj ich status
-        if count:
-            qs.update(status=Job.STATUS_ARCHIVED)
-            msg = f"Archived {count} stale jobs."
-            logger.info(msg)
+        # Jeśli były jakieś oferty do zarchiwizowania
+        if result.count:
+            ROWS_WRITTEN.inc(result.count, operation="archive")
+            msg = f"Archived {result.count} stale jobs in {result.batches} batches."
             self.stdout.write(self.style.SUCCESS(msg))
+
+            # Zarchiwizowane oferty wypadają z korpusu matchera
+            with timer.stage("index"):
+                ensure_index()
+            with timer.stage("tag_counts"):
+                refresh_tag_counts()
+            logger.info("%s (%s)", msg, timer.summary())
         else:
             self.stdout.write(self.style.SUCCESS("No stale jobs found."))
-
-
-
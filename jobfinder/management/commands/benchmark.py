@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from jobfinder.benchmarks import SUITES, baseline
+from jobfinder.benchmarks.utils import benchmark_environment
+
+
+# Komenda uruchamiająca benchmarki na tymczasowej bazie testowej (bez sieci)
+class Command(BaseCommand):
+    help = "Run performance benchmarks against a throwaway test database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("suites", nargs="*", help=f"Suites to run (default: all). Available: {', '.join(SUITES)}")
+        parser.add_argument("--sizes", nargs="+", type=int, help="Corpus/feed sizes to benchmark.")
+        parser.add_argument("--save", metavar="PATH", help="Write the results to a JSON baseline file.")
+        parser.add_argument("--compare", metavar="PATH", help="Compare the results with a saved JSON baseline.")
+        parser.add_argument(
+            "--threshold", type=float, default=0.25,
+            help="Relative change of a metric counted as a regression in --compare mode (default: 0.25).",
+        )
+
+    def handle(self, *args, **options):
+        names = options["suites"] or list(SUITES)
+        unknown = [name for name in names if name not in SUITES]
+        if unknown:
+            raise CommandError(f"Unknown benchmark suite(s): {', '.join(unknown)}")
+        reference = baseline.load(options["compare"]) if options["compare"] else None
+
+        results = {}
+        with benchmark_environment():
+            for name in names:
+                self.stdout.write(f"Running {name} ...")
+                results[name] = SUITES[name](sizes=options["sizes"], stdout=self.stdout)
+                for result in results[name]:
+                    self.stdout.write(
+                        "  " + "  ".join(f"{key}={value}" for key, value in result.items())
+                    )
+
+        if options["save"]:
+            baseline.save(options["save"], results)
+            self.stdout.write(f"Saved baseline to {options['save']}")
+        if reference is not None:
+            self._report(baseline.compare(reference, results, options["threshold"]))
+
+    def _report(self, changes):
+        regressions = [change for change in changes if change["regression"]]
+        self.stdout.write(f"Compared {len(changes)} metrics with the baseline.")
+        for change in regressions:
+            self.stdout.write(self.style.ERROR(
+                f"  REGRESSION {change['benchmark']} size={change['size']} {change['key']}: "
+                f"{change['baseline']} -> {change['current']} ({change['change']:+.0%})"
+            ))
+        if regressions:
+            raise CommandError(f"{len(regressions)} metric(s) regressed beyond the threshold.")
+        self.stdout.write(self.style.SUCCESS("No regressions."))
@@ -1,37 +1,41 @@
-from datetime import timedelta
-from django.utils import timezone
 from django.core.management.base import BaseCommand
-from django.db.models import Q
-from jobfinder.models import Job
+from jobfinder.lifecycle import BATCH_SIZE, delete_jobs
 from jobfinder.logging_config import setup_logger
+from jobfinder.metrics import ROWS_WRITTEN, StageTimer
+from jobfinder.tfidf_index import ensure_index
 
 logger = setup_logger("deleter", "delete.log")
 
 
 # Komenda do usuwania starych zarchiwizowanych ofert pracy
 class Command(BaseCommand):
-    
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only count jobs that would be deleted.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Jobs changed per batch.")
+
     # Metoda obsługująca komendę
     def handle(self, *args, **options):
-        # Ustaw próg usunięcia na 35 dni temu
-        delete_threshold = timezone.now() - timedelta(days=35)
-        # Wyszukaj zarchiwizowane oferty starsze niż próg
-        self.stdout.write(f"Searching for archived jobs with date < {delete_threshold.isoformat()} ...")
-
-        # Zapytanie do bazy danych dla zarchiwizowanych ofert
-        qs = Job.objects.filter(
-            status=Job.STATUS_ARCHIVED
-        ).filter(
-            Q(date_last_seen__lt=delete_threshold) | Q(date_posted__lt=delete_threshold)
-        )
-
-        # Liczba znalezionych ofert
-        count = qs.count()
-
-        # Jeśli znaleziono oferty, usuń je
-        if count:
-            logger.info("Deleting %s archived jobs older than %s", count, delete_threshold.isoformat())
-            qs.delete()
-            self.stdout.write(self.style.SUCCESS(f"Deleted {count} stale jobs."))
+        # Usuń zarchiwizowane oferty starsze niż 35 dni, partiami po batch_size id;
+        # liczba usuniętych ofert pochodzi z samych DELETE
+        timer = StageTimer("delete")
+        with timer.stage("delete"):
+            result = delete_jobs(batch_size=options["batch_size"], dry_run=options["dry_run"])
+        self.stdout.write(f"Searching for archived jobs with date < {result.threshold.isoformat()} ...")
+
+        if options["dry_run"]:
+            self.stdout.write(f"Dry run: {result.count} jobs would be deleted.")
+            return
+
+        # Jeśli znaleziono oferty, zostały usunięte
+        if result.count:
+            ROWS_WRITTEN.inc(result.count, operation="delete")
+            self.stdout.write(self.style.SUCCESS(f"Deleted {result.count} stale jobs."))
+
+            # Przebuduj indeks tylko jeśli zmienił się aktywny korpus
+            with timer.stage("index"):
+                ensure_index()
+            logger.info("Deleted %s archived jobs older than %s in %s batches (%s)",
+                        result.count, result.threshold.isoformat(), result.batches, timer.summary())
         else:
             self.stdout.write(self.style.SUCCESS("No jobs deleted."))
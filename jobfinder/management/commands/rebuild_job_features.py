@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from jobfinder.models import Job, JobFeatures
+from jobfinder.features import FEATURES_VERSION, refresh_job_features
+from jobfinder.tfidf_index import ensure_index
+from jobfinder.logging_config import setup_logger
+
+logger = setup_logger("matcher", "matcher.log")
+
+
+# Komenda do przeliczenia cech ofert po zmianie reguł ekstrakcji (FEATURES_VERSION)
+class Command(BaseCommand):
+    help = "Rebuild precomputed job features used by the matcher."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale-only",
+            action="store_true",
+            help="Only rebuild features that are missing or built by older extraction rules.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        qs = Job.objects.order_by("id")
+        if options["stale_only"]:
+            current = JobFeatures.objects.filter(version=FEATURES_VERSION).values("job_id")
+            qs = qs.exclude(id__in=current)
+
+        self.stdout.write(f"Rebuilding job features (version {FEATURES_VERSION}) ...")
+
+        total = 0
+        batch = []
+        for job in qs.iterator(chunk_size=batch_size):
+            batch.append(job)
+            if len(batch) >= batch_size:
+                total += len(refresh_job_features(batch, batch_size=batch_size))
+                batch = []
+        if batch:
+            total += len(refresh_job_features(batch, batch_size=batch_size))
+
+        msg = f"Rebuilt features for {total} jobs."
+        logger.info(msg)
+        self.stdout.write(self.style.SUCCESS(msg))
+
+        # Nowe cechy zmieniają teksty ofert, więc indeks TF-IDF też musi zostać przebudowany
+        if total:
+            ensure_index()
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from jobfinder.tfidf_index import ensure_index
+from jobfinder.logging_config import setup_logger
+
+logger = setup_logger("matcher", "matcher.log")
+
+
+# Komenda do ręcznej przebudowy indeksu TF-IDF używanego przez matcher
+class Command(BaseCommand):
+    help = "Rebuild the on-disk TF-IDF index used by the matcher."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild even if the active corpus has not changed since the last build.",
+        )
+
+    def handle(self, *args, **options):
+        index = ensure_index(force=options["force"])
+        if index is None:
+            self.stdout.write(self.style.WARNING("No active jobs, index not built."))
+            return
+
+        msg = f"TF-IDF index {index.build_id} ready: {len(index)} jobs, {index.manifest['n_features']} features."
+        logger.info(msg)
+        self.stdout.write(self.style.SUCCESS(msg))
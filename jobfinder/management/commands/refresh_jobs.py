@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from jobfinder.refresh import REFRESH_DONE, REFRESH_LOCKED, refresh_jobs
+
+
+# Komenda uruchamiana przez cron (CRONJOBS): scrapowanie + archiwizacja + usuwanie ofert
+class Command(BaseCommand):
+    help = "Refresh job offers (scrape, archive, delete) unless a refresh ran recently or is running."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Ignore JOBS_REFRESH_MIN_INTERVAL (a running refresh is never interrupted).",
+        )
+
+    def handle(self, *args, **options):
+        status = refresh_jobs(force=options["force"], stdout=self.stdout)
+
+        if status == REFRESH_DONE:
+            self.stdout.write(self.style.SUCCESS("Job refresh finished."))
+        elif status == REFRESH_LOCKED:
+            self.stdout.write(self.style.WARNING("Another job refresh is running."))
+        else:
+            self.stdout.write(self.style.WARNING("Jobs were refreshed recently, skipping."))
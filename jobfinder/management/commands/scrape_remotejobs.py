@@ -1,11 +1,20 @@
-import requests # do wykonywania żądań HTTP
-from bs4 import BeautifulSoup # do parsowania zawartości HTML
-import ftfy # do parsowania zawartości HTML
-from django.core.management.base import BaseCommand # klasa bazowa dla komend zarządzania
+import hashlib # odciski ofert do wykrywania zmian
+import json
+import os
+import time # pomiar czasów źródeł
+from itertools import islice
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError # klasa bazowa dla komend zarządzania
 from django.db import transaction # do atomowych transakcji bazy danych
 from jobfinder.models import Job
-from datetime import datetime # do obsługi daty i czasu
+from jobfinder.features import refresh_job_features # cechy ofert dla matchera
+from jobfinder.tags import refresh_tag_counts, sync_job_tags # znormalizowane tagi i facety
+from jobfinder.cleaning import DescriptionCleaner, clean_description # czyszczenie HTML opisów (pula procesów)
+from jobfinder.tfidf_index import ensure_index # indeks TF-IDF dla matchera
+from jobfinder.sources import SOURCES, RemoteOKSource, fetch_sources, get_sources # rejestr źródeł ofert
+from datetime import datetime, timezone as dt_timezone # do obsługi daty i czasu
 from jobfinder.logging_config import setup_logger # własne ustawienia loggera
+from jobfinder.metrics import ROWS_WRITTEN, StageTimer # czasy etapów i liczniki zapisów
 from django.utils import timezone
 
 logger = setup_logger("scraper", "scraper.log")
@@ -13,110 +22,371 @@ logger = setup_logger("scraper", "scraper.log")
 
 class Command(BaseCommand):
 
-    API_URL = "https://remoteok.com/api"
-    USER_AGENT = "JobFinderApp/1.0"
+    BATCH_SIZE = 1000  # liczba ofert zapisywanych jednym upsertem
+
+    # Kolumny nadpisywane, gdy oferta o danym job_url już istnieje
+    UPDATE_FIELDS = [
+        "title", "company", "location", "attributes", "salary",
+        "description", "date_posted", "status", "date_last_seen", "content_hash", "source",
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source", action="append", choices=sorted(SOURCES),
+            help="Source to scrape (repeatable; default: all sources enabled in JOB_SOURCES).",
+        )
+        parser.add_argument("--workers", type=int, default=None, help="Number of sources fetched concurrently.")
+        parser.add_argument("--url", default=None, help="Feed URL override (single source only).")
+        parser.add_argument(
+            "--replay", default=None,
+            help="Serve the feed from a recorded snapshot file/directory (one subdirectory per source when scraping several).",
+        )
+        parser.add_argument("--record", default=None, help="Save every downloaded feed as a snapshot in this directory.")
+        parser.add_argument("--no-cache", action="store_true", help="Disable conditional requests and the response cache.")
+        parser.add_argument(
+            "--stream", action="store_true",
+            help="Parse feeds item by item from a temporary file instead of loading them into memory.",
+        )
+        parser.add_argument(
+            "--dump", default=None,
+            help="Import a (large) JSON/NDJSON dump file in the source's feed format (.ndjson/.jsonl, optionally .gz) with bounded memory.",
+        )
+        parser.add_argument("--batch-size", type=int, default=None, help=f"Offers saved per batch (default {self.BATCH_SIZE}).")
+        parser.add_argument(
+            "--clean-workers", type=int, default=None,
+            help="Processes used to clean HTML descriptions (0 = all cores, 1 = in-process; default SCRAPER_CLEAN_WORKERS).",
+        )
 
     # Główny punkt wejścia dla komendy
     def handle(self, *args, **options):
         logger.info("Starting job scrape...")
+        # czyszczenie opisów współdzielone przez wszystkie partie (i źródła) przebiegu;
+        # pulę procesów zamyka _report_cleaning()
+        self.cleaner = self._make_cleaner(options.get("clean_workers"))
 
         try:
-            jobs = self._fetch_jobs()
-            if not jobs:
-                self.stdout.write(self.style.WARNING("No job data returned."))
+            sources = get_sources(options.get("source"))
+            if options.get("url"):
+                if len(sources) > 1:
+                    raise ValueError("--url can only be used with a single --source")
+                sources[0].url = options["url"]
+
+            if options.get("dump"):
+                if len(sources) > 1:
+                    raise ValueError("--dump can only be used with a single --source")
+                self._import_dump(sources[0], options["dump"], options.get("batch_size"))
                 return
 
-            new_count, update_count = self._save_jobs(jobs)
+            started = time.perf_counter()
+            totals = [0, 0, 0]
+            failed = []
+            # źródła pobierane są równolegle; zapis (jedyny etap korzystający z bazy) idzie w tym wątku,
+            # w kolejności ukończenia pobierania
+            for result in fetch_sources(sources, self._client_options(options, len(sources) > 1), options.get("workers")):
+                counts = self._process_result(result, options.get("batch_size"))
+                if counts is None:
+                    failed.append(result.name)
+                    continue
+                totals = [total + count for total, count in zip(totals, counts)]
+            elapsed = time.perf_counter() - started
+
+            new_count, changed_count, unchanged_count = totals
+            # Korpus się zmienił — przebuduj indeks TF-IDF, aby matcher nie robił tego przy żądaniu,
+            # i przelicz liczby ofert na tag
+            if new_count or changed_count:
+                timer = StageTimer("scrape")
+                with timer.stage("index"):
+                    ensure_index()
+                with timer.stage("tag_counts"):
+                    refresh_tag_counts()
+                logger.info("Post-scrape refresh: %s", timer.summary())
 
             self.stdout.write(
                 self.style.SUCCESS(
-                    f"Done. Added {new_count} new jobs, updated {update_count}."
+                    f"Done in {elapsed:.2f}s. Added {new_count} new jobs, updated {changed_count} changed, "
+                    f"{unchanged_count} unchanged."
                 )
             )
+            # przebieg bez żadnego udanego źródła to błąd (refresh_jobs nie uzna danych za świeże);
+            # awaria części źródeł jest tylko logowana
+            if failed and len(failed) == len(sources):
+                raise CommandError(f"All sources failed: {', '.join(sorted(failed))}")
 
         except Exception as e:
-            logger.error(f"Error: {e}", exc_info=True)
+            logger.error("Error: %s", e, exc_info=True)
             self.stderr.write(self.style.ERROR(str(e)))
+            if isinstance(e, CommandError):
+                raise
+            raise CommandError(str(e)) from e
+        finally:
+            self._report_cleaning()
 
-    # Skontaktuj się z API RemoteOK i zwróć sparsowaną listę JSON (pomiń pierwszy element meta).
+    @staticmethod
+    def _make_cleaner(workers=None):
+        return DescriptionCleaner(
+            workers=settings.SCRAPER_CLEAN_WORKERS if workers is None else workers,
+            chunk_size=settings.SCRAPER_CLEAN_CHUNK_SIZE,
+            min_parallel=settings.SCRAPER_CLEAN_MIN_PARALLEL,
+        )
 
-    def _fetch_jobs(self):
-        session = requests.Session()
-        session.headers.update({"User-Agent": self.USER_AGENT})
+    # Przepustowość czyszczenia opisów — pomaga dobrać SCRAPER_CLEAN_WORKERS
+    def _report_cleaning(self):
+        cleaner = getattr(self, "cleaner", None)
+        if cleaner is None:
+            return
+        cleaner.close()
+        self.cleaner = None
+        if cleaner.count:
+            message = (
+                f"Cleaned {cleaner.count} descriptions in {cleaner.seconds:.2f}s "
+                f"({cleaner.descriptions_per_second:.0f} descriptions/s, {cleaner.workers} workers)"
+            )
+            logger.info(message)
+            self.stdout.write(message)
 
-        r = session.get(self.API_URL, timeout=20)
-        r.raise_for_status()
-        data = r.json()
+    # Ścieżki migawek/nagrań: przy kilku źródłach każde ma własny podkatalog
+    @staticmethod
+    def _client_options(options, per_source_dirs):
+        def for_source(source):
+            def path(base):
+                if not base:
+                    return None
+                return os.path.join(base, source.name) if per_source_dirs else base
 
-        return data[1:] if isinstance(data, list) and len(data) > 1 else []
+            return {
+                "cache_dir": None if options.get("no_cache") else settings.SCRAPER_CACHE_DIR,
+                "replay_path": path(options.get("replay")),
+                "record_dir": path(options.get("record")),
+                "stream": bool(options.get("stream")),
+            }
 
-    # Wstaw lub zaktualizuj rekordy ofert pracy w bazie danych
-    def _save_jobs(self, data):
-        new_jobs = 0
-        updated_jobs = 0
+        return for_source
 
-        with transaction.atomic():  # wszystko albo nic 
-            for offer in data:
-                url = offer.get("url")
-                if not url:
-                    continue
+    # Zapisz wynik jednego źródła i zaraportuj jego czasy; zwraca (nowe, zmienione, bez zmian)
+    # albo None, gdy źródło zawiodło
+    def _process_result(self, result, batch_size=None):
+        counts = (0, 0, 0)
+        if result.error is not None:
+            logger.error("Source %s failed: %s", result.name, result.error, exc_info=result.error)
+            self.stderr.write(self.style.ERROR(f"{result.name}: {result.error}"))
+            return None
+
+        # etapy pobierania zmierzone w wątku puli; zapis dzieli się na lookup / clean / persist
+        timer = StageTimer("scrape")
+        for stage, seconds in result.timings.items():
+            timer.record(stage, seconds)
 
-                # Spróbuj sparsować datę w formacie ISO podaną przez API; użyj None jeśli brakuje lub jest błędna.
-                date_str = offer.get("date")
-                try:
-                    posted_date = datetime.fromisoformat(date_str) if date_str else None
-                except ValueError:
-                    posted_date = None
-
-                
-
-                # Czyszczenie HTML w opisie oferty pracy
-                raw_description = offer.get("description", "")
-                clean_description = ftfy.fix_text(raw_description)
-                description = BeautifulSoup(
-                    clean_description, "html.parser"
-                ).get_text(separator="\n").strip()
-
-                # Upewnij się, że tagi są reprezentowane jako lista, aby przechowywać je konsekwentnie.
-                tags = offer.get("tags", [])
-                if isinstance(tags, str):
-                    tags = [tags]
-
-                # Utwórz czytelny  string wynagrodzenia z wartości min/max jeśli dostępne.
-                sal_min = offer.get("salary_min")
-                sal_max = offer.get("salary_max")
-                if sal_min and sal_max:
-                    salary = f"${sal_min:,} - ${sal_max:,}"
-                elif sal_min:
-                    salary = f"From ${sal_min:,}"
-                elif sal_max:
-                    salary = f"Up to ${sal_max:,}"
+        started = time.perf_counter()
+        try:
+            if result.not_modified:
+                # 304 / ta sama migawka: nic się nie zmieniło, pomiń parsowanie i zapis
+                touched = self._touch_unchanged_feed(result.client, result.name)
+                result.client.commit()
+                summary = f"not modified ({touched} jobs still listed)"
+            else:
+                # w trybie strumieniowym parsowanie odbywa się tutaj, partiami razem z zapisem
+                counts = self._save_jobs(result.offers, batch_size, source=result.name, timer=timer)
+                if any(counts):
+                    result.client.commit()  # dopiero teraz zapamiętaj ETag — zapis się udał
+                    summary = "{} new, {} changed, {} unchanged".format(*counts)
                 else:
-                    salary = "N/A"
-
-                defaults = {
-                    "title": offer.get("position", "Untitled"),
-                    "company": offer.get("company", "Unknown Company"),
-                    "location": offer.get("location", "Remote"),
-                    "attributes": tags,
-                    "salary": salary,
-                    "description": description,
-                    "date_posted": posted_date,
-                    "status": Job.STATUS_ACTIVE,
-                }
-
-                job, created = Job.objects.update_or_create(
-                    job_url=url,
-                    defaults=defaults
-                )
+                    summary = "no job data returned"
+        except Exception as e:
+            # np. uszkodzony JSON wykryty dopiero w trakcie strumieniowego parsowania
+            logger.error("Source %s failed: %s", result.name, e, exc_info=True)
+            self.stderr.write(self.style.ERROR(f"{result.name}: {e}"))
+            return None
+        finally:
+            if result.response is not None:
+                result.response.close()
+        result.timings["save"] = time.perf_counter() - started
+
+        timings = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timer.timings.items())
+        logger.info("Source %s: %s (%s)", result.name, summary, timings)
+        self.stdout.write(f"{result.name}: {summary} ({timings})")
+        return counts
+
+    # Import dużego zrzutu JSON/NDJSON: oferty czytane strumieniowo i zapisywane partiami
+    def _import_dump(self, source, path, batch_size=None):
+        started = time.perf_counter()
+        counts = self._save_jobs(source.iter_stream(path), batch_size, source=source.name)
+        elapsed = time.perf_counter() - started
+        if counts[0] or counts[1]:
+            ensure_index()
+            refresh_tag_counts()
+
+        total = sum(counts)
+        rate = total / elapsed if elapsed else 0.0
+        logger.info("Imported dump %s for %s: %s offers in %.2fs", path, source.name, total, elapsed)
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Imported {} offers from {} in {:.2f}s ({:.0f} offers/s): "
+                "{} new, {} changed, {} unchanged.".format(total, path, elapsed, rate, *counts)
+            )
+        )
+
+    # Kanał się nie zmienił, więc wszystkie oferty widziane w poprzednim przebiegu nadal są w kanale:
+    # jedno UPDATE date_last_seen zamiast parsowania i porównywania ofert
+    def _touch_unchanged_feed(self, client, source):
+        since = client.previous_validated_at
+        if since is None:
+            return 0
+        return Job.objects.filter(
+            source=source, status=Job.STATUS_ACTIVE, date_last_seen__gte=since
+        ).update(date_last_seen=timezone.now())
+
+    # Odcisk surowej oferty z API — jeśli się nie zmienił, oferty nie trzeba ponownie czyścić ani zapisywać
+    @staticmethod
+    def _fingerprint(offer):
+        payload = json.dumps(offer, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # Zbuduj (niezapisany) obiekt Job z oferty API
+    def _build_job(self, offer, now, content_hash="", source=RemoteOKSource.name, description=None):
+        # Spróbuj sparsować datę w formacie ISO podaną przez API; użyj None jeśli brakuje lub jest błędna.
+        date_str = offer.get("date")
+        try:
+            posted_date = datetime.fromisoformat(date_str) if date_str else None
+        except ValueError:
+            posted_date = None
+        # źródła bez strefy czasowej podają czas UTC
+        if posted_date and timezone.is_naive(posted_date):
+            posted_date = timezone.make_aware(posted_date, dt_timezone.utc)
+
+        # Czyszczenie HTML w opisie oferty pracy (_save_jobs czyści całą partię naraz i podaje wynik)
+        if description is None:
+            description = clean_description(offer.get("description", ""))
+
+        # Upewnij się, że tagi są reprezentowane jako lista, aby przechowywać je konsekwentnie.
+        tags = offer.get("tags", [])
+        if isinstance(tags, str):
+            tags = [tags]
+
+        # Utwórz czytelny  string wynagrodzenia z wartości min/max jeśli dostępne.
+        sal_min = offer.get("salary_min")
+        sal_max = offer.get("salary_max")
+        if offer.get("salary"):
+            salary = str(offer["salary"])[:100]  # źródło podaje gotowy tekst
+        elif sal_min and sal_max:
+            salary = f"${sal_min:,} - ${sal_max:,}"
+        elif sal_min:
+            salary = f"From ${sal_min:,}"
+        elif sal_max:
+            salary = f"Up to ${sal_max:,}"
+        else:
+            salary = "N/A"
+
+        return Job(
+            job_url=offer["url"],
+            title=offer.get("position", "Untitled"),
+            company=offer.get("company", "Unknown Company"),
+            location=offer.get("location", "Remote"),
+            attributes=tags,
+            salary=salary,
+            description=description,
+            date_posted=posted_date,
+            status=Job.STATUS_ACTIVE,
+            date_last_seen=now,  # widzimy ofertę w kanale teraz
+            content_hash=content_hash,
+            source=source,
+        )
+
+    # Wstaw lub zaktualizuj rekordy ofert pracy w bazie danych partiami:
+    # jedno zapytanie o istniejące oferty, jeden upsert nowych/zmienionych ofert i ich cech
+    # oraz jedno UPDATE date_last_seen dla ofert bez zmian (bez czyszczenia HTML).
+    # `data` może być dowolnym iterowalnym (także strumieniem z json_stream) — w pamięci
+    # jest naraz tylko jedna partia ofert.
+    # Poza handle() (testy, benchmarki, import z kodu) cleaner — i jego pula procesów — żyje
+    # tylko do końca zapisu.
+    def _save_jobs(self, data, batch_size=None, source=RemoteOKSource.name, timer=None):
+        cleaner = getattr(self, "cleaner", None)
+        if cleaner is not None:
+            return self._save_batches(data, batch_size, source, timer, cleaner)
+        with self._make_cleaner() as cleaner:
+            return self._save_batches(data, batch_size, source, timer, cleaner)
+
+    def _save_batches(self, data, batch_size, source, timer, cleaner):
+        batch_size = batch_size or self.BATCH_SIZE
+        timer = timer or StageTimer("scrape")
+        now = timezone.now()
+
+        new_jobs = 0
+        changed_jobs = 0
+        unchanged_jobs = 0
+        offers_iter = iter(data)
+        while batch := list(islice(offers_iter, batch_size)):
+            # Deduplikuj po URL w partii (ostatnie wystąpienie wygrywa, jak przy kolejnych update_or_create);
+            # powtórka w późniejszej partii po prostu nadpisze ofertę jeszcze raz
+            chunk = list({offer["url"]: offer for offer in batch if offer.get("url")}.values())
+            if not chunk:
+                continue
+            hashes = {offer["url"]: self._fingerprint(offer) for offer in chunk}
+
+            # krótka transakcja na partię zamiast jednej na cały kanał
+            with transaction.atomic():
+                with timer.stage("lookup"):
+                    existing = {
+                        url: (job_id, content_hash, status)
+                        for url, job_id, content_hash, status in Job.objects.filter(
+                            job_url__in=list(hashes)
+                        ).values_list("job_url", "id", "content_hash", "status")
+                    }
+
+                # oferta bez zmian: ten sam odcisk i nadal aktywna — wystarczy odnotować, że ją widzieliśmy
+                unchanged_ids = []
+                to_save = []
+                for offer in chunk:
+                    url = offer["url"]
+                    current = existing.get(url)
+                    if current and current[1] == hashes[url] and current[2] == Job.STATUS_ACTIVE:
+                        unchanged_ids.append(current[0])
+                    else:
+                        to_save.append(offer)
+
+                if unchanged_ids:
+                    with timer.stage("persist"):
+                        Job.objects.filter(id__in=unchanged_ids).update(date_last_seen=now)
+
+                if to_save:
+                    with timer.stage("clean"):
+                        descriptions = cleaner.clean(offer.get("description", "") for offer in to_save)
+                        jobs = [
+                            self._build_job(offer, now, hashes[offer["url"]], source, description)
+                            for offer, description in zip(to_save, descriptions)
+                        ]
+                    with timer.stage("persist"):
+                        Job.objects.bulk_create(
+                            jobs,
+                            batch_size=batch_size,
+                            update_conflicts=True,
+                            unique_fields=["job_url"],
+                            update_fields=self.UPDATE_FIELDS,
+                        )
+
+                        # bazy bez RETURNING przy upsercie nie ustawiają pk — dociągnij je jednym zapytaniem
+                        if any(job.pk is None for job in jobs):
+                            ids = dict(Job.objects.filter(
+                                job_url__in=[job.job_url for job in jobs]
+                            ).values_list("job_url", "id"))
+                            for job in jobs:
+                                job.pk = ids[job.job_url]
 
-                # podczas tworzenia/aktualizacji obiektów ofert ustaw date_last_seen = timezone.now()
-                job.date_last_seen = timezone.now()
-                job.save()
+                        # Przelicz cechy dla matchera tylko dla nowych i zmienionych ofert
+                        # (wektor wyszukiwania odświeża trigger PostgreSQL, jobfinder/search.py)
+                        refresh_job_features(jobs, batch_size=batch_size)
+                        sync_job_tags(jobs, batch_size=batch_size)
 
-                new_jobs += int(created)
-                updated_jobs += int(not created)
+            saved_new = sum(1 for offer in to_save if offer["url"] not in existing)
+            new_jobs += saved_new
+            changed_jobs += len(to_save) - saved_new
+            unchanged_jobs += len(unchanged_ids)
 
-        logger.info("Scraper run completed: %s new, %s updated", new_jobs, updated_jobs)
+        ROWS_WRITTEN.inc(new_jobs, operation="scrape_insert")
+        ROWS_WRITTEN.inc(changed_jobs, operation="scrape_update")
+        ROWS_WRITTEN.inc(unchanged_jobs, operation="scrape_touch")
+        logger.info(
+            "Saved %s offers: %s new, %s changed, %s unchanged (%s)",
+            source, new_jobs, changed_jobs, unchanged_jobs, timer.summary(),
+        )
 
-        return new_jobs, updated_jobs
+        return new_jobs, changed_jobs, unchanged_jobs
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from jobfinder.feed_server import make_server
+
+
+# Lokalny serwer zastępczy API RemoteOK serwujący nagrane migawki (scrape_remotejobs --record)
+class Command(BaseCommand):
+    help = "Serve recorded feed snapshots over HTTP as a local stand-in for the RemoteOK API."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Snapshot file or directory of *.json / *.json.gz snapshots.")
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--delay", type=float, default=0.0, help="Artificial response delay in seconds.")
+
+    def handle(self, *args, **options):
+        server = make_server(options["path"], options["host"], options["port"], options["delay"])
+        host, port = server.server_address[:2]
+        self.stdout.write(self.style.SUCCESS(f"Serving snapshots on http://{host}:{port}/api (Ctrl+C to stop)"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,167 @@
+# Cache wyników dopasowania CV przed zapisanymi rankingami (match_store) i punktowaniem.
+# Dwa poziomy: LRU w pamięci procesu (bez I/O) i współdzielony cache Django (np. Redis/memcached
+# między workerami). Jeden wpis na CV, ważny tylko dla wersji treści CV (cv_version) i wersji
+# korpusu — build_id indeksu TF-IDF, który zmienia się, gdy scraper, archiwizacja lub usuwanie
+# zmienią aktywne oferty (komendy przebudowują wtedy indeks; żądania dopasowania indeksu nie
+# przebudowują ani nie sprawdzają podpisu korpusu). Zapis CV unieważnia wpis od razu.
+# Trafienia i chybienia są liczone tylko w procesie (jobfinder_match_cache_lookups_total w /metrics,
+# sumowane po workerach przez Prometheusa) — trafienie w LRU nie wykonuje żadnego I/O.
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from jobfinder.metrics import MATCH_CACHE_LOOKUPS
+
+KEY_PREFIX = "jobfinder:match"
+STATS_KEYS = ("local_hits", "shared_hits", "misses")
+
+
+def corpus_version(index):
+    """
+    Wersja korpusu indeksu: build_id + czas budowy (build_id zaczyna się od 1 w nowym katalogu).
+    """
+    return f"{index.build_id}@{index.manifest.get('created_at')}"
+
+
+class LocalLRU:
+    """
+    Mały, bezpieczny wątkowo cache LRU w pamięci procesu.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_local = None
+_local_lock = threading.Lock()
+
+
+def _get_local():
+    global _local
+    with _local_lock:
+        if _local is None or _local.maxsize != settings.MATCH_CACHE_LOCAL_SIZE:
+            _local = LocalLRU(settings.MATCH_CACHE_LOCAL_SIZE)
+        return _local
+
+
+def _shared():
+    return caches[settings.MATCH_CACHE_ALIAS]
+
+
+def _key(cv_id):
+    return f"{KEY_PREFIX}:{cv_id}"
+
+
+def _count(name):
+    MATCH_CACHE_LOOKUPS.inc(result=name)
+
+
+def _serve(entry, version, corpus, top_n):
+    if entry is None or entry["cv_version"] != version or entry["corpus_version"] != corpus:
+        return None
+    results = entry["results"]
+    # ranking jest kompletny, jeśli obejmuje top_n albo wszystkie oferty korpusu
+    if entry["depth"] < top_n and len(results) >= entry["depth"]:
+        return None
+    # kopie słowników: widoki dopisują do wyników własne pola (np. score_pct)
+    return [dict(r) for r in results[:top_n]]
+
+
+def get_matches(cv_id, version, corpus, top_n):
+    """
+    Ranking CV z cache (LRU procesu, potem cache współdzielony) albo None.
+    """
+    if not settings.MATCH_CACHE_ENABLED:
+        return None
+    key = _key(cv_id)
+
+    results = _serve(_get_local().get(key), version, corpus, top_n)
+    if results is not None:
+        _count("local_hits")
+        return results
+
+    entry = _shared().get(key)
+    results = _serve(entry, version, corpus, top_n)
+    if results is not None:
+        _get_local().set(key, entry)
+        _count("shared_hits")
+        return results
+
+    _count("misses")
+    return None
+
+
+def set_matches(cv_id, version, corpus, depth, results):
+    """
+    Zapamiętaj ranking CV na obu poziomach (ostatni zapis dla CV zastępuje poprzedni).
+    """
+    if not settings.MATCH_CACHE_ENABLED:
+        return
+    entry = {
+        "cv_version": version,
+        "corpus_version": corpus,
+        "depth": depth,
+        "results": [dict(r) for r in results],
+    }
+    key = _key(cv_id)
+    _get_local().set(key, entry)
+    _shared().set(key, entry, settings.MATCH_CACHE_TTL)
+
+
+def invalidate_cv(cv_id):
+    """
+    Usuń wpis CV z obu poziomów (wywoływane po zapisie CV). Inne procesy i tak pominą swój
+    lokalny wpis, bo nie zgadza się cv_version.
+    """
+    key = _key(cv_id)
+    _get_local().delete(key)
+    _shared().delete(key)
+
+
+def cache_stats():
+    """
+    Liczniki trafień/chybień bieżącego procesu, hit_ratio i rozmiar LRU.
+    """
+    counts = {name: MATCH_CACHE_LOOKUPS.value(result=name) or 0 for name in STATS_KEYS}
+    total = sum(counts.values())
+    hits = counts["local_hits"] + counts["shared_hits"]
+    return dict(counts, hit_ratio=hits / total if total else 0.0, local_size=len(_get_local()))
+
+
+def clear():
+    """
+    Wyczyść LRU procesu i liczniki (testy, benchmarki).
+    """
+    _get_local().clear()
+    MATCH_CACHE_LOOKUPS.clear()
@@ -1,78 +1,25 @@
-from sklearn.feature_extraction.text import TfidfVectorizer # do TF-IDF
-from sklearn.metrics.pairwise import cosine_similarity # do obliczania podobieństwa
+import logging
+
+import numpy as np
+from django.conf import settings
 from jobfinder.models import Job
+from jobfinder.features import normalize_text, split_set
+from jobfinder.scoring import infer_allowed_seniority, score_jobs, top_k # wektorowe punktowanie
+from jobfinder.tfidf_index import ensure_index, load_index # trwały indeks TF-IDF
+from jobfinder import match_cache # cache wyników (LRU procesu + cache Django)
+from jobfinder.retrieval import similarities_and_candidates # kandydaci do pełnego punktowania
+from jobfinder.match_store import cv_version, load_stored_matches, store_matches # rankingi per CV
+from jobfinder.metrics import CORPUS_JOBS, JOBS_SCORED, MATCHES, ROWS_WRITTEN, StageTimer # czasy etapów
 from users.models import CV
-import re # do czyszczenia tekstu
 
-from jobfinder.logging_config import setup_logger
+from jobfinder.logging_config import sampled, setup_logger
 logger = setup_logger("matcher", "matcher.log")
 
 
-# funkcja normalizacji tekstu
-def normalize_text(text: str) -> str:
-    if not text:
-        return ""
-    text = text.lower()
-    # keep letters, numbers, +, #, -, . and spaces (preserve common tech names)
-    text = re.sub(r"[^a-z0-9+#\-\.\s]+", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
-
-
-
-# główna funkcja dopasowywania
-def match_jobs_to_cv(cv_id, top_n=5):
-    try:
-        cv = CV.objects.get(id=cv_id)
-    except CV.DoesNotExist:
-        logger.error(f"CV with id {cv_id} does not exist.")
-        return []
-
-    def split_set(text):
-        if not text:
-            return set()
-        tokens = re.findall(r"[a-z0-9+#\-\.]+", normalize_text(text))
-        return set(t for t in tokens if t)
-
-    def infer_allowed_seniority(years: int):
-        if years is None:
-            return {"junior", "mid"}
-        if years < 2:
-            return {"intern", "junior"}
-        if years < 3:
-            return {"junior"}
-        if years < 5:
-            return {"mid"}
-        return {"senior"}
-
-    SENIORITY_KEYWORDS = {
-        "intern": {"intern", "internship", "trainee"},
-        "junior": {"junior", "jr", "associate", "entry", "graduate"},
-        "mid": {"mid", "intermediate", "regular"},
-        "senior": {"senior", "sr", "lead", "principal", "staff"},
-    }
-
-    def detect_job_seniority(text):
-        found = set()
-        for level, keys in SENIORITY_KEYWORDS.items():
-            for k in keys:
-                if re.search(rf"\b{re.escape(k)}\b", text):
-                    found.add(level)
-        return found
-
-    # wykryj wymagane lata w tekście oferty, zwróć minimalną liczbę całkowitą jeśli znaleziono
-    def detect_required_experience(text):
-        if not text:
-            return None
-        # common patterns: "5 years", "5+ years", "6+ years of experience", "minimum 4 years"
-        m = re.search(r"(?:(?:minimum|min|min\.)\s*)?(\d{1,2})\s*\+?\s*(?:\+|\s)?\s*(?:years|yrs)\b", text)
-        if m:
-            try:
-                return int(m.group(1))
-            except Exception:
-                return None
-        return None
-
+def cv_profile(cv):
+    """
+    Tekst CV dla TF-IDF i profil dla scoring.score_jobs (zbiory tokenów, poziomy, preferencje).
+    """
     # Połącz pola CV w jeden tekst
     cv_text = " ".join([
         normalize_text(cv.skills),
@@ -82,150 +29,119 @@ def match_jobs_to_cv(cv_id, top_n=5):
         normalize_text(cv.education),
     ])
 
-    cv_skills = split_set(cv.skills)
-    cv_tech = split_set(cv.technologies)
-    cv_roles = split_set(cv.preferred_roles)
-    cv_locations = split_set(cv.preferred_locations)
-    allowed_seniority = infer_allowed_seniority(cv.experience_years)
+    profile = {
+        "skills": split_set(cv.skills),
+        "technologies": split_set(cv.technologies),
+        "roles": split_set(cv.preferred_roles),
+        "locations": split_set(cv.preferred_locations),
+        "allowed_seniority": infer_allowed_seniority(cv.experience_years),
+        "experience_years": cv.experience_years,
+        "job_type_preference": getattr(cv, "job_type_preference", None),
+    }
+    return cv_text, profile
 
-    jobs = Job.objects.filter(status=Job.STATUS_ACTIVE)
-    if not jobs.exists():
-        return []
 
-    records = []
-    for job in jobs:
-        title = normalize_text(job.title or job.position or "")
-        desc = normalize_text(job.description or "")
-        tags = ""
-        if isinstance(job.attributes, list):
-            tag_parts = []
-            for t in job.attributes:
-                if isinstance(t, dict):
-                    tag_parts.append(t.get("slug") or t.get("name") or "")
-                else:
-                    tag_parts.append(str(t))
-            tags = " ".join(normalize_text(p) for p in tag_parts if p)
-        combined = f"{title} {tags} {desc}"
-        job_seniority = detect_job_seniority(f"{title} {tags}")
-        required_exp = detect_required_experience(combined)
-        job_tags = (split_set(title) | split_set(tags))
-
-        records.append({
-            "id": job.id,
+# główna funkcja dopasowywania
+def match_jobs_to_cv(cv_id, top_n=5, use_stored=True):
+    # czasy etapów trafiają do histogramu jobfinder_stage_seconds{operation="match"} (jobfinder/metrics.py)
+    timer = StageTimer("match")
+    with timer.stage("load_cv"):
+        try:
+            cv = CV.objects.get(id=cv_id)
+        except CV.DoesNotExist:
+            logger.error("CV with id %s does not exist.", cv_id)
+            MATCHES.inc(result="missing_cv")
+            return []
+
+        version = cv_version(cv)
+
+    # Indeks TF-IDF i kolumny cech są budowane po zmianach korpusu przez scraper, archiwizację,
+    # usuwanie i rebuild_match_index (cron) — żądanie tylko czyta bieżący build z dysku, bez zapytań
+    # o korpus. Wersja korpusu (cache, zapisane rankingi) to build_id@created_at tego buildu.
+    # Budowa w żądaniu tylko wtedy, gdy indeksu jeszcze nie ma (pierwsze uruchomienie).
+    with timer.stage("index"):
+        index = load_index()
+        if index is None:
+            index = ensure_index()
+    if index is None:
+        MATCHES.inc(result="empty")
+        return []
+    corpus = match_cache.corpus_version(index)
+    CORPUS_JOBS.set(len(index))
+
+    if use_stored:
+        with timer.stage("cache"):
+            cached = match_cache.get_matches(cv.id, version, corpus, top_n)
+        if cached is not None:
+            MATCHES.inc(result="cached")
+            return cached
+
+    # Jeśli ani CV, ani korpus się nie zmieniły, zwróć zapisany ranking bez ponownego punktowania
+    if use_stored:
+        with timer.stage("stored"):
+            stored = load_stored_matches(cv, version, corpus, top_n)
+        if stored is not None:
+            match_cache.set_matches(cv.id, version, corpus, top_n, stored)
+            MATCHES.inc(result="stored")
+            return stored
+
+    with timer.stage("normalize"):
+        cv_text, profile = cv_profile(cv)
+    allowed_seniority = profile["allowed_seniority"]
+
+    # dla dużych korpusów pełna formuła tylko dla kandydatów (wspólne tokeny + najbliżsi sąsiedzi)
+    with timer.stage("similarity"):
+        similarities, candidates = similarities_and_candidates(index, profile, cv_text, top_n)
+    with timer.stage("score"):
+        scores, seniority_match, skill_matches, tech_matches = score_jobs(index, profile, similarities, candidates)
+        rows = np.arange(len(index)) if candidates is None else candidates
+
+        # wybierz top_n po wyniku procentowym częściową selekcją i buduj wyniki tylko dla zwycięzców
+        percent = np.round(scores * 100, 2)
+        winners = top_k(percent, top_n)
+    JOBS_SCORED.observe(len(rows))
+
+    with timer.stage("load_jobs"):
+        jobs = Job.objects.in_bulk([int(index.job_ids[rows[i]]) for i in winners])
+
+    # śledzenie pojedynczych ofert tylko dla próbki dopasowań (MATCH_TRACE_SAMPLE_RATE)
+    trace = logger.isEnabledFor(logging.DEBUG) and sampled(settings.MATCH_TRACE_SAMPLE_RATE)
+    top_results = []
+    for i in winners:
+        job = jobs.get(int(index.job_ids[rows[i]]))
+        if job is None:
+            continue
+        percent_score = round(float(scores[i]) * 100, 2)
+
+        if trace:
+            logger.debug(
+                "Match | CV %s | Job %s | percent=%.2f%% | raw_score=%.4f | sim=%.4f skills=%s techs=%s",
+                cv.id, job.id, percent_score, float(scores[i]), float(similarities[rows[i]]),
+                int(skill_matches[i]), int(tech_matches[i]),
+            )
+
+        top_results.append({
             "job": job,
-            "text": combined,
-            "title": title,
-            "seniority": job_seniority,
-            "required_experience": required_exp,
-            "location": normalize_text(job.location or ""),
-            "salary_min": job.salary,
-            "salary_max": job.salary,
-            "job_tags": job_tags,
-        })
-
-    vectorizer = TfidfVectorizer(
-        stop_words="english",
-        ngram_range=(1, 2),
-        max_df=0.9,
-        min_df=1,
-    )
-
-    job_vectors = vectorizer.fit_transform([r["text"] for r in records])
-    cv_vector = vectorizer.transform([cv_text])
-    similarities = cosine_similarity(cv_vector, job_vectors).flatten()
-
-    results = []
-
-    # prostsze punktowanie: linia bazowa + addytywne wzmocnienia, multiplikatywne kary
-    for idx, rec in enumerate(records):
-        sim = float(similarities[idx]) if idx < len(similarities) else 0.0
-
-        # baseline to bias results toward ~50% on average
-        score = 0.35
-
-        # semantic similarity (adds up to +0.25)
-        score += sim * 0.25
-
-        # dopasowania umiejętności (dodaje do +0.20)
-        exact_skill_matches = len(cv_skills & rec["job_tags"])
-        if cv_skills:
-            frac = exact_skill_matches / max(1, len(cv_skills))
-            score += 0.20 * frac
-
-        # dopasowania technologii (dodaje do +0.15)
-        exact_tech_matches = len(cv_tech & rec["job_tags"])
-        if cv_tech:
-            frac_tech = exact_tech_matches / max(1, len(cv_tech))
-            score += 0.15 * frac_tech
-
-        # poziom zaawansowania: małe wzmocnienie lub kara multiplikatywna
-        seniority_match = False
-        if rec["seniority"]:
-            seniority_match = bool(rec["seniority"] & allowed_seniority)
-            if seniority_match:
-                score += 0.15
-            else:
-                score *= 0.8
-
-        # wymagane doświadczenie: małe wzmocnienie lub kara
-        req_exp = rec.get("required_experience")
-        if req_exp is not None and cv.experience_years is not None:
-            if cv.experience_years >= req_exp:
-                score += 0.15
-            else:
-                score *= 0.8
-
-        # dopasowanie roli/tytułu
-        if cv_roles:
-            role_match = any(re.search(rf"\b{re.escape(role)}\b", rec["title"]) for role in cv_roles if role)
-            if role_match:
-                score += 0.10
-
-        # preferencje lokalizacji / zdalnej pracy
-        pref = getattr(cv, "job_type_preference", None)
-        loc_field = rec.get("location", "")
-        if pref == "remote":
-            if "remote" in loc_field:
-                score += 0.15
-            else:
-                score *= 0.95
-        elif cv_locations:
-            loc_match = any(loc.lower() in loc_field for loc in cv_locations)
-            if loc_match:
-                score += 0.10
-            else:
-                score *= 0.95
-
-        # ogranicz i konwertuj na procent (0..100)
-        score = max(0.0, min(1.0, score))
-        percent_score = round(score * 100, 2)
-
-        logger.debug(
-            f"Match | Job {rec['id']} | percent={percent_score:.2f}% | raw_score={score:.4f} "
-            f"| sim={sim:.4f} skills={exact_skill_matches} techs={exact_tech_matches}"
-        )
-
-        results.append({
-            "job": rec["job"],
             "score": percent_score,
-            "seniority_match": seniority_match,
+            "seniority_match": bool(seniority_match[i]),
             "experience_bucket": list(allowed_seniority),
         })
 
-    # sortuj i zapisuj tylko top_n match_score, aby zmniejszyć zapisy do bazy danych
-    results.sort(key=lambda r: r["score"], reverse=True)
-    top_results = results[:top_n]
-
-    for r in top_results:
-        job_obj = r["job"]
-        bounded = max(0.0, min(100.0, float(r["score"])))
-        job_obj.match_score = bounded
+    # zapisz ranking tego CV jednym upsertem (zamiast zapisu do wspólnej kolumny Job.match_score)
+    with timer.stage("store"):
         try:
-            job_obj.save(update_fields=["match_score"])
+            store_matches(cv, top_results, version, corpus, top_n)
+            ROWS_WRITTEN.inc(len(top_results), operation="match_store")
         except Exception:
-            try:
-                job_obj.save()
-            except Exception:
-                logger.exception(f"Failed to save match_score for job {job_obj.id}")
+            logger.exception("Failed to store match results for CV %s", cv.id)
+        match_cache.set_matches(cv.id, version, corpus, top_n, top_results)
 
-    return top_results
\ No newline at end of file
+    MATCHES.inc(result="computed")
+    # jeden zbiorczy wpis na dopasowanie zamiast wpisu na ofertę
+    if len(rows) and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Match | CV %s | %s jobs scored, %s results | score min/mean/max=%.4f/%.4f/%.4f | %s",
+            cv.id, len(rows), len(top_results),
+            float(scores.min()), float(scores.mean()), float(scores.max()), timer.summary(),
+        )
+    return top_results
@@ -0,0 +1,115 @@
+# Ograniczona pula wykonawców dla dopasowań CV (punktowanie numpy/scipy + ORM).
+# Asynchroniczne widoki dopasowań przekazują pracę do puli i czekają na wynik bez blokowania
+# pętli zdarzeń ani wspólnego wątku widoków synchronicznych (pod ASGI Django wykonuje je
+# w jednym wątku), więc dopasowania nie zatrzymują innych żądań na tym workerze.
+# Liczba zadań w puli i w kolejce jest ograniczona; po jej przekroczeniu submit() zgłasza
+# MatchPoolBusy, a widok odpowiada 503 z nagłówkiem Retry-After zamiast kolejkować bez końca.
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+class MatchPoolBusy(Exception):
+    """
+    Pula i kolejka są pełne — żądanie należy ponowić po retry_after sekundach.
+    """
+
+    def __init__(self, retry_after):
+        super().__init__(f"Match pool is busy, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class MatchPool:
+    """
+    `workers` wątków wykonujących dopasowania i miejsce na `queue_size` oczekujących zadań.
+    Wątki (a nie procesy): macierzowe operacje numpy/scipy zwalniają GIL, a każdy wątek korzysta
+    z załadowanego już w procesie indeksu TF-IDF i własnego połączenia z bazą.
+    """
+
+    def __init__(self, workers=2, queue_size=8, retry_after=2):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.retry_after = retry_after
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="match")
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self):
+        """Zadania wykonywane i oczekujące w kolejce."""
+        return self._in_flight
+
+    def _call(self, fn, args, kwargs):
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            # połączenie wątku puli podlega tym samym zasadom co połączenie żądania (CONN_MAX_AGE)
+            close_old_connections()
+
+    def _release(self, future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Zleć fn(*args, **kwargs) puli i zwróć concurrent.futures.Future.
+        Zgłasza MatchPoolBusy, gdy wszystkie miejsca (wątki + kolejka) są zajęte.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise MatchPoolBusy(self.retry_after)
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(self._call, fn, args, kwargs)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Asynchroniczna wersja submit(): czeka na wynik bez blokowania pętli zdarzeń.
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_match_pool():
+    """
+    Wspólna pula procesu, tworzona przy pierwszym użyciu z ustawień MATCH_POOL_*.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = MatchPool(
+                workers=settings.MATCH_POOL_WORKERS,
+                queue_size=settings.MATCH_POOL_QUEUE_SIZE,
+                retry_after=settings.MATCH_POOL_RETRY_AFTER,
+            )
+        return _pool
+
+
+def reset_match_pool():
+    """
+    Zamknij wspólną pulę (następne użycie utworzy nową z bieżących ustawień) — testy, benchmarki.
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
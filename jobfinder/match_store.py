@@ -0,0 +1,89 @@
+# Zapisane rankingi dopasowań per CV (JobMatch + MatchRun).
+# Ranking jest zapisywany jednym upsertem na uruchomienie matchera i odczytywany bez ponownego
+# punktowania, dopóki nie zmieni się treść CV ani wersja korpusu (match_cache.corpus_version:
+# build_id i czas budowy indeksu TF-IDF — sam build_id zaczyna się od 1 w każdym nowym katalogu
+# indeksu i na każdym hoście, a rankingi leżą we wspólnej bazie).
+import hashlib
+import json
+
+from django.db import transaction
+
+from jobfinder.models import JobMatch, MatchRun
+from jobfinder.scoring import infer_allowed_seniority
+
+# Pola CV, od których zależy wynik dopasowania
+CV_MATCH_FIELDS = (
+    "skills", "technologies", "preferred_roles", "preferred_locations",
+    "experience", "education", "experience_years", "job_type_preference",
+)
+
+
+def cv_version(cv) -> str:
+    """
+    Skrót treści CV używanej przez matcher — zmienia się tylko przy zmianie tych pól.
+    """
+    payload = json.dumps([getattr(cv, field, None) for field in CV_MATCH_FIELDS])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_stored_matches(cv, version, corpus_version, top_n):
+    """
+    Zwróć zapisany ranking (w formacie match_jobs_to_cv) albo None, jeśli jest nieaktualny
+    lub policzono go dla mniejszego top_n.
+    """
+    try:
+        run = cv.match_run
+    except MatchRun.DoesNotExist:
+        return None
+
+    if run.cv_version != version or run.corpus_version != corpus_version:
+        return None
+    # ranking jest kompletny, jeśli obejmuje top_n albo wszystkie oferty korpusu
+    if run.depth < top_n and run.n_results >= run.depth:
+        return None
+
+    bucket = list(infer_allowed_seniority(cv.experience_years))
+    matches = JobMatch.objects.filter(cv=cv).select_related("job").order_by("-score", "rank")[:top_n]
+    return [
+        {
+            "job": m.job,
+            "score": m.score,
+            "seniority_match": m.seniority_match,
+            "experience_bucket": bucket,
+        }
+        for m in matches
+    ]
+
+
+def store_matches(cv, results, version, corpus_version, depth):
+    """
+    Zapisz ranking CV: usuń wyniki spoza nowego rankingu i wstaw/zaktualizuj resztę jednym upsertem.
+    """
+    rows = [
+        JobMatch(
+            cv=cv,
+            job=r["job"],
+            score=max(0.0, min(100.0, float(r["score"]))),
+            rank=rank,
+            seniority_match=r["seniority_match"],
+        )
+        for rank, r in enumerate(results)
+    ]
+
+    with transaction.atomic():
+        JobMatch.objects.filter(cv=cv).exclude(job_id__in=[r.job_id for r in rows]).delete()
+        JobMatch.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["cv", "job"],
+            update_fields=["score", "rank", "seniority_match", "computed_at"],
+        )
+        MatchRun.objects.update_or_create(
+            cv=cv,
+            defaults={
+                "cv_version": version,
+                "corpus_version": corpus_version,
+                "depth": depth,
+                "n_results": len(rows),
+            },
+        )
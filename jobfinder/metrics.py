@@ -0,0 +1,280 @@
+# Lekkie metryki procesu eksportowane w formacie tekstowym Prometheusa (endpoint /metrics).
+# Liczniki, wskaźniki i histogramy z etykietami, bezpieczne wątkowo, bez zewnętrznych zależności.
+# StageTimer mierzy etapy jednej operacji (dopasowanie, budowa indeksu, scrapowanie, archiwizacja)
+# i zapisuje każdy etap do histogramu jobfinder_stage_seconds{operation, stage}; podsumowanie
+# etapów trafia też do logów komend. Rejestr jest per proces: /metrics pokazuje proces serwera
+# (każdy worker osobno). Proces crona (refresh_jobs) kończy się po odświeżeniu, więc przed wyjściem
+# dopisuje swoje metryki do migawki JSON (save_snapshot), którą /metrics sumuje z metrykami serwera.
+import copy
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+COUNT_BUCKETS = (10, 100, 1000, 10_000, 100_000, 1_000_000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _combine(self, value, other):
+        return value + other
+
+    def merged(self, snapshot=None):
+        """
+        Posortowane (etykiety, wartość) procesu połączone z wartościami z migawki {etykiety: wartość}.
+        """
+        with self._lock:
+            values = {key: copy.deepcopy(value) for key, value in self._values.items()}
+        for key, value in (snapshot or {}).items():
+            values[key] = self._combine(values[key], value) if key in values else value
+        return sorted(values.items())
+
+    def samples(self, snapshot=None):
+        """
+        Lista (przyrostek nazwy, wartości etykiet, dodatkowe etykiety, wartość).
+        """
+        return [("", key, (), value) for key, value in self.merged(snapshot)]
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels))
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self, snapshot=None):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, key, extra, value in self.samples(snapshot):
+            lines.append(f"{self.name}{suffix}{_labels(self.labelnames, key, extra)} {_number(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _combine(self, value, other):
+        return value  # wartość procesu jest nowsza niż zapisana w migawce
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=TIME_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def value(self, **labels):
+        state = super().value(**labels)
+        return None if state is None else {"sum": state["sum"], "count": state["count"]}
+
+    def _combine(self, value, other):
+        if len(other["buckets"]) != len(value["buckets"]):
+            return value  # migawka sprzed zmiany przedziałów
+        return {
+            "buckets": [a + b for a, b in zip(value["buckets"], other["buckets"])],
+            "sum": value["sum"] + other["sum"],
+            "count": value["count"] + other["count"],
+        }
+
+    def samples(self, snapshot=None):
+        samples = []
+        for key, state in self.merged(snapshot):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["buckets"]):
+                cumulative += count
+                samples.append(("_bucket", key, (("le", _number(bound)),), cumulative))
+            samples.append(("_sum", key, (), state["sum"]))
+            samples.append(("_count", key, (), state["count"]))
+        return samples
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self, snapshot=None) -> str:
+        """
+        Format tekstowy Prometheusa; `snapshot` (z load_snapshot) jest sumowany z metrykami procesu.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(
+            line for metric in metrics for line in metric.render(_snapshot_values(snapshot, metric.name))
+        ) + "\n"
+
+    def export(self, snapshot=None):
+        """
+        Stan rejestru (połączony z `snapshot`) w postaci do zapisu jako JSON: {nazwa: [[etykiety, wartość]]}.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: [[list(key), value] for key, value in metric.merged(_snapshot_values(snapshot, metric.name))]
+            for metric in metrics
+        }
+
+    def clear(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+def _snapshot_values(snapshot, name):
+    return {tuple(key): value for key, value in (snapshot or {}).get(name, [])}
+
+
+def load_snapshot(path):
+    """
+    Metryki zapisane przez save_snapshot() albo {}, jeśli pliku jeszcze nie ma.
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_snapshot(path, registry=None):
+    """
+    Dopisz metryki procesu do migawki `path` i wyczyść rejestr, żeby kolejny zapis ich nie zdublował.
+    Wywołujący odpowiada za to, by naraz pisał jeden proces (refresh_jobs robi to pod swoją blokadą).
+    """
+    registry = registry or REGISTRY
+    state = registry.export(load_snapshot(path))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+    registry.clear()
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "jobfinder_stage_seconds", "Duration of one stage of an operation.", ("operation", "stage"),
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "jobfinder_request_seconds", "HTTP request latency by view and status.", ("method", "view", "status"),
+))
+MATCHES = REGISTRY.register(Counter(
+    "jobfinder_matches_total", "CV match requests by how the result was served.", ("result",),
+))
+MATCH_CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "jobfinder_match_cache_lookups_total", "Match cache lookups by the tier that answered.", ("result",),
+))
+JOBS_SCORED = REGISTRY.register(Histogram(
+    "jobfinder_match_jobs_scored", "Jobs scored with the full formula per computed match.", buckets=COUNT_BUCKETS,
+))
+CORPUS_JOBS = REGISTRY.register(Gauge(
+    "jobfinder_corpus_jobs", "Active jobs in the loaded match index.",
+))
+ROWS_WRITTEN = REGISTRY.register(Counter(
+    "jobfinder_rows_written_total", "Database rows written by operation.", ("operation",),
+))
+
+
+class StageTimer:
+    """
+    Czasy kolejnych etapów jednej operacji: `with timer.stage("score"): ...`.
+    Każdy etap jest od razu zapisywany w STAGE_SECONDS; `timings` zachowuje kolejność etapów.
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+        STAGE_SECONDS.observe(seconds, operation=self.operation, stage=name)
+
+    @property
+    def total(self):
+        return sum(self.timings.values())
+
+    def summary(self):
+        return ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.timings.items())
+
+
+def render(snapshot=None) -> str:
+    return REGISTRY.render(snapshot)
@@ -0,0 +1,42 @@
+# Middleware mierzący czas obsługi żądań (histogram jobfinder_request_seconds, jobfinder/metrics.py).
+# Etykietą jest nazwa widoku z urls.py, nie ścieżka — identyfikatory w URL (np. /match/<cv_id>/)
+# nie tworzą osobnych serii. Działa dla widoków synchronicznych i asynchronicznych.
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from jobfinder.metrics import REQUEST_SECONDS
+
+
+def _observe(request, response, started):
+    match = getattr(request, "resolver_match", None)
+    REQUEST_SECONDS.observe(
+        time.perf_counter() - started,
+        method=request.method,
+        view=match.view_name if match else "unresolved",
+        status=response.status_code,
+    )
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        _observe(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        _observe(request, response, started)
+        return response
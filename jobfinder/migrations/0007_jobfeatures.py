@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 04:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobfinder', '0006_job_match_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobFeatures',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='features', serialize=False, to='jobfinder.job')),
+                ('version', models.PositiveSmallIntegerField(default=0)),
+                ('title', models.TextField(blank=True, default='')),
+                ('tags', models.TextField(blank=True, default='')),
+                ('description', models.TextField(blank=True, default='')),
+                ('tokens', models.JSONField(default=list)),
+                ('seniority', models.JSONField(default=list)),
+                ('required_experience', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('location', models.CharField(blank=True, default='', max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
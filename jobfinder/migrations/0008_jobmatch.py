@@ -0,0 +1,46 @@
+# Generated by Django 5.2.8 on 2026-10-18 04:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobfinder', '0007_jobfeatures'),
+        ('users', '0003_alter_cv_experience_years'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchRun',
+            fields=[
+                ('cv', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='match_run', serialize=False, to='users.cv')),
+                ('cv_version', models.CharField(max_length=64)),
+                ('corpus_version', models.PositiveIntegerField()),
+                ('depth', models.PositiveIntegerField()),
+                ('n_results', models.PositiveIntegerField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RemoveField(
+            model_name='job',
+            name='match_score',
+        ),
+        migrations.CreateModel(
+            name='JobMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveIntegerField()),
+                ('seniority_match', models.BooleanField(default=False)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('cv', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_matches', to='users.cv')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='jobfinder.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['cv', '-score'], name='jobmatch_cv_score_idx')],
+                'constraints': [models.UniqueConstraint(fields=('cv', 'job'), name='unique_job_match_per_cv')],
+            },
+        ),
+    ]
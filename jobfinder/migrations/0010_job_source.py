@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 04:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobfinder', '0009_job_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='source',
+            field=models.CharField(db_index=True, default='remoteok', max_length=50),
+        ),
+    ]
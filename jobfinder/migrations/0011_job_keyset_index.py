@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobfinder', '0010_job_source'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', '-date_last_seen', '-id'], name='job_status_seen_id_idx'),
+        ),
+    ]
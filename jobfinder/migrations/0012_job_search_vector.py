@@ -0,0 +1,60 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:40
+
+import django.contrib.postgres.search
+from django.db import DatabaseError, migrations, transaction
+
+
+# Indeksy wyszukiwania istnieją tylko w PostgreSQL; na innych bazach (SQLite w testach)
+# jobfinder/search.py korzysta z przenośnego icontains.
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS job_search_vector_gin ON jobfinder_job USING gin (search_vector)"
+    )
+    # trigramowy indeks dla filtra location__icontains (UPPER(location::text) LIKE ...);
+    # rozszerzenie pg_trgm może wymagać uprawnień — bez niego filtr działa jak dotąd
+    try:
+        with transaction.atomic():
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            schema_editor.execute(
+                "CREATE INDEX IF NOT EXISTS job_location_trgm ON jobfinder_job "
+                "USING gin (UPPER(location::text) gin_trgm_ops)"
+            )
+    except DatabaseError:
+        pass
+
+    from django.conf import settings
+
+    config = settings.JOB_SEARCH_CONFIG
+    schema_editor.execute(
+        "UPDATE jobfinder_job SET search_vector = "
+        "setweight(to_tsvector(%s::regconfig, COALESCE(title, '')), 'A') || "
+        "setweight(to_tsvector(%s::regconfig, COALESCE(company, '')), 'B') || "
+        "setweight(to_tsvector(%s::regconfig, COALESCE(attributes::text, '')), 'B') || "
+        "setweight(to_tsvector(%s::regconfig, COALESCE(description, '')), 'C')",
+        [config] * 4,
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS job_location_trgm")
+    schema_editor.execute("DROP INDEX IF EXISTS job_search_vector_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobfinder', '0011_job_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:03
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Wypełnij tabelę tagów z istniejących Job.attributes (ta sama normalizacja co
+# jobfinder.features.normalize_text, skopiowana, żeby migracja nie zależała od kodu aplikacji).
+def _normalize(text):
+    text = re.sub(r"[^a-z0-9+#\-\.\s]+", " ", text.lower())
+    return re.sub(r"\s+", " ", text).strip()[:100]
+
+
+def backfill_tags(apps, schema_editor):
+    Job = apps.get_model("jobfinder", "Job")
+    Tag = apps.get_model("jobfinder", "Tag")
+    JobTag = apps.get_model("jobfinder", "JobTag")
+
+    names_by_job = {}
+    for job_id, attributes in Job.objects.values_list("id", "attributes").iterator(chunk_size=2000):
+        names = set()
+        for t in attributes if isinstance(attributes, list) else []:
+            raw = (t.get("slug") or t.get("name") or "") if isinstance(t, dict) else str(t)
+            name = _normalize(raw)
+            if name:
+                names.add(name)
+        names_by_job[job_id] = names
+
+    all_names = set().union(*names_by_job.values()) if names_by_job else set()
+    Tag.objects.bulk_create([Tag(name=name) for name in all_names], ignore_conflicts=True, batch_size=1000)
+    tag_ids = dict(Tag.objects.values_list("name", "id"))
+    JobTag.objects.bulk_create(
+        [JobTag(job_id=job_id, tag_id=tag_ids[name]) for job_id, names in names_by_job.items() for name in names],
+        batch_size=2000,
+    )
+
+    active = {}
+    for tag_id in JobTag.objects.filter(job__status="active").values_list("tag_id", flat=True).iterator(chunk_size=5000):
+        active[tag_id] = active.get(tag_id, 0) + 1
+    tags = list(Tag.objects.filter(id__in=list(active)))
+    for tag in tags:
+        tag.active_count = active[tag.id]
+    Tag.objects.bulk_update(tags, ["active_count"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobfinder', '0012_job_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('active_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-active_count'], name='tag_active_count_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_tags', to='jobfinder.job')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_tags', to='jobfinder.tag')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='jobs', through='jobfinder.JobTag', to='jobfinder.tag'),
+        ),
+        migrations.AddIndex(
+            model_name='jobtag',
+            index=models.Index(fields=['tag', 'job'], name='jobtag_tag_job_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='jobtag',
+            constraint=models.UniqueConstraint(fields=('job', 'tag'), name='unique_job_tag'),
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobfinder', '0013_tags'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'date_posted'], name='job_status_posted_idx'),
+        ),
+    ]
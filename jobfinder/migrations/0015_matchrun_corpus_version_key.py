@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobfinder', '0014_job_status_posted_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='matchrun',
+            name='corpus_version',
+            field=models.CharField(max_length=64),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:10
+
+import re
+
+from django.db import migrations
+
+
+# search_vector utrzymuje trigger PostgreSQL, więc każdy zapis oferty (scraper, admin, ORM, SQL)
+# odświeża wektor. Konfiguracja tekstowa jest wpisana w funkcję triggera — po zmianie
+# JOB_SEARCH_CONFIG trzeba ponownie uruchomić tę migrację (migrate jobfinder 0015, potem migrate).
+def create_search_vector_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    from django.conf import settings
+
+    config = settings.JOB_SEARCH_CONFIG
+    if not re.fullmatch(r"\w+", config):
+        raise ValueError(f"Invalid JOB_SEARCH_CONFIG: {config!r}")
+    schema_editor.execute(f"""
+        CREATE OR REPLACE FUNCTION jobfinder_job_search_vector() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('{config}'::regconfig, COALESCE(NEW.title, '')), 'A') ||
+                setweight(to_tsvector('{config}'::regconfig, COALESCE(NEW.company, '')), 'B') ||
+                setweight(to_tsvector('{config}'::regconfig, COALESCE(NEW.attributes::text, '')), 'B') ||
+                setweight(to_tsvector('{config}'::regconfig, COALESCE(NEW.description, '')), 'C');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    schema_editor.execute("DROP TRIGGER IF EXISTS job_search_vector_update ON jobfinder_job")
+    schema_editor.execute(
+        "CREATE TRIGGER job_search_vector_update "
+        "BEFORE INSERT OR UPDATE OF title, company, attributes, description ON jobfinder_job "
+        "FOR EACH ROW EXECUTE FUNCTION jobfinder_job_search_vector()"
+    )
+    # wektory ofert zmienionych poza scraperem przed tą migracją mogą być nieaktualne
+    schema_editor.execute("UPDATE jobfinder_job SET title = title")
+
+
+def drop_search_vector_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP TRIGGER IF EXISTS job_search_vector_update ON jobfinder_job")
+    schema_editor.execute("DROP FUNCTION IF EXISTS jobfinder_job_search_vector()")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobfinder', '0015_matchrun_corpus_version_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_vector_trigger, drop_search_vector_trigger),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models 
 from django.utils import timezone
 from datetime import timedelta
@@ -22,10 +23,24 @@ class Job(models.Model):
     date_posted = models.DateTimeField(null=True, blank=True) 
     description = models.TextField(null=True, blank=True)
     date_last_seen = models.DateTimeField(auto_now=True)  # Aktualizowany za każdym razem, gdy widzimy ofertę w naszym kanale
-    match_score = models.FloatField(null=True, blank=True)  # Przechowuj ostatnio obliczony wynik dopasowania
+    content_hash = models.CharField(max_length=64, blank=True, default='')  # odcisk surowej oferty z API (wykrywanie zmian)
+    source = models.CharField(max_length=50, default='remoteok', db_index=True)  # nazwa źródła z jobfinder/sources.py
+    # wektor wyszukiwania pełnotekstowego (PostgreSQL, utrzymywany triggerem, indeks GIN — patrz jobfinder/search.py)
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+    # znormalizowane tagi (synchronizowane z attributes przez scraper, patrz jobfinder/tags.py)
+    tags = models.ManyToManyField('Tag', through='JobTag', related_name='jobs', blank=True)
 
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_ACTIVE)
 
+    class Meta:
+        indexes = [
+            # stronicowanie kursorem listy aktywnych ofert (jobfinder/pagination.py);
+            # obsługuje też zakresy (status, date_last_seen < próg) w jobfinder/lifecycle.py
+            models.Index(fields=['status', '-date_last_seen', '-id'], name='job_status_seen_id_idx'),
+            # archiwizacja/usuwanie po dacie publikacji (jobfinder/lifecycle.py)
+            models.Index(fields=['status', 'date_posted'], name='job_status_posted_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} at {self.company}"
     
@@ -40,4 +55,94 @@ class Job(models.Model):
 
         # Oznacz jako przestarzałe, jeśli nie widziano przez ostatnie 30 dni
         stale_threshold = timezone.now() - timedelta(days=30)
-        return self.date_last_seen < stale_threshold
\ No newline at end of file
+        return self.date_last_seen < stale_threshold
+
+class Tag(models.Model):
+    # Znormalizowany tag oferty (np. "python", "c++"); active_count to wstępnie policzona
+    # liczba aktywnych ofert z tagiem (facety listy ofert), odświeżana po scrapowaniu/archiwizacji.
+    name = models.CharField(max_length=100, unique=True)
+    active_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-active_count'], name='tag_active_count_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class JobTag(models.Model):
+    # Powiązanie oferta–tag indeksowane w obie strony: (job, tag) unikalne, (tag, job) do filtrów.
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='job_tags')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='job_tags')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'tag'], name='unique_job_tag'),
+        ]
+        indexes = [
+            models.Index(fields=['tag', 'job'], name='jobtag_tag_job_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tag_id} on job {self.job_id}"
+
+
+class JobFeatures(models.Model):
+    # Wstępnie obliczone cechy oferty używane przez matcher (patrz jobfinder/features.py).
+    # Wypełniane przy zapisie oferty przez scraper, przeliczane komendą rebuild_job_features.
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='features')
+    version = models.PositiveSmallIntegerField(default=0)  # wersja reguł ekstrakcji
+    title = models.TextField(blank=True, default='')  # znormalizowany tytuł
+    tags = models.TextField(blank=True, default='')  # znormalizowane tagi połączone spacją
+    description = models.TextField(blank=True, default='')  # znormalizowany opis
+    tokens = models.JSONField(default=list)  # zbiór tokenów z tytułu i tagów
+    seniority = models.JSONField(default=list)  # wykryte poziomy zaawansowania
+    required_experience = models.PositiveSmallIntegerField(null=True, blank=True)  # wymagane lata doświadczenia
+    location = models.CharField(max_length=255, blank=True, default='')  # znormalizowana lokalizacja
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Features for job {self.job_id}"
+
+    @property
+    def text(self) -> str:
+        # Połączony tekst oferty dla TF-IDF
+        return f"{self.title} {self.tags} {self.description}"
+
+
+class JobMatch(models.Model):
+    # Wynik dopasowania oferty do konkretnego CV (zastępuje wspólną kolumnę Job.match_score).
+    # Zapisywany jednym upsertem na uruchomienie matchera, czytany przez widoki dopasowań.
+    cv = models.ForeignKey('users.CV', on_delete=models.CASCADE, related_name='job_matches')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='matches')
+    score = models.FloatField()  # wynik procentowy 0..100
+    rank = models.PositiveIntegerField()  # pozycja w rankingu (0 = najlepsza)
+    seniority_match = models.BooleanField(default=False)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['cv', 'job'], name='unique_job_match_per_cv'),
+        ]
+        indexes = [
+            models.Index(fields=['cv', '-score'], name='jobmatch_cv_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.score:.2f}% for job {self.job_id} (CV {self.cv_id})"
+
+
+class MatchRun(models.Model):
+    # Stan ostatniego dopasowania dla CV: pozwala stwierdzić, czy zapisany ranking jest aktualny
+    # (ta sama treść CV, ta sama wersja korpusu i co najmniej tyle wyników, ile potrzeba).
+    cv = models.OneToOneField('users.CV', on_delete=models.CASCADE, primary_key=True, related_name='match_run')
+    cv_version = models.CharField(max_length=64)  # skrót pól CV używanych przez matcher
+    corpus_version = models.CharField(max_length=64)  # wersja korpusu: build_id@created_at indeksu TF-IDF
+    depth = models.PositiveIntegerField()  # top_n, dla którego policzono ranking
+    n_results = models.PositiveIntegerField()  # liczba zapisanych wyników
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Match run for CV {self.cv_id} (corpus {self.corpus_version})"
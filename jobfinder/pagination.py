@@ -0,0 +1,113 @@
+# Stronicowanie kursorem (keyset) — koszt strony nie zależy od jej numeru ani od rozmiaru
+# korpusu (zamiast OFFSET/renderowania wszystkich ofert naraz). Domyślny klucz to
+# (date_last_seen, id), malejąco; wyszukiwanie sortuje po (search_rank, date_last_seen, id).
+# Kursor to zakodowane wartości klucza ostatniego/pierwszego elementu strony.
+import base64
+import hashlib
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+DATE_ORDERING = ("date_last_seen", "id")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(job, ordering=DATE_ORDERING):
+    values = [getattr(job, field) for field in ordering]
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, ordering=DATE_ORDERING):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise ValueError("cursor does not match ordering")
+        return [
+            datetime.fromisoformat(value) if field.startswith("date_") else value
+            for field, value in zip(ordering, values)
+        ]
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def _beyond(ordering, values, lookup):
+    """
+    Warunek "klucz za kursorem" dla porządku leksykograficznego:
+    (a < x) OR (a = x AND b < y) OR (a = x AND b = y AND c < z) ...
+    """
+    condition = Q()
+    for i, field in enumerate(ordering):
+        equal = {f: v for f, v in zip(ordering[:i], values[:i])}
+        condition |= Q(**equal, **{f"{field}__{lookup}": values[i]})
+    return condition
+
+
+class KeysetPage:
+    """
+    Jedna strona wyników: items, kursory sąsiednich stron (None, jeśli ich nie ma).
+    """
+
+    def __init__(self, items, next_cursor=None, previous_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def keyset_page(queryset, after=None, before=None, page_size=30, ordering=DATE_ORDERING):
+    """
+    Strona `page_size` elementów queryset (malejąco po `ordering`) po kursorze `after`
+    albo przed kursorem `before`. Pobiera page_size + 1 wierszy, żeby wiedzieć, czy jest dalej.
+    Pola `ordering` mogą być adnotacjami (np. search_rank), muszą jednak kończyć się unikalnym id.
+    """
+    if before:
+        values = decode_cursor(before, ordering)
+        rows = list(
+            queryset.filter(_beyond(ordering, values, "gt")).order_by(*ordering)[:page_size + 1]
+        )
+        has_more = len(rows) > page_size
+        items = rows[:page_size][::-1]
+        return KeysetPage(
+            items,
+            next_cursor=encode_cursor(items[-1], ordering) if items else None,
+            previous_cursor=encode_cursor(items[0], ordering) if items and has_more else None,
+        )
+
+    if after:
+        queryset = queryset.filter(_beyond(ordering, decode_cursor(after, ordering), "lt"))
+    rows = list(queryset.order_by(*(f"-{field}" for field in ordering))[:page_size + 1])
+    has_more = len(rows) > page_size
+    items = rows[:page_size]
+    return KeysetPage(
+        items,
+        next_cursor=encode_cursor(items[-1], ordering) if items and has_more else None,
+        previous_cursor=encode_cursor(items[0], ordering) if items and after else None,
+    )
+
+
+def cached_count(queryset, filter_params, version=None):
+    """
+    Liczba ofert dla danego zestawu filtrów z cache (JOB_LIST_COUNT_TTL sekund).
+    `version` (np. czas ostatniego odświeżenia ofert) unieważnia wpis po zmianie danych.
+    """
+    key_data = json.dumps({"filters": filter_params, "version": str(version)}, sort_keys=True)
+    key = "job_list_count:" + hashlib.sha1(key_data.encode("utf-8")).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.JOB_LIST_COUNT_TTL)
+    return count
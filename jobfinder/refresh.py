@@ -0,0 +1,154 @@
+# Odświeżanie ofert w tle (cron przez django_crontab, patrz CRONJOBS w settings.py).
+# Scrapowanie, archiwizacja i usuwanie nie są już wywoływane w żądaniu job_list — widok tylko
+# czyta bazę i pokazuje, jak stare są dane. Blokada plikowa gwarantuje, że naraz działa tylko
+# jedno odświeżanie, a minimalny odstęp chroni przed zbyt częstym odpytywaniem API.
+# Świeżość danych to czas ostatniego udanego scrapowania (last_success_at), nie koniec
+# odświeżania — komenda scrape_remotejobs rzuca CommandError, gdy żadne źródło się nie powiodło,
+# a ostatni błąd (last_error) jest zapamiętywany osobno i pokazywany na liście ofert.
+# Metryki procesu crona (czasy etapów scrapowania i archiwizacji, zapisane wiersze) trafiają przed
+# jego zakończeniem do migawki refresh_metrics.json, którą /metrics dołącza do metryk serwera.
+import json
+import os
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import Max
+from django.utils import timezone
+
+from jobfinder import metrics
+from jobfinder.locks import file_lock
+from jobfinder.logging_config import setup_logger
+from jobfinder.models import Job
+
+logger = setup_logger("scraper", "scraper.log")
+
+REFRESH_COMMANDS = ("scrape_remotejobs", "archive_old_jobs", "delete_stale_jobs")
+SCRAPE_COMMAND = "scrape_remotejobs"  # jego sukces oznacza świeże dane
+
+REFRESH_DONE = "done"
+REFRESH_SKIPPED = "skipped"  # ostatnie odświeżanie było niedawno
+REFRESH_LOCKED = "locked"  # inne odświeżanie właśnie trwa
+
+
+def _state_path():
+    return os.path.join(str(settings.JOBS_REFRESH_STATE_DIR), "refresh_state.json")
+
+
+def _lock_path():
+    return os.path.join(str(settings.JOBS_REFRESH_STATE_DIR), "refresh.lock")
+
+
+def _metrics_path():
+    return os.path.join(str(settings.JOBS_REFRESH_STATE_DIR), "refresh_metrics.json")
+
+
+def refresh_metrics() -> dict:
+    """
+    Metryki zapisane przez procesy odświeżania (do metrics.render()).
+    """
+    return metrics.load_snapshot(_metrics_path())
+
+
+def read_refresh_state() -> dict:
+    try:
+        with open(_state_path()) as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    for key in ("started_at", "finished_at", "last_success_at"):
+        if state.get(key):
+            state[key] = datetime.fromisoformat(state[key])
+    if state.get("last_error"):
+        state["last_error"]["at"] = datetime.fromisoformat(state["last_error"]["at"])
+    return state
+
+
+def _write_refresh_state(state):
+    path = _state_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    def serialize(value):
+        if isinstance(value, dict):
+            return {key: serialize(item) for key, item in value.items()}
+        return value.isoformat() if isinstance(value, datetime) else value
+
+    serializable = serialize(state)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(serializable, f, indent=2)
+    os.replace(tmp, path)
+
+
+def refresh_jobs(force=False, stdout=None):
+    """
+    Uruchom scrapowanie, archiwizację i usuwanie ofert, jeśli nikt inny tego nie robi
+    i od ostatniego startu minęło co najmniej JOBS_REFRESH_MIN_INTERVAL sekund.
+    Zwraca REFRESH_DONE, REFRESH_SKIPPED albo REFRESH_LOCKED.
+    """
+    with file_lock(_lock_path(), blocking=False) as acquired:
+        if not acquired:
+            logger.info("Job refresh already running, skipping.")
+            return REFRESH_LOCKED
+
+        state = read_refresh_state()
+        min_interval = timedelta(seconds=settings.JOBS_REFRESH_MIN_INTERVAL)
+        last_started = state.get("started_at")
+        if not force and last_started and timezone.now() - last_started < min_interval:
+            logger.info("Job refresh ran at %s, skipping.", last_started.isoformat())
+            return REFRESH_SKIPPED
+
+        state = {
+            "started_at": timezone.now(),
+            "finished_at": None,
+            "errors": [],
+            # wynik poprzednich przebiegów zostaje, dopóki ten się nie powiedzie / nie zawiedzie
+            "last_success_at": state.get("last_success_at"),
+            "last_error": state.get("last_error"),
+        }
+        _write_refresh_state(state)
+
+        for name in REFRESH_COMMANDS:
+            try:
+                call_command(name, stdout=stdout)
+            except Exception as e:
+                logger.error("%s failed: %s", name, e, exc_info=True)
+                state["errors"].append(f"{name}: {e}")
+                state["last_error"] = {"at": timezone.now(), "message": f"{name}: {e}"}
+            else:
+                if name == SCRAPE_COMMAND:
+                    state["last_success_at"] = timezone.now()
+
+        state["finished_at"] = timezone.now()
+        _write_refresh_state(state)
+        # nadal pod blokadą, więc migawkę metryk zapisuje naraz tylko jeden proces
+        metrics.save_snapshot(_metrics_path())
+        logger.info(
+            "Job refresh finished in %.1fs with %s errors",
+            (state["finished_at"] - state["started_at"]).total_seconds(),
+            len(state["errors"]),
+        )
+        return REFRESH_DONE
+
+
+def last_refreshed_at():
+    """
+    Czas ostatniego udanego scrapowania; jeśli go brak (cron nie działał albo scraper jeszcze
+    nigdy się nie powiódł), użyj najnowszego date_last_seen aktywnych ofert.
+    """
+    succeeded = read_refresh_state().get("last_success_at")
+    if succeeded:
+        return succeeded
+    return Job.objects.filter(status=Job.STATUS_ACTIVE).aggregate(last=Max("date_last_seen"))["last"]
+
+
+def last_refresh_error():
+    """
+    Ostatni błąd odświeżania ({"at", "message"}) albo None, jeśli od tego czasu scrapowanie
+    się powiodło.
+    """
+    state = read_refresh_state()
+    error = state.get("last_error")
+    succeeded = state.get("last_success_at")
+    if error and (succeeded is None or error["at"] > succeeded):
+        return error
+    return None
@@ -0,0 +1,81 @@
+# Dwuetapowe dopasowanie: najpierw tani wybór kandydatów, potem pełna formuła (scoring.score_jobs)
+# tylko dla nich. Kandydaci to oferty, które mają co najmniej `min_overlap` wspólnych tokenów
+# (umiejętności, technologie, słowa ról) z CV — liczone po indeksie odwróconym token -> oferty
+# z indeksu TF-IDF, więc koszt zależy od długości list ofert tokenów CV, a nie od rozmiaru
+# korpusu — oraz `neighbours` ofert najbardziej podobnych tekstowo (TF-IDF albo, przy silniku
+# LSA, przybliżeni sąsiedzi z IVF — wtedy podobieństwo liczone jest tylko dla kandydatów).
+# To przybliżenie: oferta bez wspólnych tokenów i spoza sąsiadów nie trafi do wyników, nawet
+# gdyby premie za lokalizację/poziom dały jej wysoki wynik. recall() mierzy tę stratę względem
+# pełnego punktowania (benchmark: python manage.py benchmark retrieval).
+import numpy as np
+from django.conf import settings
+
+from jobfinder.scoring import top_k
+
+
+def candidate_tokens(profile):
+    return set(profile["skills"]) | set(profile["technologies"]) | set(profile["roles"])
+
+
+def token_overlap(index, tokens) -> np.ndarray:
+    """
+    Liczba tokenów z `tokens` w każdej ofercie — suma list ofert (kolumn CSC) tylko tych tokenów.
+    """
+    overlap = np.zeros(len(index), dtype=np.int32)
+    postings = index.postings
+    for token in tokens:
+        column = index.tokens.get(token)
+        if column is not None:
+            overlap[postings.indices[postings.indptr[column]:postings.indptr[column + 1]]] += 1
+    return overlap
+
+
+def candidate_rows(index, profile, similarities, top_n, min_overlap=None, neighbours=None, min_corpus=None,
+                   query=None):
+    """
+    Posortowane wiersze indeksu do pełnego punktowania albo None, gdy należy punktować wszystkie
+    oferty (wyłączone w ustawieniach lub korpus mniejszy niż `min_corpus`).
+    Sąsiedzi to top `neighbours` z `similarities` albo — gdy similarities jest None —
+    index.nearest(query). Domyślne progi pochodzą z ustawień MATCH_RETRIEVAL_*.
+    """
+    if min_corpus is None:
+        if not settings.MATCH_RETRIEVAL_ENABLED:
+            return None
+        min_corpus = settings.MATCH_RETRIEVAL_MIN_CORPUS
+    if len(index) < min_corpus:
+        return None
+    if min_overlap is None:
+        min_overlap = settings.MATCH_RETRIEVAL_MIN_OVERLAP
+    if neighbours is None:
+        neighbours = settings.MATCH_RETRIEVAL_NEIGHBOURS
+
+    overlap = token_overlap(index, candidate_tokens(profile))
+    selected = overlap >= max(1, min_overlap)
+    # zawsze co najmniej top_n kandydatów
+    k = max(neighbours, top_n)
+    selected[top_k(similarities, k) if similarities is not None else index.nearest(query, k)] = True
+    return np.flatnonzero(selected)
+
+
+def similarities_and_candidates(index, profile, cv_text, top_n):
+    """
+    (similarities, candidates) dla match_jobs_to_cv. TF-IDF: dokładne podobieństwo do wszystkich
+    ofert, z którego wybierani są sąsiedzi. LSA: sąsiedzi z IVF i podobieństwo tylko dla kandydatów
+    (gdy dwuetapowe dopasowanie jest wyłączone — dokładne dla wszystkich ofert).
+    """
+    query = index.query(cv_text)
+    if index.semantic is None:
+        similarities = index.query_similarities(query)
+        return similarities, candidate_rows(index, profile, similarities, top_n)
+    candidates = candidate_rows(index, profile, None, top_n, query=query)
+    return index.query_similarities(query, candidates), candidates
+
+
+def recall(exhaustive, approximate):
+    """
+    Odsetek ofert z pełnego rankingu obecnych w rankingu przybliżonym (recall@n).
+    """
+    exhaustive = set(exhaustive)
+    if not exhaustive:
+        return 1.0
+    return len(exhaustive & set(approximate)) / len(exhaustive)
@@ -0,0 +1,163 @@
+# Wektorowe punktowanie ofert — ta sama formuła co wcześniej w pętli match_jobs_to_cv,
+# ale liczona operacjami NumPy/SciPy na całym korpusie naraz (kolumny z jobfinder/tfidf_index.py).
+# Kolejność operacji odpowiada dawnej pętli, dzięki czemu wyniki są identyczne co do bitu.
+import re
+
+import numpy as np
+
+from jobfinder.features import SENIORITY_LEVELS, WORD_RE
+from jobfinder.keywords import phrase_regex
+
+
+def infer_allowed_seniority(years: int):
+    if years is None:
+        return {"junior", "mid"}
+    if years < 2:
+        return {"intern", "junior"}
+    if years < 3:
+        return {"junior"}
+    if years < 5:
+        return {"mid"}
+    return {"senior"}
+
+
+def seniority_mask(levels) -> int:
+    return sum(1 << i for i, level in enumerate(SENIORITY_LEVELS) if level in levels)
+
+
+def count_matches(index, tokens, rows=None) -> np.ndarray:
+    """
+    Liczba tokenów CV obecnych w tokenach każdej oferty (lub tylko wierszy `rows`): iloczyn
+    binarnej macierzy tokenów ofert i binarnego wektora CV (koszt proporcjonalny do liczby
+    niezerowych elementów).
+    """
+    tag_matrix = index.tag_matrix if rows is None else index.tag_matrix[rows]
+    columns = [index.tokens[t] for t in tokens if t in index.tokens]
+    if not columns:
+        return np.zeros(tag_matrix.shape[0], dtype=np.int32)
+    cv_vector = np.zeros(tag_matrix.shape[1], dtype=np.int32)
+    cv_vector[columns] = 1
+    return tag_matrix @ cv_vector
+
+
+def rows_matching(pattern, column, n_rows) -> np.ndarray:
+    """
+    Maska wierszy kolumny tekstowej (tekst połączony "\\n" + offsety), w których występuje wzorzec.
+    """
+    text, starts = column
+    mask = np.zeros(n_rows, dtype=bool)
+    positions = [m.start() for m in pattern.finditer(text)]
+    if positions:
+        mask[np.searchsorted(starts, positions, side="right") - 1] = True
+    return mask
+
+
+def rows_with_word(index, word) -> np.ndarray:
+    """
+    Maska ofert, których tytuł zawiera słowo `word` (lista wierszy z indeksu odwróconego tytułów).
+    """
+    mask = np.zeros(len(index), dtype=bool)
+    column = index.title_words.get(word)
+    if column is not None:
+        postings = index.title_postings
+        mask[postings.indices[postings.indptr[column]:postings.indptr[column + 1]]] = True
+    return mask
+
+
+def score_jobs(index, profile, similarities, rows=None):
+    """
+    Policz surowe wyniki (0..1) dla wszystkich ofert indeksu albo tylko dla wierszy `rows`
+    (kandydaci z jobfinder/retrieval.py; `similarities` zawsze dla całego indeksu).
+    Zwraca (scores, seniority_match, skill_matches, tech_matches) jako tablice wyrównane
+    z index.job_ids (albo z `rows`).
+    """
+    if rows is None:
+        def take(values):
+            return values
+    else:
+        def take(values):
+            return np.asarray(values)[rows]
+    n = len(index) if rows is None else len(rows)
+
+    # baseline to bias results toward ~50% on average
+    score = np.full(n, 0.35)
+
+    # semantic similarity (adds up to +0.25)
+    score += take(similarities) * 0.25
+
+    # dopasowania umiejętności (dodaje do +0.20)
+    cv_skills = profile["skills"]
+    skill_matches = count_matches(index, cv_skills, rows)
+    if cv_skills:
+        score += 0.20 * (skill_matches / max(1, len(cv_skills)))
+
+    # dopasowania technologii (dodaje do +0.15)
+    cv_tech = profile["technologies"]
+    tech_matches = count_matches(index, cv_tech, rows)
+    if cv_tech:
+        score += 0.15 * (tech_matches / max(1, len(cv_tech)))
+
+    # poziom zaawansowania: małe wzmocnienie lub kara multiplikatywna
+    seniority = take(index.seniority)
+    has_seniority = seniority != 0
+    seniority_match = (seniority & seniority_mask(profile["allowed_seniority"])) != 0
+    score = np.where(
+        has_seniority,
+        np.where(seniority_match, score + 0.15, score * 0.8),
+        score,
+    )
+
+    # wymagane doświadczenie: małe wzmocnienie lub kara
+    years = profile["experience_years"]
+    if years is not None:
+        required = take(index.required_experience)
+        score = np.where(
+            required >= 0,
+            np.where(years >= required, score + 0.15, score * 0.8),
+            score,
+        )
+
+    # dopasowanie roli/tytułu: jeden przebieg regexa po wszystkich tytułach dla każdej roli
+    roles = [role for role in profile["roles"] if role]
+    if roles:
+        role_match = np.zeros(len(index), dtype=bool)
+        # zwykłe słowa: listy ofert z indeksu zamiast przeszukiwania wszystkich tytułów
+        for role in roles:
+            if WORD_RE.fullmatch(role):
+                role_match |= rows_with_word(index, role)
+        # pozostałe (np. "c++", "node.js"): jeden przebieg tytułów dla wszystkich naraz
+        other_roles = tuple(sorted(role for role in roles if not WORD_RE.fullmatch(role)))
+        if other_roles:
+            role_match |= rows_matching(phrase_regex(other_roles), index.titles, len(index))
+        score = np.where(take(role_match), score + 0.10, score)
+
+    # preferencje lokalizacji / zdalnej pracy
+    if profile["job_type_preference"] == "remote":
+        score = np.where(take(index.is_remote), score + 0.15, score * 0.95)
+    elif profile["locations"]:
+        loc_match = np.zeros(len(index), dtype=bool)
+        for loc in profile["locations"]:
+            loc_match |= rows_matching(re.compile(re.escape(loc.lower())), index.locations, len(index))
+        score = np.where(take(loc_match), score + 0.10, score * 0.95)
+
+    # ogranicz do 0..1
+    np.clip(score, 0.0, 1.0, out=score)
+    return score, has_seniority & seniority_match, skill_matches, tech_matches
+
+
+def top_k(values, k) -> np.ndarray:
+    """
+    Indeksy k największych wartości, malejąco; remisy w kolejności wierszy (jak stabilne sortowanie).
+    Używa częściowej selekcji (argpartition), więc pełne sortowanie dotyczy tylko zwycięzców.
+    """
+    n = len(values)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= n:
+        return np.argsort(-values, kind="stable")
+
+    threshold = values[np.argpartition(-values, k - 1)[:k]].min()
+    # wszystkie wartości >= progu, żeby remisy na granicy rozstrzygać po kolejności wierszy
+    candidates = np.flatnonzero(values >= threshold)
+    order = np.lexsort((candidates, -values[candidates]))
+    return candidates[order][:k]
@@ -0,0 +1,73 @@
+# Wyszukiwanie pełnotekstowe ofert dla parametru `q` listy ofert.
+# PostgreSQL: wektor Job.search_vector (tytuł A, firma i tagi B, opis C) z indeksem GIN, utrzymywany
+# przez trigger bazy przy każdym zapisie oferty (migracja 0016), zapytanie z dopasowaniem prefiksów
+# (python:* & dev:*) i ranking ts_rank.
+# Inne bazy (np. SQLite w testach): przenośny odpowiednik na icontains z podobnymi wagami pól.
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, F, FloatField, TextField, Value, When
+from django.db.models.functions import Cast
+
+SEARCH_ORDERING = ("search_rank", "date_last_seen", "id")
+
+# wagi pól jak domyślne wagi ts_rank dla A/B/C
+FIELD_WEIGHTS = (("title", 1.0), ("company", 0.4), ("tags_text", 0.4), ("description", 0.2))
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def uses_postgres_search():
+    return connection.vendor == "postgresql"
+
+
+def search_terms(q):
+    return _TERM_RE.findall((q or "").lower())[:10]
+
+
+def search_jobs(queryset, q):
+    """
+    Zawęź queryset do ofert pasujących do wszystkich słów `q` (prefiksowo) i dodaj adnotację
+    search_rank; sortuj/stronicuj po SEARCH_ORDERING. Puste `q` zwraca queryset bez zmian.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return queryset
+    if uses_postgres_search():
+        return _postgres_search(queryset, terms)
+    return _portable_search(queryset, terms)
+
+
+def _postgres_search(queryset, terms):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    # "python dev" -> python:* & dev:* (słowa zawierają tylko znaki \w, więc są bezpieczne)
+    query = SearchQuery(
+        " & ".join(f"{term}:*" for term in terms),
+        search_type="raw",
+        config=settings.JOB_SEARCH_CONFIG,
+    )
+    # ts_rank zwraca real (float4); kursor przenosi rangę jako float Pythona (float8), więc porównanie
+    # z kursorem musi być w tej samej precyzji — inaczej wiersz z kursora wraca na kolejnej stronie
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=Cast(SearchRank(F("search_vector"), query), FloatField()),
+    )
+
+
+def _portable_search(queryset, terms):
+    from django.db.models import Q
+
+    queryset = queryset.annotate(tags_text=Cast("attributes", TextField()))
+    rank = Value(0.0, output_field=FloatField())
+    for term in terms:
+        matches = Q()
+        for field, weight in FIELD_WEIGHTS:
+            matches |= Q(**{f"{field}__icontains": term})
+            rank = rank + Case(
+                When(**{f"{field}__icontains": term}, then=Value(weight)),
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        queryset = queryset.filter(matches)
+    return queryset.annotate(search_rank=rank)
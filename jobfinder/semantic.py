@@ -0,0 +1,105 @@
+# Opcjonalny silnik podobieństwa LSA (MATCH_SIMILARITY = "lsa") dla dużych korpusów.
+# Przy budowie indeksu TF-IDF macierz ofert jest rzutowana przez TruncatedSVD na `components`
+# wymiarów (bez pobierania zewnętrznych modeli); znormalizowane wektory float32 są zapisywane
+# w .npy i mapowane w pamięci. Przybliżone wyszukiwanie najbliższych sąsiadów to indeks IVF:
+# k-means dzieli oferty na ~sqrt(n) list, zapytanie przegląda tylko `probes` list o najbliższych
+# centroidach. Dokładne podobieństwo to jeden iloczyn macierz (n x components) razy wektor CV.
+import os
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import TruncatedSVD
+
+from jobfinder.scoring import top_k
+
+MAX_LISTS = 4096
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+def build_semantic(matrix, path, components=128, seed=0):
+    """
+    Dopasuj LSA do macierzy TF-IDF ofert, zbuduj listy IVF i zapisz wszystko w katalogu indeksu.
+    Zwraca liczbę wymiarów (mniejszą niż `components` dla małych korpusów).
+    """
+    n_jobs, n_features = matrix.shape
+    components = max(1, min(components, n_features - 1, n_jobs))
+    svd = TruncatedSVD(n_components=components, random_state=seed)
+    vectors = _normalize(svd.fit_transform(matrix))
+    components = vectors.shape[1]
+
+    n_lists = max(1, min(MAX_LISTS, int(round(np.sqrt(n_jobs)))))
+    kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=seed, n_init=3, batch_size=4096)
+    labels = kmeans.fit_predict(vectors)
+    order = np.argsort(labels, kind="stable").astype(np.int32)
+    offsets = np.searchsorted(labels[order], np.arange(n_lists + 1)).astype(np.int64)
+
+    np.save(os.path.join(path, "lsa_components.npy"), svd.components_.astype(np.float32))
+    np.save(os.path.join(path, "lsa_vectors.npy"), vectors)
+    np.save(os.path.join(path, "ivf_centroids.npy"), _normalize(kmeans.cluster_centers_))
+    np.save(os.path.join(path, "ivf_order.npy"), order)
+    np.save(os.path.join(path, "ivf_offsets.npy"), offsets)
+    return components
+
+
+class SemanticIndex:
+    """
+    Wektory LSA ofert (mmap), macierz rzutowania TF-IDF -> LSA i listy IVF.
+    """
+
+    def __init__(self, components, vectors, centroids, order, offsets, probes=8):
+        self.components = components  # (wymiary x cechy TF-IDF)
+        self.vectors = vectors  # (oferty x wymiary), wiersze L2-znormalizowane
+        self.centroids = centroids
+        self.order = order  # wiersze ofert pogrupowane listami
+        self.offsets = offsets  # granice list w `order`
+        self.probes = probes
+
+    @classmethod
+    def load(cls, path, probes=8):
+        def load(name):
+            return np.load(os.path.join(path, name), mmap_mode="r")
+
+        return cls(
+            np.asarray(load("lsa_components.npy")),
+            load("lsa_vectors.npy"),
+            np.asarray(load("ivf_centroids.npy")),
+            load("ivf_order.npy"),
+            np.asarray(load("ivf_offsets.npy")),
+            probes=probes,
+        )
+
+    def project(self, tfidf_vector):
+        """
+        Wektor LSA (float32, L2-znormalizowany) dla wiersza TF-IDF.
+        """
+        return _normalize(np.asarray(tfidf_vector @ self.components.T).ravel())
+
+    def similarities(self, query, rows=None):
+        """
+        Dokładne podobieństwo kosinusowe do wszystkich ofert albo tylko do wierszy `rows`
+        (pozostałe pozycje wyniku mają 0).
+        """
+        if rows is None:
+            return (self.vectors @ query).astype(np.float64)
+        result = np.zeros(len(self.vectors))
+        result[rows] = self.vectors[rows] @ query
+        return result
+
+    def nearest(self, query, k, probes=None):
+        """
+        Przybliżone k najbliższych ofert (wiersze): przeszukanie `probes` najbliższych list IVF.
+        """
+        probes = probes or self.probes
+        n_lists = len(self.centroids)
+        if probes >= n_lists:
+            return top_k(self.similarities(query), k)
+
+        lists = top_k(self.centroids @ query, probes)
+        rows = np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in lists])
+        rows.sort()  # dostęp do mmap w kolejności plików
+        return rows[top_k(self.vectors[rows] @ query, k)]
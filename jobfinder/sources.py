@@ -0,0 +1,270 @@
+# Rejestr źródeł ofert (tablic z ogłoszeniami). Każde źródło wie, skąd pobrać kanał i jak
+# przetłumaczyć go na wspólny format oferty; pobieranie, limity zapytań i zapis są wspólne
+# (scrape_remotejobs pobiera wszystkie włączone źródła równolegle i zapisuje je jednym etapem).
+#
+# Wspólny format oferty (kształt kanału RemoteOK, który rozumie scrape_remotejobs._build_job):
+#   url, position, company, location, tags (lista), description (HTML), date (ISO 8601),
+#   salary_min / salary_max (liczby) albo salary (gotowy tekst)
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+from jobfinder.feed_client import FeedClient
+from jobfinder.json_stream import iter_json_items
+
+SOURCES = {}
+DEADLINE_GRACE = 30  # zapas (s) ponad deadline klienta, po którym fetch_sources przestaje czekać na źródło
+
+
+def register_source(cls):
+    """
+    Dekorator rejestrujący klasę źródła pod jej nazwą (JobSource.name).
+    """
+    if not cls.name:
+        raise ValueError(f"{cls.__name__} has no name")
+    SOURCES[cls.name] = cls
+    return cls
+
+
+class RateLimiter:
+    """
+    Odstęp między kolejnymi zapytaniami do jednego hosta (bezpieczny dla wątków).
+    Każde wywołanie rezerwuje następny wolny termin i czeka na niego poza blokadą.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last = None
+
+    def wait(self, min_interval):
+        with self.lock:
+            now = time.monotonic()
+            slot = now if self.last is None else max(now, self.last + min_interval)
+            self.last = slot
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+_host_limiters = {}
+_host_limiters_lock = threading.Lock()
+
+
+def host_limiter(url):
+    """
+    Wspólny limiter dla hosta — kilka źródeł z tej samej domeny (np. różne kategorie jednej
+    tablicy) nie odpytuje jej częściej niż pozwala ich rate_limit.
+    """
+    host = urlsplit(url).netloc
+    with _host_limiters_lock:
+        limiter = _host_limiters.get(host)
+        if limiter is None:
+            limiter = _host_limiters[host] = RateLimiter()
+        return limiter
+
+
+class JobSource:
+    """
+    Bazowa klasa źródła. Podklasy ustawiają name i url oraz implementują parse().
+    Ustawienia można nadpisać w settings.JOB_SOURCES (url, timeout, deadline, rate_limit, user_agent).
+    """
+
+    name = None
+    url = None
+    items_key = None  # kanał jest obiektem z listą ofert pod tym kluczem (None: lista na górnym poziomie)
+    user_agent = "JobFinderApp/1.0"
+    timeout = 20  # sekundy na połączenie i każdy odczyt z gniazda
+    deadline = 300  # sekundy na całe pobranie kanału (także przy powolnym przesyłaniu treści)
+    rate_limit = 1.0  # minimalny odstęp (s) między zapytaniami do hosta źródła
+
+    def __init__(self, url=None, timeout=None, rate_limit=None, user_agent=None, deadline=None):
+        if url:
+            self.url = url
+        if timeout is not None:
+            self.timeout = timeout
+        if deadline is not None:
+            self.deadline = deadline
+        if rate_limit is not None:
+            self.rate_limit = rate_limit
+        if user_agent:
+            self.user_agent = user_agent
+
+    def make_client(self, cache_dir=None, replay_path=None, record_dir=None):
+        return FeedClient(
+            self.url,
+            self.user_agent,
+            cache_dir=cache_dir,
+            timeout=self.timeout,
+            replay_path=replay_path,
+            record_dir=record_dir,
+            deadline=self.deadline,
+        )
+
+    def parse_item(self, item):
+        """
+        Zamień jeden element kanału na ofertę we wspólnym formacie (None: pomiń element).
+        """
+        raise NotImplementedError
+
+    def iter_offers(self, items):
+        for item in items:
+            offer = self.parse_item(item) if isinstance(item, dict) else None
+            if offer:
+                yield offer
+
+    def parse(self, data):
+        """
+        Zamień zdekodowany kanał JSON na listę ofert we wspólnym formacie.
+        """
+        if self.items_key:
+            items = data.get(self.items_key, []) if isinstance(data, dict) else []
+        else:
+            items = data if isinstance(data, list) else []
+        return list(self.iter_offers(items))
+
+    def iter_stream(self, stream, ndjson=None):
+        """
+        Oferty czytane strumieniowo z pliku/strumienia (JSON lub NDJSON) — bez ładowania całego kanału.
+        """
+        return self.iter_offers(iter_json_items(stream, key=self.items_key, ndjson=ndjson))
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name} {self.url}>"
+
+
+@register_source
+class RemoteOKSource(JobSource):
+    name = "remoteok"
+    url = "https://remoteok.com/api"
+
+    def parse_item(self, item):
+        # pierwszy element listy to metadane / informacja prawna, a nie oferta
+        return None if "legal" in item else item
+
+
+@register_source
+class RemotiveSource(JobSource):
+    name = "remotive"
+    url = "https://remotive.com/api/remote-jobs"
+    rate_limit = 2.0
+    items_key = "jobs"
+
+    def parse_item(self, job):
+        return {
+            "url": job.get("url"),
+            "position": job.get("title", "Untitled"),
+            "company": job.get("company_name", "Unknown Company"),
+            "location": job.get("candidate_required_location") or "Remote",
+            "tags": job.get("tags") or [],
+            "description": job.get("description", ""),
+            "date": job.get("publication_date"),
+            "salary": job.get("salary") or None,
+        }
+
+
+def get_sources(names=None):
+    """
+    Instancje źródeł: wybrane po nazwie albo włączone w settings.JOB_SOURCES
+    (słownik nazwa -> nadpisania ustawień).
+    """
+    configured = getattr(settings, "JOB_SOURCES", {"remoteok": {}})
+    names = names or list(configured)
+    unknown = [name for name in names if name not in SOURCES]
+    if unknown:
+        raise ValueError(f"Unknown job source(s): {', '.join(unknown)}. Available: {', '.join(sorted(SOURCES))}")
+    return [SOURCES[name](**configured.get(name, {})) for name in names]
+
+
+class SourceResult:
+    """
+    Wynik pobrania jednego źródła: oferty we wspólnym formacie (albo not_modified / error)
+    i czasy etapów w sekundach.
+    """
+
+    def __init__(self, source, client=None):
+        self.source = source
+        self.client = client
+        self.response = None
+        self.offers = []  # lista albo (w trybie strumieniowym) leniwy iterator
+        self.not_modified = False
+        self.error = None
+        self.timings = {}
+
+    @property
+    def name(self):
+        return self.source.name
+
+
+def fetch_source(source, cache_dir=None, replay_path=None, record_dir=None, stream=False):
+    """
+    Pobierz i sparsuj jedno źródło (wywoływane w wątku puli — bez dostępu do bazy).
+    Błędy nie są rzucane, tylko zapisywane w wyniku, aby jedno źródło nie zatrzymało pozostałych.
+    stream=True: treść trafia do pliku tymczasowego, a oferty są parsowane leniwie podczas zapisu.
+    """
+    result = SourceResult(source)
+    try:
+        result.client = source.make_client(cache_dir, replay_path, record_dir)
+        # odtwarzanie migawek nie łączy się z siecią, więc nie podlega limitowi
+        if not replay_path:
+            result.timings["wait"] = host_limiter(source.url).wait(source.rate_limit)
+
+        started = time.perf_counter()
+        response = result.response = result.client.fetch(stream=stream)
+        result.timings["fetch"] = time.perf_counter() - started
+
+        if response.not_modified:
+            result.not_modified = True
+            return result
+
+        if stream:
+            result.offers = source.iter_stream(response.open())
+            return result
+
+        started = time.perf_counter()
+        result.offers = source.parse(response.json())
+        result.timings["parse"] = time.perf_counter() - started
+    except Exception as e:
+        result.error = e
+    return result
+
+
+def fetch_sources(sources, client_options=None, max_workers=None):
+    """
+    Pobieraj źródła równolegle w puli wątków; zwraca iterator wyników w kolejności ukończenia,
+    więc zapis pierwszego źródła może się zacząć, zanim skończą się pozostałe.
+    client_options(source) -> dict z cache_dir / replay_path / record_dir dla danego źródła.
+    Źródło, które nie skończy się w czasie deadline + timeout + DEADLINE_GRACE (liczonym od startu),
+    jest zwracane jako nieudane (TimeoutError); jego wątek kończy deadline klienta HTTP.
+    """
+    max_workers = max_workers or getattr(settings, "SCRAPER_MAX_WORKERS", 4)
+    if not sources:
+        return
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sources))))
+    futures = {
+        pool.submit(fetch_source, source, **(client_options(source) if client_options else {})): source
+        for source in sources
+    }
+    timeout = max(source.deadline + source.timeout for source in sources) + DEADLINE_GRACE
+    yielded = set()
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            yielded.add(future)
+            yield future.result()
+    except FuturesTimeoutError:
+        for future, source in futures.items():
+            if future in yielded:
+                continue
+            if future.done():
+                yield future.result()
+                continue
+            result = SourceResult(source)
+            result.error = TimeoutError(f"{source.name} did not finish within {timeout:.0f}s")
+            yield result
+    finally:
+        # nie czekaj na wątki źródeł, które przekroczyły limit
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,96 @@
+# Znormalizowane tagi ofert: tabela Tag + powiązanie JobTag (zamiast przeszukiwania JSON attributes).
+# Scraper synchronizuje tagi zapisanej partii ofert; filtry listy ofert to indeksowane złączenia,
+# a liczby ofert na tag (facety) są liczone raz po zmianie korpusu, nie przy każdym żądaniu.
+from django.db.models import Count, Exists, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from jobfinder.features import normalize_text
+from jobfinder.models import Job, JobTag, Tag
+
+MAX_TAG_LENGTH = 100
+
+
+def tag_names(attributes):
+    """
+    Znormalizowane, unikalne nazwy tagów z JSON attributes (napisy albo słowniki slug/name).
+    """
+    if not isinstance(attributes, list):
+        return []
+    names = []
+    for t in attributes:
+        raw = (t.get("slug") or t.get("name") or "") if isinstance(t, dict) else str(t)
+        name = normalize_text(raw)[:MAX_TAG_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def get_tag_ids(names, create=True):
+    """
+    Mapa nazwa -> id tagu; brakujące tagi są tworzone jednym bulk_create.
+    """
+    names = set(names)
+    if not names:
+        return {}
+    if create:
+        Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    return dict(Tag.objects.filter(name__in=names).values_list("name", "id"))
+
+
+def sync_job_tags(jobs, batch_size=1000):
+    """
+    Zastąp powiązania tagów podanych (zapisanych) ofert tagami z ich attributes:
+    jedno DELETE i jeden bulk_create na partię.
+    """
+    names_by_job = {job.pk: tag_names(job.attributes) for job in jobs}
+    tag_ids = get_tag_ids(name for names in names_by_job.values() for name in names)
+
+    JobTag.objects.filter(job_id__in=list(names_by_job)).delete()
+    JobTag.objects.bulk_create(
+        [
+            JobTag(job_id=job_id, tag_id=tag_ids[name])
+            for job_id, names in names_by_job.items()
+            for name in names
+        ],
+        batch_size=batch_size,
+    )
+
+
+def refresh_tag_counts():
+    """
+    Przelicz Tag.active_count (liczba aktywnych ofert z tagiem) jednym UPDATE z podzapytaniem.
+    Wywoływane po scrapowaniu, archiwizacji i usuwaniu ofert.
+    """
+    active_counts = (
+        JobTag.objects.filter(tag=OuterRef("pk"), job__status=Job.STATUS_ACTIVE)
+        .values("tag")
+        .annotate(n=Count("job"))
+        .values("n")
+    )
+    return Tag.objects.update(active_count=Coalesce(Subquery(active_counts), 0))
+
+
+def tag_facets(limit=20):
+    """
+    Najpopularniejsze tagi aktywnych ofert jako lista (nazwa, liczba ofert).
+    """
+    return list(
+        Tag.objects.filter(active_count__gt=0)
+        .order_by("-active_count", "name")
+        .values_list("name", "active_count")[:limit]
+    )
+
+
+def has_any_tag(names):
+    """
+    Warunek "oferta ma którykolwiek z tagów" jako półzłączenie (EXISTS) po indeksie (tag, job).
+    """
+    names = [name for name in (normalize_text(n)[:MAX_TAG_LENGTH] for n in names) if name]
+    return Exists(JobTag.objects.filter(job=OuterRef("pk"), tag__name__in=names))
+
+
+def remote_condition():
+    """
+    Oferta zdalna: "remote" w lokalizacji albo tag "remote".
+    """
+    return Q(location__icontains="remote") | Q(has_any_tag(["remote"]))
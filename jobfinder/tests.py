@@ -0,0 +1,1110 @@
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock, skipUnless
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from jobfinder.benchmarks import baseline
+from jobfinder.benchmarks.synthetic import generate_offers
+from jobfinder.cleaning import DescriptionCleaner, clean_description
+from jobfinder.features import (
+    EXPERIENCE_RE,
+    FEATURES_VERSION,
+    SENIORITY_KEYWORDS,
+    detect_job_seniority,
+    detect_required_experience,
+    extract_job_keywords,
+    normalize_text,
+    split_set,
+)
+from jobfinder.feed_client import FeedClient, FeedDeadlineExceeded
+from jobfinder.feed_server import start_background_server
+from jobfinder import hashing
+from jobfinder.json_stream import iter_json_items
+from jobfinder.keywords import KeywordMatcher, trie_pattern
+from jobfinder.lifecycle import archive_jobs, delete_jobs
+from jobfinder import logging_config
+from jobfinder import match_cache, metrics
+from jobfinder.match_pool import MatchPool, MatchPoolBusy
+from jobfinder.locks import file_lock
+from jobfinder.management.commands.scrape_remotejobs import Command as ScrapeCommand
+from jobfinder.match_jobs import cv_profile, match_jobs_to_cv
+from jobfinder import refresh
+from jobfinder.models import Job, JobFeatures, JobMatch, MatchRun
+from jobfinder.retrieval import candidate_rows, token_overlap
+from jobfinder.scoring import infer_allowed_seniority, rows_matching, rows_with_word, score_jobs, top_k
+from jobfinder.search import SEARCH_ORDERING, search_jobs
+from jobfinder import sources
+from jobfinder.sources import RemoteOKSource, fetch_sources
+from jobfinder.tags import refresh_tag_counts, tag_facets
+from jobfinder.tfidf_index import (
+    KEEP_BUILDS,
+    TFIDF_PARAMS,
+    _load_corpus,
+    build_index,
+    corpus_signature,
+    ensure_index,
+    load_index,
+)
+from jobfinder import views
+from users.models import CV
+
+
+FIXTURE_JOBS = [
+    ("Senior Python Developer", "Remote", ["python", "django", "aws"], "5+ years of experience with python"),
+    ("Junior Frontend Engineer", "Berlin, Germany", ["react", "javascript"], "Entry level, minimum 1 year"),
+    ("Lead C++ Engineer", "Warsaw", [{"slug": "c++"}, {"name": "linux"}], "We need 7 yrs of c++ work"),
+    ("Data Engineer (mid)", "Remote - Europe", ["python", "spark", "remote"], "Regular data pipelines"),
+    ("Node.js Backend Developer", "", ["node.js", "aws", "docker"], "3 years node.js, docker"),
+    ("Graduate .NET Developer", "London", [".net", "c#"], "Trainee program for graduates"),
+    ("Staff Engineer", "Remote", [], "Principal level, 10+ years"),
+    ("Marketing Manager", "Paris", ["marketing"], "No technical skills required"),
+    ("Python Data Scientist", "Berlin", ["python", "ml", "pandas"], "2 years with pandas and ml"),
+    ("DevOps Engineer", "Remote", ["docker", "kubernetes", "aws"], "Intermediate devops, 4 years"),
+]
+
+FIXTURE_CVS = [
+    dict(skills="python, django, sql", technologies="aws, docker", preferred_roles="developer, engineer",
+         preferred_locations="Berlin", experience_years=6, job_type_preference="remote"),
+    dict(skills="react, javascript", technologies="node.js", preferred_roles="frontend",
+         preferred_locations="Berlin, London", experience_years=1, job_type_preference="office"),
+    dict(skills="c++, linux", technologies="", preferred_roles="c++, .net",
+         preferred_locations="", experience_years=None, job_type_preference="hybrid"),
+    dict(skills="", technologies="", preferred_roles="", preferred_locations="warsaw",
+         experience_years=3, job_type_preference="office"),
+]
+
+
+class TemporaryDataDirsMixin:
+    """
+    Indeks TF-IDF, stan odświeżania i cache HTTP scrapera w katalogu tymczasowym testu, nie w data/.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir, ignore_errors=True)
+        data_dirs = override_settings(
+            MATCHER_INDEX_DIR=os.path.join(self.data_dir, "index"),
+            JOBS_REFRESH_STATE_DIR=self.data_dir,
+            SCRAPER_CACHE_DIR=os.path.join(self.data_dir, "http_cache"),
+        )
+        data_dirs.enable()
+        self.addCleanup(data_dirs.disable)
+
+
+def legacy_scores(cv, jobs, similarities):
+    """
+    Poprzednia implementacja punktowania (pętla po ofertach) — wyrocznia dla testów.
+    """
+    cv_skills = split_set(cv.skills)
+    cv_tech = split_set(cv.technologies)
+    cv_roles = split_set(cv.preferred_roles)
+    cv_locations = split_set(cv.preferred_locations)
+    allowed_seniority = infer_allowed_seniority(cv.experience_years)
+
+    scores = []
+    for job, sim in zip(jobs, similarities):
+        title = normalize_text(job.title or "")
+        desc = normalize_text(job.description or "")
+        tags = " ".join(
+            normalize_text(t.get("slug") or t.get("name") or "") if isinstance(t, dict) else normalize_text(str(t))
+            for t in job.attributes
+        )
+        job_tags = split_set(title) | split_set(tags)
+        seniority = detect_job_seniority(f"{title} {tags}")
+        req_exp = detect_required_experience(f"{title} {tags} {desc}")
+        loc_field = normalize_text(job.location or "")
+
+        score = 0.35
+        score += sim * 0.25
+        if cv_skills:
+            score += 0.20 * (len(cv_skills & job_tags) / max(1, len(cv_skills)))
+        if cv_tech:
+            score += 0.15 * (len(cv_tech & job_tags) / max(1, len(cv_tech)))
+        if seniority:
+            if seniority & allowed_seniority:
+                score += 0.15
+            else:
+                score *= 0.8
+        if req_exp is not None and cv.experience_years is not None:
+            if cv.experience_years >= req_exp:
+                score += 0.15
+            else:
+                score *= 0.8
+        if cv_roles:
+            if any(re.search(rf"\b{re.escape(role)}\b", title) for role in cv_roles if role):
+                score += 0.10
+        if cv.job_type_preference == "remote":
+            if "remote" in loc_field:
+                score += 0.15
+            else:
+                score *= 0.95
+        elif cv_locations:
+            if any(loc.lower() in loc_field for loc in cv_locations):
+                score += 0.10
+            else:
+                score *= 0.95
+        scores.append(max(0.0, min(1.0, score)))
+    return scores
+
+
+class TopKTestCase(SimpleTestCase):
+
+    def test_top_k_matches_stable_sort(self):
+        rng = np.random.default_rng(0)
+        # wiele remisów, żeby sprawdzić rozstrzyganie na granicy selekcji
+        values = np.round(rng.random(500) * 10) / 10
+        expected = np.argsort(-values, kind="stable")
+        for k in (0, 1, 5, 37, 499, 500, 1000):
+            self.assertEqual(list(top_k(values, k)), list(expected[:k]))
+
+
+class BenchmarkBaselineTestCase(SimpleTestCase):
+
+    def test_compare_flags_regressions_by_metric_direction(self):
+        before = {"workload": [
+            {"benchmark": "workload.match", "size": 1000, "seconds": 0.1, "queries": 4},
+            {"benchmark": "search.search", "size": 1000, "q": "python", "ms_per_page": 10.0, "hits": 5},
+            {"benchmark": "ingest.insert", "size": 1000, "seconds": 1.0, "offers_per_second": 1000.0},
+        ]}
+        after = {"workload": [
+            {"benchmark": "workload.match", "size": 1000, "seconds": 0.101, "queries": 6},
+            {"benchmark": "search.search", "size": 1000, "q": "python", "ms_per_page": 10.5, "hits": 50},
+            {"benchmark": "ingest.insert", "size": 1000, "seconds": 2.0, "offers_per_second": 500.0},
+            {"benchmark": "workload.match", "size": 10000, "seconds": 9.0, "queries": 4},  # brak w bazie
+        ]}
+        regressions = {
+            (c["benchmark"], c["key"]) for c in baseline.compare(before, after, threshold=0.25) if c["regression"]
+        }
+        self.assertEqual(regressions, {
+            ("workload.match", "queries"),
+            ("ingest.insert", "seconds"),
+            ("ingest.insert", "offers_per_second"),
+        })
+
+
+class LoggingTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        patcher = mock.patch.object(logging_config, "LOG_DIR", self.tmp)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+    def test_setup_logger_is_idempotent_and_writes_through_queue(self):
+        first = logging_config.setup_logger("jobfinder.test", "test.log")
+        second = logging_config.setup_logger("jobfinder.test", "test.log")
+        self.assertIs(first, second)
+        self.assertEqual(first.handlers, [logging_config.queue_handler()])
+
+        first.info("scored %s jobs for %s", 3, "cv")
+        logging_config.flush_logs()
+        with open(os.path.join(self.tmp, "test.log")) as f:
+            self.assertIn("INFO jobfinder.test: scored 3 jobs for cv", f.read())
+
+    def test_prepare_defers_formatting_of_simple_arguments(self):
+        handler = logging_config.queue_handler()
+        lazy = handler.prepare(logging.LogRecord("x", logging.INFO, "", 0, "%s=%d", ("a", 1), None))
+        self.assertEqual((lazy.msg, lazy.args), ("%s=%d", ("a", 1)))
+        tags = ["python"]
+        eager = handler.prepare(logging.LogRecord("x", logging.INFO, "", 0, "tags=%s", (tags,), None))
+        tags.append("django")  # późniejsza zmiana obiektu nie zmienia wpisu
+        self.assertEqual((eager.msg, eager.args), ("tags=['python']", None))
+
+
+class KeywordMatcherTestCase(SimpleTestCase):
+
+    def test_single_pass_matches_per_keyword_regexes(self):
+        texts = [
+            ("senior python developer", "regular backend work, minimum 4 years"),
+            ("internship program", "interns and trainees welcome, 2020 years of history"),
+            ("sr. engineer lead", "min.7yrs or 10+ years"),
+            ("mid-level engineer 5", "years of experience"),  # wzorzec lat przez granicę tytułu
+            ("staffing manager", "no seniority words here"),
+            ("", ""),
+        ]
+        for head, rest in texts:
+            text = f"{head} {rest}"
+            legacy_levels = {
+                level for level, keys in SENIORITY_KEYWORDS.items()
+                for k in keys if re.search(rf"\b{re.escape(k)}\b", head)
+            }
+            m = EXPERIENCE_RE.search(text)
+            expected = (legacy_levels, int(m.group(1)) if m else None)
+            self.assertEqual(extract_job_keywords(text, seniority_end=len(head)), expected, text)
+
+    def test_trie_pattern_and_labels(self):
+        self.assertEqual(trie_pattern(["intern", "internship", "trainee"]), "(?:intern(?:ship)?|trainee)")
+        matcher = KeywordMatcher({"lang": ["go", "golang"], "role": ["data engineer"]})
+        hits = [(label, m.group()) for label, m in matcher.scan("go, gopher, data engineers; golang data engineer")]
+        self.assertEqual(hits, [("lang", "go"), ("lang", "golang"), ("role", "data engineer")])
+
+
+class MatcherTestCase(TestCase):
+
+    def setUp(self):
+        self.index_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(MATCHER_INDEX_DIR=self.index_dir)
+        self.settings_override.enable()
+        cache.clear()
+        match_cache.clear()
+        for i, (title, location, tags, description) in enumerate(FIXTURE_JOBS):
+            Job.objects.create(
+                title=title,
+                company=f"Company {i}",
+                location=location,
+                attributes=tags,
+                job_url=f"https://jobs.example.com/{i}",
+                description=description,
+            )
+        self.cvs = [
+            CV.objects.create(full_name=f"CV {i}", email=f"cv{i}@example.com", **fields)
+            for i, fields in enumerate(FIXTURE_CVS)
+        ]
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.index_dir, ignore_errors=True)
+
+    def test_job_features_are_backfilled_and_rebuilt(self):
+        # oferty zapisane poza scraperem nie mają cech — matcher uzupełnia je przy budowie indeksu
+        self.assertFalse(JobFeatures.objects.exists())
+        ensure_index()
+        self.assertEqual(JobFeatures.objects.filter(version=FEATURES_VERSION).count(), len(FIXTURE_JOBS))
+        features = Job.objects.get(title="Senior Python Developer").features
+        self.assertEqual((features.seniority, features.required_experience), (["senior"], 5))
+        self.assertEqual(features.tokens, sorted(split_set("senior python developer python django aws")))
+
+        # --stale-only przelicza tylko cechy zbudowane starszymi regułami
+        JobFeatures.objects.filter(job__title="Marketing Manager").update(version=0, title="stale")
+        out = StringIO()
+        call_command("rebuild_job_features", "--stale-only", stdout=out)
+        self.assertIn("Rebuilt features for 1 jobs.", out.getvalue())
+        features = JobFeatures.objects.get(job__title="Marketing Manager")
+        self.assertEqual((features.version, features.title), (FEATURES_VERSION, "marketing manager"))
+
+    def test_index_is_persisted_reloaded_and_pruned(self):
+        first = ensure_index()
+        self.assertIs(ensure_index(), first)  # korpus bez zmian: bez przebudowy
+        self.assertEqual(first.manifest["signature"], corpus_signature())
+        # proces czekający na blokadę budowy dostaje indeks zbudowany przez poprzednika
+        self.assertIs(build_index(force=False), first)
+
+        # inny proces: indeks czytany z dysku (macierz zmapowana w pamięci), bez dopasowywania TF-IDF
+        with mock.patch("jobfinder.tfidf_index._loaded", None):
+            reloaded = load_index()
+        self.assertIsNot(reloaded, first)
+        self.assertEqual(reloaded.build_id, first.build_id)
+        self.assertFalse(reloaded.matrix.data.flags.writeable)  # mmap_mode="r"
+        cv_text = cv_profile(self.cvs[0])[0]
+        self.assertEqual(list(reloaded.similarities(cv_text)), list(first.similarities(cv_text)))
+
+        # każda zmiana korpusu to nowy build; na dysku zostają KEEP_BUILDS ostatnich
+        for title in ("Marketing Manager", "Staff Engineer", "DevOps Engineer"):
+            Job.objects.filter(title=title).update(status=Job.STATUS_ARCHIVED)
+            index = ensure_index()
+        self.assertEqual((index.build_id, len(index)), (first.build_id + 3, len(FIXTURE_JOBS) - 3))
+        builds = sorted(name for name in os.listdir(self.index_dir) if name.startswith("tfidf-"))
+        self.assertEqual(builds, [f"tfidf-{index.build_id - i}" for i in reversed(range(KEEP_BUILDS))])
+
+    def test_vectorized_scores_match_legacy_loop(self):
+        index = ensure_index()
+        jobs = [Job.objects.get(id=job_id) for job_id in index.job_ids]
+        for cv in self.cvs:
+            cv_text = " ".join(normalize_text(v) for v in (
+                cv.skills, cv.technologies, cv.preferred_roles, cv.experience, cv.education,
+            ))
+            similarities = index.similarities(cv_text)
+            profile = {
+                "skills": split_set(cv.skills),
+                "technologies": split_set(cv.technologies),
+                "roles": split_set(cv.preferred_roles),
+                "locations": split_set(cv.preferred_locations),
+                "allowed_seniority": infer_allowed_seniority(cv.experience_years),
+                "experience_years": cv.experience_years,
+                "job_type_preference": cv.job_type_preference,
+            }
+            scores = score_jobs(index, profile, similarities)[0]
+            self.assertEqual(list(scores), legacy_scores(cv, jobs, similarities))
+
+    def test_two_stage_scores_candidates_like_exhaustive(self):
+        index = ensure_index()
+        for word in ("engineer", "developer", "net", "python", "missing"):
+            self.assertEqual(
+                list(rows_with_word(index, word)),
+                list(rows_matching(re.compile(rf"\b{word}\b"), index.titles, len(index))),
+            )
+
+        cv_text, profile = cv_profile(self.cvs[0])
+        similarities = index.similarities(cv_text)
+        rows = candidate_rows(index, profile, similarities, top_n=2, min_overlap=1, neighbours=0, min_corpus=0)
+        overlap = token_overlap(index, profile["skills"] | profile["technologies"] | profile["roles"])
+        self.assertTrue(set(np.flatnonzero(overlap >= 1)) <= set(rows.tolist()))
+        self.assertLess(len(rows), len(index))
+
+        exhaustive = score_jobs(index, profile, similarities)
+        subset = score_jobs(index, profile, similarities, rows)
+        for full, part in zip(exhaustive, subset):
+            self.assertEqual(list(np.asarray(full)[rows]), list(part))
+        self.assertIsNone(candidate_rows(index, profile, similarities, top_n=2))  # domyślnie wyłączone
+
+    def test_lsa_similarity_engine(self):
+        tfidf = ensure_index()
+        with override_settings(MATCH_SIMILARITY="lsa", MATCH_LSA_COMPONENTS=4):
+            index = ensure_index()  # zmiana silnika wymusza przebudowę
+            self.assertNotEqual(index.build_id, tfidf.build_id)
+            self.assertEqual(index.semantic.vectors.shape, (len(FIXTURE_JOBS), 4))
+            self.assertEqual(index.semantic.vectors.dtype, np.float32)
+
+            query = index.query(cv_profile(self.cvs[0])[0])
+            exact = index.query_similarities(query)
+            # wszystkie listy IVF przeszukane: wynik dokładny; jedna lista: tylko jej oferty
+            self.assertEqual(list(index.nearest(query, 3)), list(top_k(exact, 3)))
+            semantic = index.semantic
+            nearest = semantic.nearest(query, 3, probes=1)
+            lists = {int(np.searchsorted(semantic.offsets, np.flatnonzero(semantic.order == row)[0], side="right"))
+                     for row in nearest}
+            self.assertEqual(len(lists), 1)
+
+            results = match_jobs_to_cv(self.cvs[0].id, top_n=3)
+            self.assertEqual(len(results), 3)
+
+    def test_hashing_vectorizer_reuses_unchanged_rows(self):
+        cv_text = cv_profile(self.cvs[0])[0]
+        exact = ensure_index().similarities(cv_text)
+        with override_settings(MATCH_VECTORIZER="hashing"):
+            index = ensure_index()
+            self.assertEqual(index.manifest["vectorizer"], "hashing")
+            self.assertEqual(index.matrix.dtype, np.float32)
+            # bez kolizji kubełków wyniki jak w trybie słownikowym
+            np.testing.assert_allclose(index.similarities(cv_text), exact, atol=1e-5)
+
+            Job.objects.create(
+                title="Python Data Engineer", company="New", location="Remote",
+                attributes="python, sql", job_url="https://jobs.example.com/new",
+                description="Python pipelines and SQL warehouses.",
+            )
+            rebuilt = ensure_index()
+            self.assertEqual(rebuilt.manifest["reused_rows"], len(FIXTURE_JOBS))
+            corpus = _load_corpus()
+            _, fresh, _, _ = hashing.fit(
+                corpus["texts"], corpus["job_ids"], corpus["stamps"], settings.MATCH_HASHING_FEATURES, TFIDF_PARAMS,
+            )
+            np.testing.assert_allclose(rebuilt.matrix.toarray(), fresh.toarray(), atol=1e-6)
+            self.assertEqual(len(match_jobs_to_cv(self.cvs[0].id, top_n=3)), 3)
+
+    def test_match_jobs_to_cv_ranks_by_score(self):
+        results = match_jobs_to_cv(self.cvs[0].id, top_n=3)
+        self.assertEqual(len(results), 3)
+        scores = [r["score"] for r in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(results[0]["job"].title, "Senior Python Developer")
+
+    def test_match_stages_and_metrics_endpoint(self):
+        metrics.REGISTRY.clear()
+        cv = self.cvs[0]
+        match_jobs_to_cv(cv.id, top_n=3)
+        match_jobs_to_cv(cv.id, top_n=3)
+
+        self.assertEqual(metrics.MATCHES.value(result="computed"), 1)
+        self.assertEqual(metrics.MATCHES.value(result="cached"), 1)
+        self.assertEqual(metrics.ROWS_WRITTEN.value(operation="match_store"), 3)
+        self.assertEqual(metrics.CORPUS_JOBS.value(), len(FIXTURE_JOBS))
+        for stage in ("similarity", "score", "load_jobs", "store"):
+            self.assertEqual(metrics.STAGE_SECONDS.value(operation="match", stage=stage)["count"], 1, stage)
+        for stage in ("index", "cache"):
+            self.assertEqual(metrics.STAGE_SECONDS.value(operation="match", stage=stage)["count"], 2, stage)
+
+        self.client.get(reverse("jobfinder:job_list"))
+        with override_settings(METRICS_TOKEN="scrape-token"):
+            self.assertEqual(self.client.get(reverse("jobfinder:metrics")).status_code, 403)
+            response = self.client.get(reverse("jobfinder:metrics"), HTTP_AUTHORIZATION="Bearer scrape-token")
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        body = response.content.decode()
+        self.assertIn('jobfinder_matches_total{result="computed"} 1', body)
+        self.assertIn('jobfinder_match_jobs_scored_bucket{le="10"} 1', body)
+        self.assertIn('jobfinder_request_seconds_count{method="GET",view="jobfinder:job_list",status="200"} 1', body)
+        with override_settings(METRICS_ENABLED=False):
+            self.assertEqual(self.client.get(reverse("jobfinder:metrics")).status_code, 404)
+
+    def test_match_traces_are_aggregated_unless_sampled(self):
+        cv = self.cvs[0]
+        with override_settings(MATCH_TRACE_SAMPLE_RATE=0.0), self.assertLogs("matcher", "DEBUG") as logs:
+            match_jobs_to_cv(cv.id, top_n=3, use_stored=False)
+        traces = [r.getMessage() for r in logs.records if r.levelno == logging.DEBUG]
+        self.assertEqual(len(traces), 1)
+        self.assertIn(f"Match | CV {cv.id} | {len(FIXTURE_JOBS)} jobs scored, 3 results", traces[0])
+
+        with override_settings(MATCH_TRACE_SAMPLE_RATE=1.0), self.assertLogs("matcher", "DEBUG") as logs:
+            match_jobs_to_cv(cv.id, top_n=3, use_stored=False)
+        self.assertEqual(sum("| Job " in line for line in logs.output), 3)
+
+    def test_match_results_are_stored_per_cv(self):
+        first, second = self.cvs[0], self.cvs[1]
+        results = match_jobs_to_cv(first.id, top_n=4)
+        match_jobs_to_cv(second.id, top_n=2)
+
+        stored = JobMatch.objects.filter(cv=first).order_by("rank")
+        self.assertEqual([m.job_id for m in stored], [r["job"].id for r in results])
+        self.assertEqual(JobMatch.objects.filter(cv=second).count(), 2)
+
+        # niezmienione CV i korpus: ranking czytany z tabeli, bez ponownego punktowania
+        cache.clear()
+        match_cache.clear()
+        with self.assertNumQueries(3):
+            again = match_jobs_to_cv(first.id, top_n=3)
+        self.assertEqual([r["score"] for r in again], [r["score"] for r in results[:3]])
+
+        # ranking policzony dla innego katalogu indeksu (ten sam build_id, inny czas budowy) jest
+        # liczony od nowa
+        index = ensure_index()
+        run = MatchRun.objects.get(cv=first)
+        self.assertEqual(run.corpus_version, match_cache.corpus_version(index))
+        run.corpus_version = f"{index.build_id}@2020-01-01T00:00:00+00:00"
+        run.save()
+        match_cache.clear()
+        cache.clear()
+        match_jobs_to_cv(first.id, top_n=3)
+        self.assertEqual(MatchRun.objects.get(cv=first).corpus_version, match_cache.corpus_version(index))
+
+        # zmiana CV unieważnia zapisany ranking
+        old_version = MatchRun.objects.get(cv=first).cv_version
+        first.skills = "marketing"
+        first.save()
+        rescored = match_jobs_to_cv(first.id, top_n=4)
+        self.assertNotEqual(MatchRun.objects.get(cv=first).cv_version, old_version)
+        self.assertNotEqual([r["score"] for r in rescored], [r["score"] for r in results])
+        stored = JobMatch.objects.filter(cv=first).order_by("rank")
+        self.assertEqual([m.score for m in stored], [r["score"] for r in rescored])
+
+    def test_match_cache_hits_and_invalidation(self):
+        cv = self.cvs[0]
+        results = match_jobs_to_cv(cv.id, top_n=4)
+
+        # trafienie w LRU procesu: tylko odczyt CV, bez odwołań do cache współdzielonego
+        with self.assertNumQueries(1), mock.patch("jobfinder.match_cache._shared", side_effect=AssertionError):
+            again = match_jobs_to_cv(cv.id, top_n=3)
+        self.assertEqual([r["job"].id for r in again], [r["job"].id for r in results[:3]])
+        again[0]["score_pct"] = 1.0  # widoki modyfikują wyniki — nie może to zmienić wpisu
+        self.assertNotIn("score_pct", match_jobs_to_cv(cv.id, top_n=3)[0])
+
+        # pusty LRU (inny proces): trafienie we współdzielonym cache Django
+        match_cache._get_local().clear()
+        with self.assertNumQueries(1):
+            match_jobs_to_cv(cv.id, top_n=4)
+        stats = match_cache.cache_stats()
+        self.assertEqual((stats["local_hits"], stats["shared_hits"]), (2, 1))
+
+        # żądanie nie przebudowuje indeksu — nieaktualny build obsługuje dalej z cache
+        Job.objects.filter(title="Senior Python Developer").update(status=Job.STATUS_ARCHIVED)
+        self.assertEqual(match_jobs_to_cv(cv.id, top_n=4), results)
+        # przebudowa (scraper, archiwizacja, cron) zmienia wersję korpusu; unieważnienie CV czyści wpis
+        ensure_index()
+        self.assertNotIn("Senior Python Developer", [r["job"].title for r in match_jobs_to_cv(cv.id, top_n=4)])
+        match_cache.invalidate_cv(cv.id)
+        self.assertIsNone(cache.get(match_cache._key(cv.id)))
+
+
+class RefreshTestCase(TestCase):
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            JOBS_REFRESH_STATE_DIR=self.state_dir,
+            JOBS_REFRESH_MIN_INTERVAL=600,
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    @mock.patch("jobfinder.refresh.call_command")
+    def test_refresh_is_single_flight_and_rate_limited(self, call_command):
+        self.assertEqual(refresh.refresh_jobs(), refresh.REFRESH_DONE)
+        self.assertEqual(call_command.call_count, len(refresh.REFRESH_COMMANDS))
+
+        self.assertEqual(refresh.refresh_jobs(), refresh.REFRESH_SKIPPED)
+        with file_lock(os.path.join(self.state_dir, "refresh.lock")):
+            self.assertEqual(refresh.refresh_jobs(force=True), refresh.REFRESH_LOCKED)
+        self.assertEqual(call_command.call_count, len(refresh.REFRESH_COMMANDS))
+
+        self.assertIsNotNone(refresh.read_refresh_state()["finished_at"])
+
+    @mock.patch("jobfinder.refresh.call_command")
+    def test_failed_scrape_does_not_count_as_fresh(self, call_command):
+        def run(name, **kwargs):
+            if name == refresh.SCRAPE_COMMAND:
+                raise CommandError("All sources failed: remoteok")
+
+        call_command.side_effect = run
+        refresh.refresh_jobs(force=True)
+        state = refresh.read_refresh_state()
+        self.assertIsNotNone(state["finished_at"])
+        self.assertIsNone(state["last_success_at"])
+        self.assertIsNone(refresh.last_refreshed_at())  # brak ofert i udanego scrapowania
+        self.assertIn("All sources failed", refresh.last_refresh_error()["message"])
+        response = self.client.get(reverse("jobfinder:job_list"))
+        self.assertTrue(response.context["data_is_stale"])
+        self.assertContains(response, "Last refresh failed")
+
+        call_command.side_effect = None
+        refresh.refresh_jobs(force=True)
+        self.assertEqual(refresh.last_refreshed_at(), refresh.read_refresh_state()["last_success_at"])
+        self.assertIsNone(refresh.last_refresh_error())
+
+    @mock.patch("jobfinder.refresh.call_command")
+    def test_refresh_metrics_outlive_the_process(self, call_command):
+        def run(name, **kwargs):
+            if name == refresh.SCRAPE_COMMAND:
+                metrics.StageTimer("scrape").record("fetch", 0.5)
+                metrics.ROWS_WRITTEN.inc(3, operation="scrape")
+
+        call_command.side_effect = run
+        metrics.REGISTRY.clear()
+        refresh.refresh_jobs(force=True)
+        refresh.refresh_jobs(force=True)
+        # rejestr procesu crona jest pusty — metryki są w migawce, którą czyta /metrics
+        self.assertIsNone(metrics.ROWS_WRITTEN.value(operation="scrape"))
+        self.assertEqual(self.client.get(reverse("jobfinder:metrics")).status_code, 403)
+
+        staff = User.objects.create_user("ops", password="x", is_staff=True)
+        self.client.force_login(staff)
+        body = self.client.get(reverse("jobfinder:metrics")).content.decode()
+        self.assertIn('jobfinder_stage_seconds_count{operation="scrape",stage="fetch"} 2', body)
+        self.assertIn('jobfinder_stage_seconds_sum{operation="scrape",stage="fetch"} 1.0', body)
+        self.assertIn('jobfinder_rows_written_total{operation="scrape"} 6', body)
+
+    @mock.patch("jobfinder.refresh.call_command")
+    def test_job_list_does_not_scrape(self, call_command):
+        response = self.client.get(reverse("jobfinder:job_list"))
+        self.assertEqual(response.status_code, 200)
+        call_command.assert_not_called()
+        self.assertTrue(response.context["data_is_stale"])
+
+
+class JobListPaginationTestCase(TemporaryDataDirsMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        ScrapeCommand()._save_jobs(generate_offers(25))
+        # po trzy oferty z tym samym date_last_seen — remisy rozstrzyga id
+        base = timezone.now()
+        for job in Job.objects.all():
+            Job.objects.filter(id=job.id).update(date_last_seen=base - timedelta(minutes=job.id // 3))
+        self.expected = list(Job.objects.order_by("-date_last_seen", "-id").values_list("id", flat=True))
+
+    def test_cursor_pages_cover_all_jobs_in_order(self):
+        url = reverse("jobfinder:job_list_json")
+        seen, cursor = [], None
+        while True:
+            data = self.client.get(url, {"page_size": 10, **({"after": cursor} if cursor else {})}).json()
+            self.assertEqual(data["count"], 25)
+            seen += [job["id"] for job in data["results"]]
+            cursor = data["next"]
+            if not cursor:
+                break
+        self.assertEqual(seen, self.expected)
+
+        # wstecz z ostatniej strony
+        data = self.client.get(url, {"page_size": 10, "before": data["previous"]}).json()
+        self.assertEqual([job["id"] for job in data["results"]], self.expected[10:20])
+        self.assertEqual(self.client.get(url, {"after": "garbage"}).status_code, 400)
+
+    def test_job_list_renders_one_page_and_caches_count(self):
+        url = reverse("jobfinder:job_list")
+        response = self.client.get(url, {"page_size": 10, "q": "e"})
+        self.assertEqual(len(response.context["jobs"]), 10)
+        self.assertIn("q=e", response.context["next_url"])
+        self.assertIsNone(response.context["previous_url"])
+
+        # liczba ofert z cache — drugie żądanie nie wykonuje COUNT(*)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {"page_size": 10, "q": "e"})
+        self.assertFalse(any("COUNT(" in query["sql"] for query in queries))
+
+
+class JobSearchTestCase(TemporaryDataDirsMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i, (title, company, tags, description) in enumerate([
+            ("Python Developer", "Snake Co", ["django"], "Backend work"),
+            ("Backend Engineer", "Acme", ["python", "aws"], "Services"),
+            ("Designer", "Pixel", ["figma"], "Occasional python scripting"),
+            ("Frontend Developer", "Acme", ["react"], "No backend"),
+        ]):
+            Job.objects.create(title=title, company=company, attributes=tags, description=description,
+                               job_url=f"https://jobs.example.com/search/{i}")
+
+    def test_search_ranks_title_over_tags_over_description(self):
+        response = self.client.get(reverse("jobfinder:job_list_json"), {"q": "python"})
+        titles = [job["title"] for job in response.json()["results"]]
+        self.assertEqual(titles, ["Python Developer", "Backend Engineer", "Designer"])
+
+    def test_all_terms_must_match_with_prefixes(self):
+        response = self.client.get(reverse("jobfinder:job_list_json"), {"q": "acme develop"})
+        self.assertEqual([job["title"] for job in response.json()["results"]], ["Frontend Developer"])
+
+    def test_ranked_pages_follow_cursor(self):
+        url = reverse("jobfinder:job_list_json")
+        first = self.client.get(url, {"q": "python", "page_size": 2}).json()
+        second = self.client.get(url, {"q": "python", "page_size": 2, "after": first["next"]}).json()
+        self.assertEqual([job["title"] for job in second["results"]], ["Designer"])
+        self.assertIsNone(second["next"])
+
+
+@skipUnless(connection.vendor == "postgresql", "search_vector trigger and ts_rank are PostgreSQL-only")
+class PostgresSearchTestCase(TemporaryDataDirsMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.jobs = [
+            Job.objects.create(title=title, company="Acme", attributes=tags, description=description,
+                               job_url=f"https://jobs.example.com/pg-search/{i}")
+            for i, (title, tags, description) in enumerate([
+                ("Python Developer", ["django"], "Backend work"),
+                ("Backend Engineer", ["python", "aws"], "Services"),
+                ("Designer", ["figma"], "Occasional python scripting"),
+                ("Data Engineer", ["python"], "Pipelines"),
+                ("Frontend Developer", ["react"], "No backend"),
+            ])
+        ]
+
+    def matching(self, q):
+        return set(search_jobs(Job.objects.all(), q).values_list("id", flat=True))
+
+    def test_trigger_maintains_search_vector(self):
+        # wektor jest wypełniany przy INSERT i odświeżany także przy UPDATE z pominięciem save()
+        self.assertFalse(Job.objects.filter(search_vector__isnull=True).exists())
+        designer = self.jobs[2]
+        self.assertNotIn(designer.id, self.matching("kotlin"))
+        Job.objects.filter(id=designer.id).update(attributes=["kotlin"])
+        self.assertIn(designer.id, self.matching("kotlin"))
+        Job.objects.filter(id=designer.id).update(title="Kotlin Developer", attributes=[])
+        self.assertIn(designer.id, self.matching("kotlin"))
+        self.assertNotIn(designer.id, self.matching("figma"))
+
+    def test_rank_is_float8_and_orders_title_first(self):
+        queryset = search_jobs(Job.objects.all(), "python")
+        self.assertIn("double precision", str(queryset.query))
+        ranked = list(queryset.order_by(*(f"-{field}" for field in SEARCH_ORDERING)))
+        self.assertEqual(ranked[0].title, "Python Developer")
+        self.assertEqual(ranked[-1].title, "Designer")
+        self.assertTrue(all(isinstance(job.search_rank, float) for job in ranked))
+
+    def test_cursor_pages_visit_every_ranked_job_once(self):
+        # rangi ts_rank nie są dokładnie reprezentowalne — kursor musi je porównywać w float8
+        url = reverse("jobfinder:job_list_json")
+        seen, after = [], None
+        while True:
+            params = {"q": "python", "page_size": 1}
+            if after:
+                params["after"] = after
+            page = self.client.get(url, params).json()
+            seen += [job["title"] for job in page["results"]]
+            after = page["next"]
+            if not after:
+                break
+        self.assertEqual(len(seen), 4)
+        self.assertEqual(len(set(seen)), 4)
+
+
+class TagTestCase(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.settings_override = override_settings(MATCHER_INDEX_DIR=self.tmp)
+        self.settings_override.enable()
+        offers = generate_offers(3)
+        offers[0]["tags"] = ["Python", "remote", {"slug": "c++"}]
+        offers[1]["tags"] = ["python", "Django"]
+        offers[2]["tags"] = ["react"]
+        offers[2]["location"] = "Berlin"
+        self.offers = offers
+        ScrapeCommand()._save_jobs(offers)
+        refresh_tag_counts()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def job_urls(self, **params):
+        response = self.client.get(reverse("jobfinder:job_list_json"), params)
+        return sorted(job["url"] for job in response.json()["results"])
+
+    def test_tags_are_normalized_and_synced(self):
+        job = Job.objects.get(job_url=self.offers[0]["url"])
+        self.assertEqual(sorted(job.tags.values_list("name", flat=True)), ["c++", "python", "remote"])
+
+        self.offers[0]["tags"] = ["go"]
+        ScrapeCommand()._save_jobs(self.offers[:1])
+        self.assertEqual(list(job.tags.values_list("name", flat=True)), ["go"])
+
+    def test_tag_and_remote_filters(self):
+        urls = [offer["url"] for offer in self.offers]
+        self.assertEqual(self.job_urls(tags="PYTHON"), sorted(urls[:2]))
+        self.assertEqual(self.job_urls(tag=["django", "react"]), sorted(urls[1:]))
+        self.assertNotIn(urls[2], self.job_urls(remote="remote"))
+        self.assertIn(urls[2], self.job_urls(remote="onsite"))
+
+    def test_facet_counts_follow_active_jobs(self):
+        self.assertEqual(dict(tag_facets())["python"], 2)
+        Job.objects.filter(job_url=self.offers[1]["url"]).update(status=Job.STATUS_ARCHIVED)
+        refresh_tag_counts()
+        facets = dict(tag_facets())
+        self.assertEqual(facets["python"], 1)
+        self.assertNotIn("django", facets)
+
+
+class LifecycleTestCase(TemporaryDataDirsMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        ScrapeCommand()._save_jobs(generate_offers(20))
+        now = timezone.now()
+        ids = list(Job.objects.order_by("id").values_list("id", flat=True))
+        Job.objects.update(date_posted=now)
+        # co trzecia niewidziana od 40 dni, co czwarta opublikowana 40 dni temu
+        Job.objects.filter(id__in=ids[::3]).update(date_last_seen=now - timedelta(days=40))
+        Job.objects.filter(id__in=ids[1::4]).update(date_posted=now - timedelta(days=40))
+        self.expected = len(set(ids[::3]) | set(ids[1::4]))
+
+    def test_dry_run_counts_without_changes(self):
+        # jedno zapytanie o id na partię i jedno puste kończące pętlę
+        with self.assertNumQueries(-(-self.expected // 3) + 1):
+            result = archive_jobs(batch_size=3, dry_run=True)
+        self.assertEqual(result.count, self.expected)
+        self.assertEqual(Job.objects.filter(status=Job.STATUS_ARCHIVED).count(), 0)
+
+    def test_archive_then_delete_in_batches(self):
+        result = archive_jobs(batch_size=3)
+        self.assertEqual(result.count, self.expected)
+        # partie tylko z pasujących id — bez pustych okien między rzadkimi id
+        self.assertEqual(result.batches, -(-self.expected // 3))
+        self.assertEqual(Job.objects.filter(status=Job.STATUS_ARCHIVED).count(), self.expected)
+
+        self.assertEqual(delete_jobs(batch_size=3).count, self.expected)
+        self.assertEqual(Job.objects.count(), 20 - self.expected)
+        self.assertEqual(JobFeatures.objects.count(), 20 - self.expected)
+
+
+class SaveJobsTestCase(TemporaryDataDirsMixin, TestCase):
+
+    def test_query_count_does_not_grow_with_feed_size(self):
+        counts = []
+        for size, start in ((5, 0), (50, 100)):
+            with CaptureQueriesContext(connection) as queries:
+                saved = ScrapeCommand()._save_jobs(generate_offers(size, start=start))
+            self.assertEqual(saved, (size, 0, 0))
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_existing_offers_are_updated(self):
+        offers = generate_offers(20)
+        ScrapeCommand()._save_jobs(offers)
+        offers[0]["position"] = "Changed Title"
+        saved = ScrapeCommand()._save_jobs(offers + generate_offers(3, start=20))
+        self.assertEqual(saved, (3, 1, 19))
+        job = Job.objects.get(job_url=offers[0]["url"])
+        self.assertEqual(job.title, "Changed Title")
+        self.assertEqual(job.features.title, "changed title")
+
+    @override_settings(SCRAPER_CLEAN_WORKERS=2, SCRAPER_CLEAN_MIN_PARALLEL=0)
+    def test_direct_save_closes_cleaning_pool(self):
+        close = DescriptionCleaner.close
+        with mock.patch.object(DescriptionCleaner, "close", autospec=True, side_effect=close) as spy:
+            ScrapeCommand()._save_jobs(generate_offers(10))
+        spy.assert_called_once()
+        cleaner = spy.call_args.args[0]
+        self.assertEqual(cleaner.count, 10)
+        self.assertIsNone(cleaner._pool)
+
+    @mock.patch("jobfinder.cleaning.BeautifulSoup")
+    def test_unchanged_offers_skip_cleaning(self, soup):
+        soup.return_value.get_text.return_value = "cleaned"
+        offers = generate_offers(10)
+        ScrapeCommand()._save_jobs(offers)
+        Job.objects.filter(job_url=offers[1]["url"]).update(status=Job.STATUS_ARCHIVED)
+        soup.reset_mock()
+
+        saved = ScrapeCommand()._save_jobs(offers)
+        # tylko zarchiwizowana oferta jest ponownie czyszczona i aktywowana
+        self.assertEqual(saved, (0, 1, 9))
+        self.assertEqual(soup.call_count, 1)
+        self.assertEqual(Job.objects.get(job_url=offers[1]["url"]).status, Job.STATUS_ACTIVE)
+
+
+class DescriptionCleanerTestCase(SimpleTestCase):
+
+    def test_process_pool_matches_serial_cleaning(self):
+        raws = [offer["description"] for offer in generate_offers(40)] + ["caf\u00c3\u00a9 <b>bold</b>", "", None]
+        cleaner = DescriptionCleaner(workers=2, chunk_size=7, min_parallel=0)
+        try:
+            self.assertEqual(cleaner.clean(raws), [clean_description(raw) for raw in raws])
+            self.assertIsNotNone(cleaner._pool)
+        finally:
+            cleaner.close()
+        self.assertEqual(cleaner.count, len(raws))
+
+    def test_small_batches_stay_in_process(self):
+        cleaner = DescriptionCleaner(workers=4, min_parallel=200)
+        cleaner.clean(["<p>short</p>"] * 10)
+        self.assertIsNone(cleaner._pool)
+
+
+class MatchPoolTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.pool = MatchPool(workers=1, queue_size=1, retry_after=7)
+        self.addCleanup(self.pool.shutdown)
+        self.addCleanup(self.release.set)
+
+    def test_full_pool_rejects_and_recovers(self):
+        running = self.pool.submit(self.release.wait)
+        queued = self.pool.submit(lambda: "queued")
+        with self.assertRaises(MatchPoolBusy) as ctx:
+            self.pool.submit(lambda: "rejected")
+        self.assertEqual((ctx.exception.retry_after, self.pool.rejected, self.pool.in_flight), (7, 1, 2))
+
+        self.release.set()
+        self.assertTrue(running.result(timeout=5))
+        self.assertEqual(queued.result(timeout=5), "queued")
+        self.assertEqual(self.pool.submit(lambda: "again").result(timeout=5), "again")
+
+    def test_match_endpoints_answer_503_with_retry_after(self):
+        self.pool.submit(self.release.wait)
+        self.pool.submit(self.release.wait)
+        with mock.patch("jobfinder.views.get_match_pool", return_value=self.pool):
+            api = self.client.get(reverse("jobfinder:match_jobs_json", args=[1]))
+            page = self.client.get(reverse("jobfinder:match_jobs_view", args=[1]))
+        for response in (api, page):
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response["Retry-After"], "7")
+        self.assertIn("error", api.json())
+
+    def test_match_endpoints_reject_non_integer_top(self):
+        with mock.patch("jobfinder.views.get_match_pool", return_value=self.pool):
+            api = self.client.get(reverse("jobfinder:match_jobs_json", args=[1]), {"top": "ten"})
+            page = self.client.get(reverse("jobfinder:match_jobs_view", args=[1]), {"top": "ten"})
+        for response in (api, page):
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(api.json(), {"error": "top must be integer"})
+
+    @override_settings(MATCH_DEFAULT_TOP=5, MATCH_MAX_TOP=50)
+    def test_top_is_clamped(self):
+        factory = RequestFactory()
+        for params, expected in (({}, 5), ({"top": "1000"}, 50), ({"top": "-3"}, 1), ({"top": "7"}, 7)):
+            self.assertEqual(views._top_n(factory.get("/", params)), expected)
+
+
+class FeedClientTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.snapshots = os.path.join(self.tmp, "snapshots")
+        os.makedirs(self.snapshots)
+        for i, size in enumerate((3, 5)):
+            with open(os.path.join(self.snapshots, f"feed-{i}.json"), "w") as f:
+                json.dump([{"legal": "notice"}] + generate_offers(size), f)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_conditional_requests_against_local_server(self):
+        server, url = start_background_server(os.path.join(self.snapshots, "feed-0.json"))
+        self.addCleanup(server.shutdown)
+        cache_dir = os.path.join(self.tmp, "cache")
+
+        client = FeedClient(url, "test", cache_dir=cache_dir)
+        response = client.fetch()
+        self.assertFalse(response.not_modified)
+        self.assertEqual(len(response.json()), 4)
+        client.commit()
+
+        # walidatory z cache -> 304, bez treści do parsowania
+        client = FeedClient(url, "test", cache_dir=cache_dir)
+        response = client.fetch()
+        self.assertTrue(response.not_modified)
+        self.assertIsNone(response.content)
+        self.assertIsNotNone(client.previous_validated_at)
+        self.assertEqual(json.loads(client.cached_content())[1]["url"], generate_offers(1)[0]["url"])
+
+    def test_uncommitted_fetch_is_not_cached(self):
+        cache_dir = os.path.join(self.tmp, "cache")
+        FeedClient("http://feed.test/api", "test", cache_dir=cache_dir, replay_path=self.snapshots).fetch()
+        response = FeedClient("http://feed.test/api", "test", cache_dir=cache_dir, replay_path=self.snapshots).fetch()
+        self.assertFalse(response.not_modified)
+
+    def test_replay_serves_snapshots_in_order(self):
+        client = FeedClient("http://feed.test/api", "test", replay_path=self.snapshots)
+        self.assertEqual(len(client.fetch().json()), 4)
+        self.assertEqual(len(client.fetch().json()), 6)
+        self.assertEqual(len(client.fetch().json()), 6)
+
+    def test_slow_body_exceeds_deadline(self):
+        # serwer wysyła treść po bajcie — żaden odczyt nie przekracza timeout, ale całość deadline tak
+        class TrickleHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "1000")
+                self.end_headers()
+                for _ in range(1000):
+                    self.wfile.write(b" ")
+                    self.wfile.flush()
+                    threading.Event().wait(0.01)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), TrickleHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = "http://%s:%s/api" % server.server_address[:2]
+
+        for stream in (False, True):
+            client = FeedClient(url, "test", timeout=5, deadline=0.2)
+            with self.assertRaises(FeedDeadlineExceeded):
+                client.fetch(stream=stream)
+
+    def test_source_past_deadline_is_reported_as_failed(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def hang(source, **options):
+            release.wait(5)
+
+        source = RemoteOKSource(url="http://feed.test/api", timeout=0, deadline=0)
+        with mock.patch.object(sources, "fetch_source", hang), mock.patch.object(sources, "DEADLINE_GRACE", 0.2):
+            results = list(fetch_sources([source]))
+        self.assertEqual(len(results), 1)
+        self.assertIsInstance(results[0].error, TimeoutError)
+
+
+class MultiSourceScrapeTestCase(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        remoteok = os.path.join(self.tmp, "remoteok.json")
+        with open(remoteok, "w") as f:
+            json.dump([{"legal": "notice"}] + generate_offers(4), f)
+        remotive = os.path.join(self.tmp, "remotive.json")
+        with open(remotive, "w") as f:
+            json.dump({"jobs": [
+                {"url": f"https://remotive.example.com/{i}", "title": f"Remotive Engineer {i}",
+                 "company_name": "Acme", "candidate_required_location": "Worldwide", "tags": ["python"],
+                 "description": "<p>Remote python work</p>", "publication_date": "2026-01-01T10:00:00",
+                 "salary": "$100k"}
+                for i in range(3)
+            ]}, f)
+
+        urls = {}
+        for name, path in (("remoteok", remoteok), ("remotive", remotive)):
+            server, urls[name] = start_background_server(path)
+            self.addCleanup(server.shutdown)
+        self.settings_override = override_settings(
+            JOB_SOURCES={name: {"url": url, "rate_limit": 0} for name, url in urls.items()},
+            SCRAPER_CACHE_DIR=os.path.join(self.tmp, "cache"),
+            MATCHER_INDEX_DIR=os.path.join(self.tmp, "index"),
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def scrape(self, **options):
+        out = StringIO()
+        call_command("scrape_remotejobs", stdout=out, stderr=StringIO(), **options)
+        return out.getvalue()
+
+    def test_sources_are_fetched_concurrently_and_saved(self):
+        # oba pobrania muszą trwać jednocześnie: przy pobieraniu po kolei bariera wygaśnie,
+        # a źródło zakończy się błędem
+        barrier = threading.Barrier(len(settings.JOB_SOURCES), timeout=5)
+        fetch = FeedClient.fetch
+
+        def fetch_together(client, *args, **kwargs):
+            barrier.wait()
+            return fetch(client, *args, **kwargs)
+
+        with mock.patch.object(FeedClient, "fetch", fetch_together):
+            out = self.scrape()
+        self.assertFalse(barrier.broken)
+        self.assertEqual(Job.objects.filter(source="remoteok").count(), 4)
+        self.assertEqual(Job.objects.filter(source="remotive").count(), 3)
+        self.assertEqual(Job.objects.get(job_url="https://remotive.example.com/0").salary, "$100k")
+        self.assertIn("remotive: 3 new, 0 changed, 0 unchanged (wait", out)
+
+        out = self.scrape(source=["remotive"])
+        self.assertIn("remotive: not modified (3 jobs still listed)", out)
+
+    def test_failing_source_does_not_stop_others(self):
+        with override_settings(JOB_SOURCES={
+            "remoteok": settings.JOB_SOURCES["remoteok"],
+            "remotive": {"url": "http://127.0.0.1:9/api", "rate_limit": 0, "timeout": 1},
+        }):
+            self.scrape()
+        self.assertEqual(Job.objects.filter(source="remoteok").count(), 4)
+        self.assertFalse(Job.objects.filter(source="remotive").exists())
+
+    def test_all_sources_failing_raises(self):
+        with override_settings(JOB_SOURCES={
+            "remotive": {"url": "http://127.0.0.1:9/api", "rate_limit": 0, "timeout": 1},
+        }), self.assertRaisesMessage(CommandError, "All sources failed: remotive"):
+            self.scrape()
+
+
+class StreamingIngestTestCase(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.settings_override = override_settings(MATCHER_INDEX_DIR=os.path.join(self.tmp, "index"))
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_iter_json_items_matches_json_loads(self):
+        feed = [{"legal": "notice"}] + generate_offers(30)
+        encoded = json.dumps(feed).encode("utf-8")
+        # mały bufor wymusza dzielenie elementów między kolejne odczyty
+        self.assertEqual(list(iter_json_items(encoded, read_size=7)), feed)
+        wrapped = json.dumps({"meta": {"jobs": 1}, "jobs": feed[1:], "total": 30}).encode("utf-8")
+        self.assertEqual(list(iter_json_items(wrapped, key="jobs", read_size=7)), feed[1:])
+        ndjson = "\n".join(json.dumps(offer) for offer in feed[1:]).encode("utf-8")
+        self.assertEqual(list(iter_json_items(ndjson, ndjson=True, read_size=7)), feed[1:])
+
+    def test_dump_is_imported_in_batches(self):
+        path = os.path.join(self.tmp, "dump.ndjson")
+        with open(path, "w") as f:
+            for offer in generate_offers(25):
+                f.write(json.dumps(offer) + "\n")
+
+        call_command("scrape_remotejobs", dump=path, batch_size=10, stdout=StringIO())
+        self.assertEqual(Job.objects.count(), 25)
+
+        saved = ScrapeCommand()._save_jobs(RemoteOKSource().iter_stream(path), batch_size=10)
+        self.assertEqual(saved, (0, 0, 25))
@@ -0,0 +1,476 @@
+# Trwały indeks TF-IDF dla matchera.
+# Słownik/IDF i rzadka macierz ofert są budowane po zmianach w korpusie (scraper, archiwizacja,
+# usuwanie) i zapisywane na dysku w wersjonowanych katalogach. Macierz jest ładowana przez
+# np.load(mmap_mode="r"), więc żądanie dopasowania wykonuje tylko transform CV i jeden iloczyn.
+# Obok macierzy TF-IDF indeks przechowuje kolumny potrzebne do punktowania (jobfinder/scoring.py):
+# binarną macierz tokenów ofert (i jej odwrócenie token -> oferty dla jobfinder/retrieval.py),
+# maskę poziomów zaawansowania, wymagane lata, tytuły i lokalizacje.
+# Przy MATCH_SIMILARITY = "lsa" build zawiera też wektory LSA i indeks IVF (jobfinder/semantic.py).
+# Przy MATCH_VECTORIZER = "hashing" zamiast słownika jest haszowana przestrzeń cech i liczniki
+# wyrazów ofert, używane ponownie przy kolejnej przebudowie (jobfinder/hashing.py).
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from jobfinder.models import Job, JobFeatures
+from jobfinder import hashing
+from jobfinder.features import FEATURES_VERSION, SENIORITY_LEVELS, WORD_RE, refresh_job_features
+from jobfinder.locks import file_lock
+from jobfinder.metrics import StageTimer
+from jobfinder.scoring import top_k
+from jobfinder.semantic import SemanticIndex, build_semantic
+from jobfinder.logging_config import setup_logger
+
+logger = setup_logger("matcher", "matcher.log")
+
+# Zwiększ przy zmianie układu plików indeksu — starsze indeksy zostaną przebudowane
+INDEX_FORMAT_VERSION = 4
+
+TFIDF_PARAMS = {
+    "stop_words": "english",
+    "ngram_range": (1, 2),
+    "max_df": 0.9,
+    "min_df": 1,
+}
+
+CURRENT_FILE = "CURRENT"
+LOCK_FILE = ".build.lock"
+KEEP_BUILDS = 2
+
+_loaded = None
+_loaded_lock = threading.Lock()
+
+
+class TfidfIndex:
+    """
+    Załadowany indeks: dopasowany wektoryzator, macierz ofert (wiersze L2-znormalizowane)
+    i identyfikatory ofert w kolejności wierszy.
+    """
+
+    def __init__(self, path, manifest, vectorizer, matrix, job_ids, columns, semantic=None):
+        self.path = path
+        self.manifest = manifest
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self.job_ids = job_ids
+        self.semantic = semantic  # SemanticIndex (LSA + IVF) albo None dla podobieństwa TF-IDF
+
+        # Kolumny do punktowania, wyrównane z wierszami macierzy
+        self.tokens = columns["tokens"]  # token -> kolumna w tag_matrix
+        self.tag_matrix = columns["tag_matrix"]  # binarna macierz (oferty x tokeny)
+        self.postings = columns["postings"]  # ta sama macierz jako CSC: token -> wiersze ofert
+        self.title_words = columns["title_words"]  # słowo tytułu (\w+) -> kolumna w title_postings
+        self.title_postings = columns["title_postings"]  # CSC: słowo tytułu -> wiersze ofert
+        self.seniority = columns["seniority"]  # maska bitowa poziomów (SENIORITY_LEVELS)
+        self.required_experience = columns["required_experience"]  # -1 gdy brak wymagań
+        self.is_remote = columns["is_remote"]  # "remote" w lokalizacji
+        self.titles = columns["titles"]  # tytuły połączone "\n" + offsety wierszy
+        self.locations = columns["locations"]  # lokalizacje połączone "\n" + offsety wierszy
+
+    @property
+    def build_id(self) -> int:
+        return self.manifest["build_id"]
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    def transform(self, text):
+        return self.vectorizer.transform([text])
+
+    def query(self, text):
+        """
+        Wektor zapytania dla tekstu CV: wiersz TF-IDF albo jego rzut LSA (silnik "lsa").
+        """
+        cv_vector = self.transform(text)
+        return cv_vector if self.semantic is None else self.semantic.project(cv_vector)
+
+    def query_similarities(self, query, rows=None) -> np.ndarray:
+        """
+        Podobieństwo kosinusowe zapytania do ofert (w kolejności job_ids). Wiersze macierzy
+        i wektor CV są L2-znormalizowane, więc wystarczy iloczyn skalarny. Silnik LSA liczy
+        tylko wiersze `rows` (jeśli podano); TF-IDF zawsze liczy wszystkie jednym iloczynem rzadkim.
+        """
+        if self.semantic is not None:
+            return self.semantic.similarities(query, rows)
+        return np.asarray((self.matrix @ query.T).toarray()).ravel()
+
+    def similarities(self, text) -> np.ndarray:
+        return self.query_similarities(self.query(text))
+
+    def nearest(self, query, k) -> np.ndarray:
+        """
+        Wiersze k ofert najbardziej podobnych do zapytania (silnik LSA: przybliżone, przez IVF).
+        """
+        if self.semantic is not None:
+            return self.semantic.nearest(query, k)
+        return top_k(self.query_similarities(query), k)
+
+
+def index_dir():
+    return str(settings.MATCHER_INDEX_DIR)
+
+
+def corpus_signature():
+    """
+    Tani podpis aktywnego korpusu (jedno zapytanie agregujące). Zmienia się, gdy oferta zostanie
+    dodana, zarchiwizowana lub gdy przeliczono jej cechy.
+    """
+    agg = Job.objects.filter(status=Job.STATUS_ACTIVE).aggregate(
+        count=Count("id"),
+        max_id=Max("id"),
+        features_updated=Max("features__updated_at"),
+    )
+    updated = agg["features_updated"]
+    return {
+        "count": agg["count"],
+        "max_id": agg["max_id"],
+        "features_updated": updated.isoformat() if updated else None,
+    }
+
+
+def _read_current(base):
+    try:
+        with open(os.path.join(base, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _write_atomic(path, content):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def _text_column(values):
+    """
+    Połącz wartości w jeden tekst rozdzielony "\n" i zwróć offsety początków wierszy.
+    Pozwala przeszukać całą kolumnę jednym wywołaniem regexa zamiast pętli po ofertach.
+    """
+    lengths = np.fromiter((len(v) + 1 for v in values), dtype=np.int64, count=len(values))
+    starts = np.zeros(len(values), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    return "\n".join(values), starts
+
+
+def _load_corpus():
+    """
+    Zwróć kolumny cech aktywnych ofert (posortowanych po id), uzupełniając brakujące cechy.
+    """
+    jobs = Job.objects.filter(status=Job.STATUS_ACTIVE)
+    stale = jobs.exclude(features__version=FEATURES_VERSION)
+    if stale.exists():
+        refresh_job_features(list(stale))
+
+    rows = JobFeatures.objects.filter(
+        job__status=Job.STATUS_ACTIVE
+    ).order_by("job_id").values_list(
+        "job_id", "title", "tags", "description",
+        "tokens", "seniority", "required_experience", "location", "updated_at",
+    )
+
+    bits = {level: 1 << i for i, level in enumerate(SENIORITY_LEVELS)}
+    corpus = {key: [] for key in (
+        "job_ids", "texts", "titles", "tokens", "seniority", "required_experience", "locations", "stamps",
+    )}
+    features_updated = None
+    for job_id, title, tags, description, tokens, seniority, required, location, updated in rows.iterator(
+        chunk_size=2000
+    ):
+        if features_updated is None or updated > features_updated:
+            features_updated = updated
+        corpus["job_ids"].append(job_id)
+        corpus["texts"].append(f"{title} {tags} {description}")
+        corpus["titles"].append(title)
+        corpus["tokens"].append(tokens)
+        corpus["seniority"].append(sum(bits[level] for level in seniority if level in bits))
+        corpus["required_experience"].append(-1 if required is None else required)
+        corpus["locations"].append(location)
+        # znacznik wersji tekstu oferty — niezmieniony pozwala użyć liczników z poprzedniego buildu
+        corpus["stamps"].append(updated.timestamp())
+
+    # podpis dokładnie tych wierszy, które trafią do indeksu (w formacie corpus_signature()) —
+    # osobne zapytanie mogłoby już widzieć oferty dodane po odczycie korpusu
+    corpus["signature"] = {
+        "count": len(corpus["job_ids"]),
+        "max_id": corpus["job_ids"][-1] if corpus["job_ids"] else None,
+        "features_updated": features_updated.isoformat() if features_updated else None,
+    }
+    return corpus
+
+
+def _save_postings(path, name, indices, indptr, n_tokens):
+    """
+    Zapisz listy wierszy dla każdego tokenu (transpozycja macierzy wiersz -> tokeny, format CSC).
+    """
+    postings = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.int32), indices, indptr),
+        shape=(len(indptr) - 1, n_tokens),
+    ).tocsc()
+    postings.sort_indices()
+    np.save(os.path.join(path, f"{name}_rows.npy"), postings.indices.astype(np.int32))
+    np.save(os.path.join(path, f"{name}_indptr.npy"), postings.indptr.astype(np.int64))
+
+
+def _save_columns(path, corpus):
+    # binarna macierz tokenów (tytuł + tagi) w formacie CSR
+    vocabulary = {}
+    indices = []
+    indptr = [0]
+    for tokens in corpus["tokens"]:
+        indices.extend(vocabulary.setdefault(t, len(vocabulary)) for t in tokens)
+        indptr.append(len(indices))
+    with open(os.path.join(path, "tokens.json"), "w") as f:
+        json.dump(vocabulary, f)
+    np.save(os.path.join(path, "tag_indices.npy"), np.asarray(indices, dtype=np.int32))
+    np.save(os.path.join(path, "tag_indptr.npy"), np.asarray(indptr, dtype=np.int64))
+
+    # indeksy odwrócone: token -> wiersze ofert (generowanie kandydatów, jobfinder/retrieval.py)
+    # i słowo tytułu -> wiersze ofert (dopasowanie ról bez przeszukiwania wszystkich tytułów)
+    _save_postings(path, "posting", indices, indptr, len(vocabulary))
+    title_words = {}
+    indices = []
+    indptr = [0]
+    for title in corpus["titles"]:
+        indices.extend({title_words.setdefault(w, len(title_words)) for w in WORD_RE.findall(title)})
+        indptr.append(len(indices))
+    with open(os.path.join(path, "title_words.json"), "w") as f:
+        json.dump(title_words, f)
+    _save_postings(path, "title_posting", indices, indptr, len(title_words))
+
+    np.save(os.path.join(path, "seniority.npy"), np.asarray(corpus["seniority"], dtype=np.uint8))
+    np.save(os.path.join(path, "required_experience.npy"), np.asarray(corpus["required_experience"], dtype=np.int16))
+    np.save(os.path.join(path, "is_remote.npy"), np.asarray(["remote" in loc for loc in corpus["locations"]], dtype=bool))
+
+    for name in ("titles", "locations"):
+        text, starts = _text_column(corpus[name])
+        with open(os.path.join(path, f"{name}.txt"), "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        np.save(os.path.join(path, f"{name}_starts.npy"), starts)
+    return len(vocabulary)
+
+
+def build_index(force=True):
+    """
+    Zbuduj nową wersję indeksu dla aktywnych ofert i ustaw ją jako bieżącą.
+    Zwraca załadowany TfidfIndex albo None, gdy nie ma aktywnych ofert.
+    Bez `force` zwraca indeks zbudowany przez inny proces w czasie oczekiwania na blokadę,
+    jeśli jest już aktualny.
+    """
+    base = index_dir()
+    os.makedirs(base, exist_ok=True)
+
+    timer = StageTimer("index_build")
+    with file_lock(os.path.join(base, LOCK_FILE)):
+        if not force:
+            index = load_index()
+            if is_current(index):
+                return index
+        with timer.stage("load_corpus"):
+            corpus = _load_corpus()
+        signature = corpus["signature"]
+        if not corpus["texts"]:
+            return None
+
+        previous = _read_current(base)
+        mode = settings.MATCH_VECTORIZER
+        reused = 0
+        with timer.stage("vectorize"):
+            if mode == "hashing":
+                n_features = settings.MATCH_HASHING_FEATURES
+                previous_counts = hashing.load_counts(os.path.join(base, previous), n_features) if previous else None
+                vectorizer, matrix, counts, reused = hashing.fit(
+                    corpus["texts"], corpus["job_ids"], corpus["stamps"], n_features, TFIDF_PARAMS, previous_counts,
+                )
+            else:
+                vectorizer = TfidfVectorizer(**TFIDF_PARAMS)
+                matrix = vectorizer.fit_transform(corpus["texts"]).tocsr()
+                matrix.sort_indices()
+
+        previous_id = int(previous.split("-")[-1]) if previous else 0
+        build_id = previous_id + 1
+        name = f"tfidf-{build_id}"
+        tmp_path = os.path.join(base, f".{name}.tmp")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        # Każda tablica w osobnym pliku .npy, aby można ją było zmapować w pamięci
+        with timer.stage("save"):
+            np.save(os.path.join(tmp_path, "job_ids.npy"), np.asarray(corpus["job_ids"], dtype=np.int64))
+            np.save(os.path.join(tmp_path, "idf.npy"), vectorizer.idf_)
+            np.save(os.path.join(tmp_path, "data.npy"), matrix.data)
+            np.save(os.path.join(tmp_path, "indices.npy"), matrix.indices)
+            np.save(os.path.join(tmp_path, "indptr.npy"), matrix.indptr)
+            if mode == "hashing":
+                hashing.save_counts(tmp_path, counts, corpus["stamps"])
+            else:
+                with open(os.path.join(tmp_path, "vocabulary.json"), "w") as f:
+                    json.dump({term: int(col) for term, col in vectorizer.vocabulary_.items()}, f)
+        with timer.stage("columns"):
+            n_tokens = _save_columns(tmp_path, corpus)
+        similarity = settings.MATCH_SIMILARITY
+        lsa_components = None
+        if similarity == "lsa":
+            with timer.stage("semantic"):
+                lsa_components = build_semantic(matrix, tmp_path, settings.MATCH_LSA_COMPONENTS)
+
+        manifest = {
+            "format_version": INDEX_FORMAT_VERSION,
+            "features_version": FEATURES_VERSION,
+            "build_id": build_id,
+            "created_at": timezone.now().isoformat(),
+            "n_jobs": int(matrix.shape[0]),
+            "n_features": int(matrix.shape[1]),
+            "nnz": int(matrix.nnz),
+            "vectorizer": mode,
+            "reused_rows": reused,
+            "n_tokens": n_tokens,
+            "similarity": similarity,
+            "lsa_components": lsa_components,
+            "signature": signature,
+        }
+        with open(os.path.join(tmp_path, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        os.rename(tmp_path, os.path.join(base, name))
+        _write_atomic(os.path.join(base, CURRENT_FILE), name)
+        _cleanup_old_builds(base, keep=name)
+
+    logger.info(
+        "Built TF-IDF index %s (%s): %s jobs, %s features, nnz=%s, reused rows=%s (%s)",
+        build_id, mode, manifest["n_jobs"], manifest["n_features"], manifest["nnz"], reused, timer.summary(),
+    )
+    return load_index()
+
+
+def _cleanup_old_builds(base, keep):
+    builds = sorted(
+        (d for d in os.listdir(base) if d.startswith("tfidf-")),
+        key=lambda d: int(d.split("-")[-1]),
+    )
+    for name in builds[:-KEEP_BUILDS]:
+        if name != keep:
+            shutil.rmtree(os.path.join(base, name), ignore_errors=True)
+
+
+def _open_index(path):
+    with open(os.path.join(path, "manifest.json")) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != INDEX_FORMAT_VERSION:
+        return None
+
+    def load(name):
+        return np.load(os.path.join(path, name), mmap_mode="r")
+
+    if manifest.get("vectorizer") == "hashing":
+        vectorizer = hashing.HashedTfidf(
+            manifest["n_features"], np.asarray(load("idf.npy")),
+            TFIDF_PARAMS["ngram_range"], TFIDF_PARAMS["stop_words"],
+        )
+    else:
+        with open(os.path.join(path, "vocabulary.json")) as f:
+            vocabulary = json.load(f)
+        vectorizer = TfidfVectorizer(vocabulary=vocabulary, **TFIDF_PARAMS)
+        vectorizer.idf_ = np.asarray(load("idf.npy"))
+
+    matrix = sparse.csr_matrix(
+        (load("data.npy"), load("indices.npy"), load("indptr.npy")),
+        shape=(manifest["n_jobs"], manifest["n_features"]),
+        copy=False,
+    )
+
+    with open(os.path.join(path, "tokens.json")) as f:
+        tokens = json.load(f)
+    tag_indices = load("tag_indices.npy")
+    tag_matrix = sparse.csr_matrix(
+        (np.ones(len(tag_indices), dtype=np.int32), tag_indices, load("tag_indptr.npy")),
+        shape=(manifest["n_jobs"], len(tokens)),
+        copy=False,
+    )
+
+    def load_postings(name, n_tokens):
+        rows = load(f"{name}_rows.npy")
+        return sparse.csc_matrix(
+            (np.ones(len(rows), dtype=np.int32), rows, load(f"{name}_indptr.npy")),
+            shape=(manifest["n_jobs"], n_tokens),
+            copy=False,
+        )
+
+    with open(os.path.join(path, "title_words.json")) as f:
+        title_words = json.load(f)
+
+    def load_text(name):
+        with open(os.path.join(path, f"{name}.txt"), encoding="utf-8", newline="") as f:
+            return f.read(), load(f"{name}_starts.npy")
+
+    columns = {
+        "tokens": tokens,
+        "tag_matrix": tag_matrix,
+        "postings": load_postings("posting", len(tokens)),
+        "title_words": title_words,
+        "title_postings": load_postings("title_posting", len(title_words)),
+        "seniority": load("seniority.npy"),
+        "required_experience": load("required_experience.npy"),
+        "is_remote": load("is_remote.npy"),
+        "titles": load_text("titles"),
+        "locations": load_text("locations"),
+    }
+    semantic = None
+    if manifest.get("similarity") == "lsa":
+        semantic = SemanticIndex.load(path, probes=settings.MATCH_ANN_PROBES)
+    return TfidfIndex(path, manifest, vectorizer, matrix, load("job_ids.npy"), columns, semantic)
+
+
+def load_index():
+    """
+    Zwróć bieżący indeks z dysku (buforowany w procesie do czasu zmiany wersji) lub None.
+    """
+    global _loaded
+    base = index_dir()
+    current = _read_current(base)
+    if current is None:
+        return None
+
+    path = os.path.join(base, current)
+    with _loaded_lock:
+        if _loaded is not None and _loaded.path == path:
+            return _loaded
+        try:
+            _loaded = _open_index(path)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load TF-IDF index %s: %s", current, e)
+            _loaded = None
+        return _loaded
+
+
+def is_current(index) -> bool:
+    return (
+        index is not None
+        and index.manifest.get("features_version") == FEATURES_VERSION
+        and index.manifest.get("similarity", "tfidf") == settings.MATCH_SIMILARITY
+        and index.manifest.get("vectorizer", "vocabulary") == settings.MATCH_VECTORIZER
+        and (
+            settings.MATCH_VECTORIZER != "hashing"
+            or index.manifest.get("n_features") == settings.MATCH_HASHING_FEATURES
+        )
+        and index.manifest.get("signature") == corpus_signature()
+    )
+
+
+def ensure_index(force=False):
+    """
+    Zwróć aktualny indeks, przebudowując go tylko wtedy, gdy korpus zmienił się od ostatniej budowy.
+    """
+    index = None if force else load_index()
+    if is_current(index):
+        return index
+    return build_index(force=force)
@@ -7,6 +7,8 @@ app_name = 'jobfinder'
 urlpatterns = [
     path('', views.home, name='home'),
     path('jobs/', views.job_list, name='job_list'),
+    path('api/jobs/', views.job_list_json, name='job_list_json'),
     path("api/match/<int:cv_id>/", match_jobs, name="match_jobs_json"),
     path("match/<int:cv_id>/", match_jobs_view, name="match_jobs_view"),
+    path("metrics/", views.metrics_view, name="metrics"),
 ]
\ No newline at end of file
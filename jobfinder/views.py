@@ -1,54 +1,41 @@
+import hmac
+
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.views.decorators.http import require_GET
-from django.core.management import call_command
-from django.db.models import Q
+from django.conf import settings
+from django.utils import timezone
 
 from .models import Job
+from .pagination import DATE_ORDERING, InvalidCursor, cached_count, keyset_page
+from .search import SEARCH_ORDERING, search_jobs, search_terms
+from .tags import has_any_tag, remote_condition, tag_facets
 from .match_jobs import match_jobs_to_cv
+from .match_pool import MatchPoolBusy, get_match_pool
+from . import metrics
+from .refresh import last_refresh_error, last_refreshed_at, refresh_metrics
 from users.models import CV
-from jobfinder.logging_config import setup_logger
-
-# Setup loggers
-scraper_logger = setup_logger("scraper", "scraper.log")
-archiver_logger = setup_logger("archiver", "archive.log")
 
 
 def home(request):
     return render(request, 'jobfinder/home.html')
 
 
-def job_list(request):
+def _filtered_jobs(request):
     """
-    Pokazuje wszystkie aktywne oferty pracy.
-    Odświeża i archiwizuje przy każdym żądaniu.
+    Aktywne oferty przefiltrowane parametrami GET (q, location, tag/tags, remote).
+    Zwraca (queryset, filter_params, ordering) — z wyszukiwaniem `q` wyniki są rankingowane.
     """
 
-    # Odśwież oferty
-    try:
-        call_command("scrape_remotejobs")
-    except Exception as e:
-        print(f"Scraping error: {e}")
-
-    #Archiwizuj przestarzałe oferty 
-    try:
-        # wywołaj komendę zarządzania zaimplementowaną w archive_old_jobs.py
-        call_command("archive_old_jobs")
-    except Exception as e:
-        print(f"Archiving error: {e}")
-    
-    #Usuń przestarzałe oferty
-    try:
-        call_command("delete_stale_jobs")
-    except Exception as e:
-        print(f"Deleting error: {e}")
-
-    #Zapytanie o aktywne oferty
-    queryset = Job.objects.filter(status=Job.STATUS_ACTIVE)
+    #Zapytanie o aktywne oferty (bez wektora wyszukiwania — nie jest potrzebny w szablonie)
+    queryset = Job.objects.filter(status=Job.STATUS_ACTIVE).defer('search_vector')
 
+    # wyszukiwanie pełnotekstowe w tytule, firmie, tagach i opisie (jobfinder/search.py)
     q = request.GET.get('q', '').strip()
-    if q:
-        queryset = queryset.filter(Q(title__icontains=q))
+    ordering = DATE_ORDERING
+    if search_terms(q):
+        queryset = search_jobs(queryset, q)
+        ordering = SEARCH_ORDERING
 
     location = request.GET.get('location', '').strip().lower()
     if location:
@@ -60,23 +47,15 @@ def job_list(request):
     if tags_param:
         tags += [t.strip() for t in tags_param.split(',') if t.strip()]
 
+    # dowolny z tagów — półzłączenie po indeksie (tag, job) zamiast przeszukiwania JSON
     if tags:
-        tags_q = Q()
-        for t in tags:
-            tags_q |= Q(attributes__contains=[t])
-        queryset = queryset.filter(tags_q)
+        queryset = queryset.filter(has_any_tag(tags))
 
     remote = request.GET.get('remote', '').strip().lower()
     if remote in ('1', 'true', 'yes', 'remote', 'only'):
-        queryset = queryset.filter(
-            Q(location__icontains='remote') | Q(attributes__contains=['remote'])
-        )
+        queryset = queryset.filter(remote_condition())
     elif remote in ('0', 'false', 'no', 'onsite'):
-        queryset = queryset.exclude(
-            Q(location__icontains='remote') | Q(attributes__contains=['remote'])
-        )
-
-    jobs = queryset.order_by('-date_last_seen')
+        queryset = queryset.exclude(remote_condition())
 
     filter_params = {
         'q': q,
@@ -84,28 +63,144 @@ def job_list(request):
         'tags': ",".join(tags),
         'remote': remote,
     }
+    return queryset, filter_params, ordering
+
+
+def _page_size(request):
+    try:
+        size = int(request.GET.get('page_size', settings.JOB_LIST_PAGE_SIZE))
+    except ValueError:
+        size = settings.JOB_LIST_PAGE_SIZE
+    return max(1, min(size, settings.JOB_LIST_MAX_PAGE_SIZE))
+
+
+def _page_url(request, **cursor):
+    # link do sąsiedniej strony z zachowaniem filtrów
+    params = request.GET.copy()
+    params.pop('after', None)
+    params.pop('before', None)
+    params.update(cursor)
+    return f"{request.path}?{params.urlencode()}"
+
+
+def _facet_url(request, filter_params, tag):
+    # link facetu: bieżące filtry + tag, od pierwszej strony
+    params = request.GET.copy()
+    for key in ('after', 'before', 'tag'):
+        params.pop(key, None)
+    tags = [t for t in filter_params['tags'].split(',') if t]
+    if tag not in tags:
+        tags.append(tag)
+    params['tags'] = ",".join(tags)
+    return f"{request.path}?{params.urlencode()}"
+
+
+def job_list(request):
+    """
+    Pokazuje aktywne oferty pracy, stronicowane kursorem po (date_last_seen, id)
+    albo, przy wyszukiwaniu, po trafności.
+    Oferty są odświeżane w tle (komenda refresh_jobs z crona), widok tylko czyta bazę.
+    """
+    queryset, filter_params, ordering = _filtered_jobs(request)
+
+    try:
+        page = keyset_page(
+            queryset,
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+            page_size=_page_size(request),
+            ordering=ordering,
+        )
+    except InvalidCursor:
+        page = keyset_page(queryset, page_size=_page_size(request), ordering=ordering)
+
+    # Jak stare są dane (ostatnie udane scrapowanie): starsze niż dwa interwały odświeżania
+    # oznaczamy jako nieaktualne
+    last_refreshed = last_refreshed_at()
+    data_is_stale = last_refreshed is None or (
+        (timezone.now() - last_refreshed).total_seconds() > 2 * settings.JOBS_REFRESH_MIN_INTERVAL
+    )
 
     return render(request, 'jobfinder/job_list.html', {
-        'jobs': jobs,
-        'filter_params': filter_params
+        'jobs': page.items,
+        'total_count': cached_count(queryset, filter_params, version=last_refreshed),
+        'next_url': _page_url(request, after=page.next_cursor) if page.next_cursor else None,
+        'previous_url': _page_url(request, before=page.previous_cursor) if page.previous_cursor else None,
+        'filter_params': filter_params,
+        'tag_facets': [
+            (name, count, _facet_url(request, filter_params, name)) for name, count in tag_facets()
+        ],
+        'last_refreshed': last_refreshed,
+        'data_is_stale': data_is_stale,
+        'refresh_error': last_refresh_error(),
     })
 
 
-
-# DOPASOWANIE – JSON API
+# OFERTY – JSON API
 @require_GET
-def match_jobs(request, cv_id):
+def job_list_json(request):
     """
-    Punkt końcowy API zwracający rankingowane oferty z wynikami.
+    Te same filtry i stronicowanie kursorem co job_list, w formacie JSON.
     """
+    queryset, filter_params, ordering = _filtered_jobs(request)
+    try:
+        page = keyset_page(
+            queryset,
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+            page_size=_page_size(request),
+            ordering=ordering,
+        )
+    except InvalidCursor as e:
+        return JsonResponse({"error": str(e)}, status=400)
 
+    return JsonResponse({
+        "count": cached_count(queryset, filter_params, version=last_refreshed_at()),
+        "next": page.next_cursor,
+        "previous": page.previous_cursor,
+        "results": [
+            {
+                "id": job.id,
+                "title": job.title,
+                "company": job.company,
+                "location": job.location,
+                "salary": job.salary,
+                "tags": job.attributes or [],
+                "url": job.job_url,
+                "date_posted": job.date_posted.isoformat() if job.date_posted else None,
+                "date_last_seen": job.date_last_seen.isoformat(),
+            }
+            for job in page
+        ],
+    })
+
+
+# DOPASOWANIE – wspólne
+# Dopasowanie (punktowanie + zapytania ORM) wykonuje ograniczona pula jobfinder/match_pool.py;
+# widoki asynchroniczne tylko na nią czekają. Pełna pula odpowiada 503 z Retry-After.
+def _match_pool_busy(busy, json=False):
+    metrics.MATCHES.inc(result="busy")
+    if json:
+        response = JsonResponse({"error": "Matcher is busy, try again later."}, status=503)
+    else:
+        response = HttpResponse("Matcher is busy, try again later.", status=503, content_type="text/plain")
+    response["Retry-After"] = str(busy.retry_after)
+    return response
+
+
+def _top_n(request):
+    """
+    Liczba wyników z parametru ?top=, ograniczona do 1..MATCH_MAX_TOP; ValueError dla nieliczby.
+    """
     try:
-        top_n = int(request.GET.get("top", 5))
+        top = int(request.GET.get("top", settings.MATCH_DEFAULT_TOP))
     except ValueError:
-        return JsonResponse({"error": "top must be integer"}, status=400)
+        raise ValueError("top must be integer") from None
+    return max(1, min(top, settings.MATCH_MAX_TOP))
 
-    cv = get_object_or_404(CV, id=cv_id)
 
+def _match_json(cv_id, top_n):
+    cv = get_object_or_404(CV, id=cv_id)
     results = match_jobs_to_cv(cv.id, top_n)
 
     data = [
@@ -113,7 +208,7 @@ def match_jobs(request, cv_id):
             "job_id": r["job"].id,
             "title": r["job"].title,
             "company": r["job"].company,
-            "apply_url": r["job"].application_link,
+            "apply_url": r["job"].job_url,
             "score": round(r["score"], 4),
             "seniority_match": r["seniority_match"],
             "experience_bucket": r["experience_bucket"],
@@ -127,10 +222,8 @@ def match_jobs(request, cv_id):
     })
 
 
-# DOPASOWANIE – WIDOK HTML
-def match_jobs_view(request, cv_id):
+def _match_html(request, cv_id, top):
     cv = get_object_or_404(CV, id=cv_id)
-    top = int(request.GET.get("top", 5))
     results = match_jobs_to_cv(cv_id, top_n=top) or []
 
     # add percent-friendly value for template
@@ -140,6 +233,7 @@ def match_jobs_view(request, cv_id):
         except Exception:
             r["score_pct"] = None
 
+    # renderowanie też w puli: procesory kontekstu sięgają do bazy (request.user)
     return render(request, "jobfinder/match_results.html", {
         "cv": cv,
         "results": results,
@@ -147,6 +241,36 @@ def match_jobs_view(request, cv_id):
     })
 
 
+# DOPASOWANIE – JSON API
+@require_GET
+async def match_jobs(request, cv_id):
+    """
+    Punkt końcowy API zwracający rankingowane oferty z wynikami.
+    """
+
+    try:
+        top_n = _top_n(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    try:
+        return await get_match_pool().run(_match_json, cv_id, top_n)
+    except MatchPoolBusy as busy:
+        return _match_pool_busy(busy, json=True)
+
+
+# DOPASOWANIE – WIDOK HTML
+async def match_jobs_view(request, cv_id):
+    try:
+        top = _top_n(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e), content_type="text/plain")
+    try:
+        return await get_match_pool().run(_match_html, request, cv_id, top)
+    except MatchPoolBusy as busy:
+        return _match_pool_busy(busy)
+
+
 def filter(request, cv_id):
     """
     Widok pokazujący oferty pracy pasujące do danego CV.
@@ -160,5 +284,25 @@ def filter(request, cv_id):
 
     return render(request, 'jobfinder/job_list.html', {
         'jobs': jobs,
+        'total_count': len(jobs),
         'filter_cv': cv
-    })
\ No newline at end of file
+    })
+
+
+# METRYKI – format tekstowy Prometheusa (jobfinder/metrics.py): metryki bieżącego procesu
+# i zapisane przez cron (refresh_jobs). Dostęp: nagłówek "Authorization: Bearer <METRICS_TOKEN>"
+# (scraper Prometheusa) albo zalogowany użytkownik z is_staff.
+def _metrics_allowed(request):
+    token = settings.METRICS_TOKEN
+    if token and hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return True
+    return request.user.is_staff
+
+
+@require_GET
+def metrics_view(request):
+    if not settings.METRICS_ENABLED:
+        raise Http404("Metrics are disabled.")
+    if not _metrics_allowed(request):
+        return HttpResponse("Forbidden.", status=403, content_type="text/plain")
+    return HttpResponse(metrics.render(refresh_metrics()), content_type=metrics.CONTENT_TYPE)
@@ -4,6 +4,7 @@ from .forms import UserRegistrationForm
 from django.contrib.auth.decorators import login_required
 from .forms import UserRegistrationForm, CVForm 
 from .models import CV
+from jobfinder.match_cache import invalidate_cv
 
 def register(request):
     if request.method == 'POST':
@@ -40,6 +41,8 @@ def manage_cv(request):
             # Przypisz bieżącego użytkownika do CV
             new_cv.user = request.user
             new_cv.save()
+            # Nowa treść CV — usuń zapamiętany ranking dopasowań
+            invalidate_cv(new_cv.id)
             messages.success(request, 'Your CV has been updated!')
             return redirect('users:view_cv')
     else: